@@ -25,7 +25,7 @@ export const useJournal = () => {
       });
 
       setTrades(response.data);
-      setTotal(response.total);
+      setTotal(response.total ?? 0);
     } catch (error) {
       console.error("Journal fetch error", error);
     } finally {
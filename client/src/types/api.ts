@@ -31,9 +31,11 @@ export interface Trade {
 }
 
 export interface PaginatedResponse<T> {
-  total: number;
-  page: number;
+  // null when the server skipped the count (cursor mode)
+  total: number | null;
+  page: number | null;
   limit: number;
+  next_cursor?: string | null;
   data: T[];
 }
 
@@ -21,6 +21,7 @@ from src.database.core import Base # To get Metadata
 # Import ALL your entities so Alembic can "see" them
 from src.entities.user import User
 from src.entities.trade import Trade
+from src.entities.trade_stats import UserTradeStats, UserSymbolPnl
 # ---------------------------------------------------------
 
 config = context.config
@@ -0,0 +1,74 @@
+"""Add user_trade_stats and user_symbol_pnl rollup tables
+
+Revision ID: 8c2f61d0a4b7
+Revises: 5441942a0bba
+Create Date: 2025-12-02 10:12:31.418204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '8c2f61d0a4b7'
+down_revision: Union[str, Sequence[str], None] = '5441942a0bba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_trade_stats',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('closed_count', sa.Integer(), nullable=False),
+    sa.Column('open_count', sa.Integer(), nullable=False),
+    sa.Column('total_pnl', sa.Float(), nullable=False),
+    sa.Column('gross_profit', sa.Float(), nullable=False),
+    sa.Column('gross_loss', sa.Float(), nullable=False),
+    sa.Column('win_count', sa.Integer(), nullable=False),
+    sa.Column('loss_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('user_symbol_pnl',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('symbol', sa.String(), nullable=False),
+    sa.Column('closed_count', sa.Integer(), nullable=False),
+    sa.Column('total_pnl', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'symbol')
+    )
+    op.create_index('ix_user_symbol_pnl_user_total', 'user_symbol_pnl', ['user_id', sa.text('total_pnl DESC')], unique=False)
+
+    # Backfill from existing trades so the rollup is correct straight after upgrade
+    op.execute("""
+        INSERT INTO user_trade_stats
+            (user_id, closed_count, open_count, total_pnl, gross_profit, gross_loss, win_count, loss_count)
+        SELECT
+            user_id,
+            COUNT(*) FILTER (WHERE status = 'CLOSED'),
+            COUNT(*) FILTER (WHERE status = 'OPEN'),
+            COALESCE(SUM(pnl) FILTER (WHERE status = 'CLOSED'), 0),
+            COALESCE(SUM(pnl) FILTER (WHERE status = 'CLOSED' AND pnl > 0), 0),
+            COALESCE(SUM(pnl) FILTER (WHERE status = 'CLOSED' AND pnl < 0), 0),
+            COUNT(*) FILTER (WHERE status = 'CLOSED' AND pnl > 0),
+            COUNT(*) FILTER (WHERE status = 'CLOSED' AND pnl < 0)
+        FROM trades
+        GROUP BY user_id
+    """)
+    op.execute("""
+        INSERT INTO user_symbol_pnl (user_id, symbol, closed_count, total_pnl)
+        SELECT user_id, symbol, COUNT(*), COALESCE(SUM(pnl), 0)
+        FROM trades
+        WHERE status = 'CLOSED'
+        GROUP BY user_id, symbol
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_symbol_pnl_user_total', table_name='user_symbol_pnl')
+    op.drop_table('user_symbol_pnl')
+    op.drop_table('user_trade_stats')
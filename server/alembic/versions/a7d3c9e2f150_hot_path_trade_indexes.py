@@ -0,0 +1,48 @@
+"""Hot-path composite and partial indexes for trades
+
+Revision ID: a7d3c9e2f150
+Revises: 8c2f61d0a4b7
+Create Date: 2025-12-04 16:37:08.552914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a7d3c9e2f150'
+down_revision: Union[str, Sequence[str], None] = '8c2f61d0a4b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Trade list (+ keyset cursor) for a trader, with and without a status filter.
+    # These also give trades.user_id the index it never had.
+    op.create_index('ix_trades_user_entry_date', 'trades',
+                    ['user_id', sa.text('entry_date DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_trades_user_status_entry_date', 'trades',
+                    ['user_id', 'status', sa.text('entry_date DESC'), sa.text('id DESC')], unique=False)
+    # Trade list for admins (all users)
+    op.create_index('ix_trades_entry_date', 'trades',
+                    [sa.text('entry_date DESC'), sa.text('id DESC')], unique=False)
+    # Equity curve per user / platform wide (INCLUDE pnl allows index-only scans)
+    op.create_index('ix_trades_user_exit_date_closed', 'trades', ['user_id', 'exit_date'], unique=False,
+                    postgresql_where=sa.text("status = 'CLOSED'"), postgresql_include=['pnl'])
+    op.create_index('ix_trades_exit_date_closed', 'trades', ['exit_date'], unique=False,
+                    postgresql_where=sa.text("status = 'CLOSED'"), postgresql_include=['pnl'])
+    # Top profitable trades
+    op.create_index('ix_trades_pnl_closed', 'trades', [sa.text('pnl DESC')], unique=False,
+                    postgresql_where=sa.text("status = 'CLOSED'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_trades_pnl_closed', table_name='trades')
+    op.drop_index('ix_trades_exit_date_closed', table_name='trades')
+    op.drop_index('ix_trades_user_exit_date_closed', table_name='trades')
+    op.drop_index('ix_trades_entry_date', table_name='trades')
+    op.drop_index('ix_trades_user_status_entry_date', table_name='trades')
+    op.drop_index('ix_trades_user_entry_date', table_name='trades')
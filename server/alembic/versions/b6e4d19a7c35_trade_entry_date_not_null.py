@@ -0,0 +1,33 @@
+"""trades.entry_date NOT NULL
+
+Revision ID: b6e4d19a7c35
+Revises: f3a8d27c61b4
+Create Date: 2025-12-15 10:21:47.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b6e4d19a7c35'
+down_revision: Union[str, Sequence[str], None] = 'f3a8d27c61b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The keyset cursor is (entry_date, id): a NULL entry_date cannot be encoded,
+    # sorts first under DESC and is skipped by the row comparison. Rows cleared
+    # through PUT /trades/{id} fall back to their exit date (or now, for open ones).
+    op.execute("UPDATE trades SET entry_date = COALESCE(exit_date, now()) WHERE entry_date IS NULL")
+    op.alter_column('trades', 'entry_date', existing_type=sa.DateTime(timezone=True),
+                    existing_server_default=sa.text('now()'), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('trades', 'entry_date', existing_type=sa.DateTime(timezone=True),
+                    existing_server_default=sa.text('now()'), nullable=True)
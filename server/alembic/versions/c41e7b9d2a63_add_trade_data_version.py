@@ -0,0 +1,35 @@
+"""Per-user trade data version (ETags)
+
+Revision ID: c41e7b9d2a63
+Revises: a7d3c9e2f150
+Create Date: 2025-12-06 11:12:40.318027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c41e7b9d2a63'
+down_revision: Union[str, Sequence[str], None] = 'a7d3c9e2f150'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('trade_data_version_seq')))
+    # Existing rows get distinct versions from the server default
+    op.add_column('user_trade_stats', sa.Column(
+        'data_version', sa.BigInteger(), nullable=False,
+        server_default=sa.text("nextval('trade_data_version_seq'::regclass)")
+    ))
+    op.create_index(op.f('ix_user_trade_stats_data_version'), 'user_trade_stats', ['data_version'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_trade_stats_data_version'), table_name='user_trade_stats')
+    op.drop_column('user_trade_stats', 'data_version')
+    op.execute(sa.schema.DropSequence(sa.Sequence('trade_data_version_seq')))
@@ -0,0 +1,34 @@
+"""Platform data version counter (platform ETags)
+
+Revision ID: d82c5f0e9b17
+Revises: b6e4d19a7c35
+Create Date: 2025-12-18 09:41:05.226310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd82c5f0e9b17'
+down_revision: Union[str, Sequence[str], None] = 'b6e4d19a7c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('platform_data_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('data_version', sa.BigInteger(), nullable=False,
+              server_default=sa.text("nextval('trade_data_version_seq'::regclass)")),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Starts above every version handed out so far
+    op.execute("INSERT INTO platform_data_version (id) VALUES (1)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('platform_data_version')
@@ -0,0 +1,62 @@
+"""trades.pnl as a generated column
+
+Revision ID: e5b81f3c0d92
+Revises: c41e7b9d2a63
+Create Date: 2025-12-09 10:21:53.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e5b81f3c0d92'
+down_revision: Union[str, Sequence[str], None] = 'c41e7b9d2a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same expression as src.entities.trade.PNL_EXPRESSION (kept literal: migrations must not change with the app)
+PNL_EXPRESSION = (
+    "CASE WHEN status = 'CLOSED' AND exit_price IS NOT NULL THEN "
+    "CASE WHEN side = 'LONG' THEN (exit_price - entry_price) * quantity "
+    "ELSE (entry_price - exit_price) * quantity END "
+    "END"
+)
+
+
+def _drop_pnl_indexes() -> None:
+    op.drop_index('ix_trades_pnl_closed', table_name='trades')
+    op.drop_index('ix_trades_exit_date_closed', table_name='trades')
+    op.drop_index('ix_trades_user_exit_date_closed', table_name='trades')
+
+
+def _create_pnl_indexes() -> None:
+    op.create_index('ix_trades_user_exit_date_closed', 'trades', ['user_id', 'exit_date'], unique=False,
+                    postgresql_where=sa.text("status = 'CLOSED'"), postgresql_include=['pnl'])
+    op.create_index('ix_trades_exit_date_closed', 'trades', ['exit_date'], unique=False,
+                    postgresql_where=sa.text("status = 'CLOSED'"), postgresql_include=['pnl'])
+    op.create_index('ix_trades_pnl_closed', 'trades', [sa.text('pnl DESC')], unique=False,
+                    postgresql_where=sa.text("status = 'CLOSED'"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A plain column cannot be turned into a generated one: drop it (and the
+    # indexes that cover it) and add it back, which recomputes every row.
+    # Rows whose stored pnl disagreed with the formula change value, so run
+    # `python -m src.analytics.rollup check` (and `rebuild` if needed) afterwards.
+    _drop_pnl_indexes()
+    op.drop_column('trades', 'pnl')
+    op.add_column('trades', sa.Column('pnl', sa.Float(), sa.Computed(PNL_EXPRESSION, persisted=True), nullable=True))
+    _create_pnl_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_pnl_indexes()
+    op.add_column('trades', sa.Column('pnl_plain', sa.Float(), nullable=True))
+    op.execute("UPDATE trades SET pnl_plain = pnl")
+    op.drop_column('trades', 'pnl')
+    op.alter_column('trades', 'pnl_plain', new_column_name='pnl')
+    _create_pnl_indexes()
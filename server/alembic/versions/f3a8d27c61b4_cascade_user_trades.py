@@ -0,0 +1,42 @@
+"""trades.user_id ON DELETE CASCADE
+
+Revision ID: f3a8d27c61b4
+Revises: e5b81f3c0d92
+Create Date: 2025-12-11 16:05:12.318442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'f3a8d27c61b4'
+down_revision: Union[str, Sequence[str], None] = 'e5b81f3c0d92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FK_NAME = 'trades_user_id_fkey'
+
+
+def _replace_fk(**options) -> None:
+    # NOT VALID + VALIDATE: the new constraint is added without re-checking every
+    # trade under the ACCESS EXCLUSIVE lock; validation only takes a SHARE UPDATE
+    # EXCLUSIVE lock, so reads and writes keep going while it scans the table.
+    # env.py runs the whole upgrade in one transaction, which would hold the
+    # ACCESS EXCLUSIVE lock through the scan: the autocommit block commits the
+    # swap first (and everything migrated before it), then validates on its own.
+    op.drop_constraint(FK_NAME, 'trades', type_='foreignkey')
+    op.create_foreign_key(FK_NAME, 'trades', 'users', ['user_id'], ['id'],
+                          postgresql_not_valid=True, **options)
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE trades VALIDATE CONSTRAINT {FK_NAME}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_fk(ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_fk()
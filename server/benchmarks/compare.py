@@ -0,0 +1,57 @@
+"""
+Compares two benchmark result files (from benchmarks.run).
+
+    python -m benchmarks.compare before.json after.json [--threshold 10]
+
+Prints p50/p95 latency and SQL statement deltas per scenario. Exits with 1
+when any scenario's p95 regressed by more than --threshold percent, so it can
+gate a CI job.
+"""
+import argparse
+import json
+import sys
+
+def _delta(before: float, after: float) -> float:
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+def compare(before: dict, after: dict, threshold: float) -> int:
+    old = {result["name"]: result for result in before["results"]}
+    regressions = 0
+
+    print(f"before: {before['meta'].get('commit')}  after: {after['meta'].get('commit')}")
+    print(f"{'scenario':<42} {'p50 ms':>18} {'p95 ms':>18} {'sql':>12}")
+    for result in after["results"]:
+        prev = old.get(result["name"])
+        if prev is None:
+            print(f"{result['name']:<42} (new) p50 {result['p50_ms']:.2f} p95 {result['p95_ms']:.2f}")
+            continue
+        p95_delta = _delta(prev["p95_ms"], result["p95_ms"])
+        flag = ""
+        if p95_delta > threshold:
+            regressions += 1
+            flag = "  <-- regression"
+        print(
+            f"{result['name']:<42} "
+            f"{prev['p50_ms']:>7.2f} → {result['p50_ms']:>7.2f} "
+            f"{prev['p95_ms']:>7.2f} → {result['p95_ms']:>7.2f} "
+            f"{prev['sql_statements_mean']:>4.1f} → {result['sql_statements_mean']:>4.1f}"
+            f"{flag}"
+        )
+    print(f"peak RSS: {before['peak_rss_mb']} MB → {after['peak_rss_mb']} MB")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed p95 regression in percent")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    sys.exit(1 if compare(before, after, args.threshold) else 0)
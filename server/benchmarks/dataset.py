@@ -0,0 +1,174 @@
+"""
+Synthetic benchmark dataset: N traders x M trades (plus one admin).
+
+    python -m benchmarks.dataset generate --users 100 --trades 1000
+    python -m benchmarks.dataset drop
+
+Everything it creates uses the BENCH_EMAIL_DOMAIN email domain, so it can be
+dropped again without touching real (or seed_data) users. Generation is
+deterministic for a given spec (seeded RNG) and uses the same executemany /
+insertmanyvalues path as the bulk import.
+"""
+import argparse
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from src.analytics import rollup
+from src.auth.service import get_password_hash
+from src.entities.trade import Trade, TradeSide, TradeStatus
+from src.entities.trade_stats import UserSymbolPnl, UserTradeStats
+from src.entities.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+BENCH_EMAIL_DOMAIN = "bench.tradelog.dev"
+BENCH_PASSWORD = "bench-pass"
+BENCH_ADMIN_EMAIL = f"admin@{BENCH_EMAIL_DOMAIN}"
+INSERT_CHUNK_SIZE = 1000
+
+class DatasetSpec(NamedTuple):
+    users: int = 20
+    trades_per_user: int = 500
+    # Share of trades that are CLOSED (with exit price/date and PnL)
+    closed_ratio: float = 0.7
+    # Number of distinct symbols trades are spread over
+    symbols: int = 25
+    # Entry dates are spread over the last `days` days
+    days: int = 365
+    seed: int = 42
+
+def symbol_names(spec: DatasetSpec) -> List[str]:
+    return [f"SYM{i:04d}" for i in range(spec.symbols)]
+
+def trader_email(index: int) -> str:
+    return f"trader{index}@{BENCH_EMAIL_DOMAIN}"
+
+def _bench_user_ids(db: Session) -> List[UUID]:
+    return list(db.scalars(select(User.id).where(User.email.like(f"%@{BENCH_EMAIL_DOMAIN}"))))
+
+def drop_dataset(db: Session):
+    """Deletes every benchmark user with their trades and rollup rows. Commits."""
+    user_ids = _bench_user_ids(db)
+    if not user_ids:
+        return
+    db.execute(delete(Trade).where(Trade.user_id.in_(user_ids)))
+    db.execute(delete(UserSymbolPnl).where(UserSymbolPnl.user_id.in_(user_ids)))
+    db.execute(delete(UserTradeStats).where(UserTradeStats.user_id.in_(user_ids)))
+    db.execute(delete(User).where(User.id.in_(user_ids)))
+    rollup.bump_platform_version(db)
+    db.commit()
+    logger.info(f"Dropped {len(user_ids)} benchmark users")
+
+def _trade_rows(user_id: UUID, spec: DatasetSpec, rng: random.Random, now: datetime):
+    symbols = symbol_names(spec)
+    span = timedelta(days=spec.days).total_seconds()
+    for _ in range(spec.trades_per_user):
+        side = rng.choice((TradeSide.LONG, TradeSide.SHORT))
+        quantity = round(rng.uniform(1, 100), 2)
+        entry_price = round(rng.uniform(10, 1000), 2)
+        entry_date = now - timedelta(seconds=rng.uniform(0, span))
+        row = {
+            "id": uuid4(),
+            "user_id": user_id,
+            "symbol": rng.choice(symbols),
+            "side": side,
+            "quantity": quantity,
+            "entry_price": entry_price,
+            "entry_date": entry_date,
+            "exit_price": None,
+            "exit_date": None,
+            "status": TradeStatus.OPEN,
+        }
+        if rng.random() < spec.closed_ratio:
+            exit_price = round(entry_price * rng.uniform(0.8, 1.2), 2)
+            row.update(
+                exit_price=exit_price,
+                exit_date=min(now, entry_date + timedelta(hours=rng.uniform(1, 24 * 14))),
+                status=TradeStatus.CLOSED
+            )
+        yield row
+
+def generate_dataset(db: Session, spec: DatasetSpec):
+    """
+    Replaces any previous benchmark dataset with a fresh one and rebuilds the
+    analytics rollups for it. Commits.
+    """
+    drop_dataset(db)
+    started = time.perf_counter()
+    rng = random.Random(spec.seed)
+    now = datetime.now(timezone.utc)
+    # One bcrypt hash for everybody: hashing per user would dominate generation time
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+
+    users = [{
+        "id": uuid4(), "email": BENCH_ADMIN_EMAIL, "username": "bench_admin",
+        "hashed_password": hashed_password, "role": UserRole.ADMIN
+    }]
+    users += [{
+        "id": uuid4(), "email": trader_email(i), "username": f"bench_trader{i}",
+        "hashed_password": hashed_password, "role": UserRole.TRADER
+    } for i in range(spec.users)]
+    db.execute(insert(User), users)
+    rollup.bump_platform_version(db)
+
+    chunk = []
+    total = 0
+    for user in users[1:]:
+        for row in _trade_rows(user["id"], spec, rng, now):
+            chunk.append(row)
+            if len(chunk) >= INSERT_CHUNK_SIZE:
+                db.execute(insert(Trade.__table__), chunk)
+                total += len(chunk)
+                chunk = []
+    if chunk:
+        db.execute(insert(Trade.__table__), chunk)
+        total += len(chunk)
+
+    for user in users[1:]:
+        rollup.rebuild_rollups(db, user["id"])
+    db.commit()
+    # Fresh planner statistics, otherwise the first queries may pick odd plans
+    db.connection().exec_driver_sql("ANALYZE trades")
+    db.commit()
+    logger.info(f"Generated {spec.users} users / {total} trades in {time.perf_counter() - started:.1f}s")
+
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    defaults = DatasetSpec()
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--trades", type=int, default=defaults.trades_per_user, help="Trades per user")
+    parser.add_argument("--closed-ratio", type=float, default=defaults.closed_ratio)
+    parser.add_argument("--symbols", type=int, default=defaults.symbols)
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+def spec_from_args(args: argparse.Namespace) -> DatasetSpec:
+    return DatasetSpec(
+        users=args.users, trades_per_user=args.trades, closed_ratio=args.closed_ratio,
+        symbols=args.symbols, days=args.days, seed=args.seed
+    )
+
+if __name__ == "__main__":
+    from src.database.core import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Generate or drop the benchmark dataset")
+    parser.add_argument("command", choices=["generate", "drop"])
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "generate":
+            generate_dataset(db, spec_from_args(args))
+        else:
+            drop_dataset(db)
+    finally:
+        db.close()
@@ -0,0 +1,317 @@
+"""
+Endpoint benchmark: drives every trades/analytics route in-process.
+
+    python -m benchmarks.run --users 100 --trades 1000 --iterations 50 --output bench.json
+    python -m benchmarks.compare before.json after.json
+
+1. Generates the synthetic dataset (see dataset.py), unless --reuse-dataset.
+2. Runs each scenario through FastAPI's TestClient (full app: middleware,
+   dependencies, serialization) and measures latency, the number of SQL
+   statements each request issued and the process' peak RSS.
+3. Writes machine-readable JSON (one entry per scenario with p50/p95/p99)
+   plus the commit and settings it ran with, so runs can be compared.
+
+The app runs with its normal settings (e.g. ANALYTICS_CACHE_TTL_SECONDS=0 to
+measure uncached analytics, --async-db for the async stack).
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (method, url, keyword arguments for TestClient.request)
+Request = Tuple[str, str, Dict[str, Any]]
+
+class Scenario(NamedTuple):
+    name: str
+    role: str
+    # Builds the timed request from whatever setup() prepared for this iteration
+    request: Callable[["BenchContext", Any], Request]
+    # Untimed per-iteration preparation (e.g. create the trade that will be closed)
+    setup: Optional[Callable[["BenchContext", int], Any]] = None
+
+class BenchContext:
+    def __init__(self, client, headers: Dict[str, Dict[str, str]]):
+        self.client = client
+        self.headers = headers
+        self.reader_trade_ids: List[str] = []
+        self.reader_cursor: Optional[str] = None
+
+    def create_open_trade(self, role: str = "writer") -> str:
+        response = self.client.post("/trades/", headers=self.headers[role], json={
+            "symbol": "BENCH", "side": "LONG", "quantity": 1, "entry_price": 100
+        })
+        response.raise_for_status()
+        return response.json()["id"]
+
+    def import_open_trades(self, symbol: str, count: int, role: str = "writer") -> str:
+        """Imports `count` OPEN trades of a fresh symbol, for the bulk writes to select by filter."""
+        response = self.client.post("/trades/bulk", headers=self.headers[role], json=[
+            {"symbol": symbol, "side": "LONG", "quantity": 1, "entry_price": 100} for _ in range(count)
+        ])
+        response.raise_for_status()
+        return symbol
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _import_csv(rows: int) -> bytes:
+    lines = ["symbol,side,quantity,entry_price,entry_date,exit_price,exit_date"]
+    entry = datetime.now(timezone.utc) - timedelta(days=30)
+    for i in range(rows):
+        exit_cols = f"110,{(entry + timedelta(days=1)).isoformat()}" if i % 2 else ","
+        lines.append(f"CSVB,LONG,1,100,{entry.isoformat()},{exit_cols}")
+    return "\n".join(lines).encode()
+
+def _bulk_rows(rows: int) -> List[dict]:
+    return [{"symbol": "BULKB", "side": "SHORT", "quantity": 2, "entry_price": 50} for _ in range(rows)]
+
+def build_scenarios(bulk_rows: int) -> List[Scenario]:
+    month_ago = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+    csv_body = _import_csv(bulk_rows)
+    bulk_body = _bulk_rows(bulk_rows)
+
+    def get(url, **params):
+        return lambda ctx, _: ("GET", url, {"params": params})
+
+    return [
+        # --- trades/controller.py ---
+        Scenario("GET /trades/ (page 1)", "reader", get("/trades/", limit=20)),
+        Scenario("GET /trades/ (100 rows, no total)", "reader", get("/trades/", limit=100, include_total=False)),
+        Scenario("GET /trades/ (deep offset)", "reader", get("/trades/", limit=20, skip=400)),
+        Scenario("GET /trades/ (cursor)", "reader",
+                 lambda ctx, _: ("GET", "/trades/", {"params": {"limit": 20, "cursor": ctx.reader_cursor}})),
+        Scenario("GET /trades/ (status=CLOSED)", "reader", get("/trades/", limit=20, status="CLOSED")),
+        Scenario("GET /trades/ (last 30 days)", "reader", get("/trades/", limit=20, start_date=month_ago)),
+        Scenario("GET /trades/ (admin)", "admin", get("/trades/", limit=20, include_total=False)),
+        Scenario("GET /trades/export (csv)", "reader", get("/trades/export", format="csv")),
+        Scenario("GET /trades/export (ndjson)", "reader", get("/trades/export", format="ndjson")),
+        Scenario("GET /trades/{id}", "reader",
+                 lambda ctx, i: ("GET", f"/trades/{ctx.reader_trade_ids[i % len(ctx.reader_trade_ids)]}", {}),
+                 setup=lambda ctx, i: i),
+        Scenario("POST /trades/", "writer", lambda ctx, _: ("POST", "/trades/", {"json": {
+            "symbol": "BENCH", "side": "LONG", "quantity": 1, "entry_price": 100}})),
+        Scenario(f"POST /trades/bulk ({bulk_rows} rows)", "writer",
+                 lambda ctx, _: ("POST", "/trades/bulk", {"json": bulk_body})),
+        Scenario(f"POST /trades/bulk/csv ({bulk_rows} rows)", "writer",
+                 lambda ctx, _: ("POST", "/trades/bulk/csv", {"files": {"file": ("trades.csv", io.BytesIO(csv_body), "text/csv")}})),
+        Scenario("PUT /trades/{id}", "writer",
+                 lambda ctx, trade_id: ("PUT", f"/trades/{trade_id}", {"json": {"quantity": 2}}),
+                 setup=lambda ctx, i: ctx.create_open_trade()),
+        Scenario("PATCH /trades/{id}/close", "writer",
+                 lambda ctx, trade_id: ("PATCH", f"/trades/{trade_id}/close", {"json": {"exit_price": 110}}),
+                 setup=lambda ctx, i: ctx.create_open_trade()),
+        Scenario("DELETE /trades/{id}", "writer",
+                 lambda ctx, trade_id: ("DELETE", f"/trades/{trade_id}", {}),
+                 setup=lambda ctx, i: ctx.create_open_trade()),
+        Scenario(f"POST /trades/bulk/close (symbol, {bulk_rows} trades)", "writer",
+                 lambda ctx, symbol: ("POST", "/trades/bulk/close", {"json": {"symbol": symbol, "exit_price": 110}}),
+                 setup=lambda ctx, i: ctx.import_open_trades(f"BCLOSE{i}", bulk_rows)),
+        Scenario(f"POST /trades/bulk/delete (symbol, {bulk_rows} trades)", "writer",
+                 lambda ctx, symbol: ("POST", "/trades/bulk/delete", {"json": {"symbol": symbol}}),
+                 setup=lambda ctx, i: ctx.import_open_trades(f"BDELETE{i}", bulk_rows)),
+        # --- analytics/controller.py ---
+        Scenario("GET /analytics/summary (trader)", "reader", get("/analytics/summary")),
+        Scenario("GET /analytics/summary (admin)", "admin", get("/analytics/summary")),
+        Scenario("GET /analytics/chart (trader)", "reader", get("/analytics/chart")),
+        Scenario("GET /analytics/chart (trader, week)", "reader", get("/analytics/chart", bucket="week")),
+        Scenario("GET /analytics/chart (admin, day)", "admin", get("/analytics/chart", bucket="day")),
+        Scenario("GET /analytics/stats (trader)", "reader", get("/analytics/stats")),
+        Scenario("GET /analytics/stats (admin)", "admin", get("/analytics/stats")),
+        Scenario("GET /analytics/unrealized (trader)", "reader", get("/analytics/unrealized")),
+        Scenario("GET /analytics/unrealized (admin)", "admin", get("/analytics/unrealized")),
+        Scenario("GET /analytics/admin/leaderboard", "admin", get("/analytics/admin/leaderboard")),
+        Scenario("GET /analytics/admin/leaderboard (30d, win_rate, page 2)", "admin",
+                 get("/analytics/admin/leaderboard", window="30d", metric="win_rate", page=2)),
+        Scenario("GET /analytics/admin/top-trades", "admin", get("/analytics/admin/top-trades")),
+    ]
+
+def run_scenario(ctx: BenchContext, scenario: Scenario, iterations: int, warmup: int, counter: "QueryCounter") -> dict:
+    headers = ctx.headers[scenario.role]
+    latencies, statements, sizes = [], [], []
+    status_codes: Dict[str, int] = {}
+
+    for i in range(warmup + iterations):
+        prepared = scenario.setup(ctx, i) if scenario.setup else None
+        method, url, kwargs = scenario.request(ctx, prepared)
+
+        counter.reset()
+        started = time.perf_counter()
+        response = ctx.client.request(method, url, headers=headers, **kwargs)
+        body = response.content
+        elapsed = (time.perf_counter() - started) * 1000
+
+        if i < warmup:
+            continue
+        latencies.append(elapsed)
+        statements.append(counter.count)
+        sizes.append(len(body))
+        status_codes[str(response.status_code)] = status_codes.get(str(response.status_code), 0) + 1
+
+    latencies.sort()
+    return {
+        "name": scenario.name,
+        "role": scenario.role,
+        "iterations": iterations,
+        "status_codes": status_codes,
+        "errors": sum(n for code, n in status_codes.items() if int(code) >= 400),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "max_ms": round(latencies[-1], 3),
+        "sql_statements_mean": round(sum(statements) / len(statements), 2),
+        "sql_statements_max": max(statements),
+        "response_bytes_mean": int(sum(sizes) / len(sizes)),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _login(client, email: str) -> Dict[str, str]:
+    from .dataset import BENCH_PASSWORD
+    response = client.post("/auth/login", data={"username": email, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def run_benchmark(spec: "DatasetSpec", iterations: int, warmup: int, bulk_rows: int,
+                  only: Optional[str] = None, reuse_dataset: bool = False, keep_dataset: bool = False) -> dict:
+    # Imported here so command line flags (e.g. --async-db) can adjust settings first
+    from .dataset import BENCH_ADMIN_EMAIL, drop_dataset, generate_dataset, symbol_names, trader_email
+    from fastapi.testclient import TestClient
+    from src.config import settings
+    from src.database import core
+    from src.database.diagnostics import QueryCounter
+    from src.main import app
+    from src.analytics.service import price_source
+    from src.prices import MemoryPriceSource
+
+    # Mark every dataset symbol, so the valuations do real work (see __main__ for the source)
+    if isinstance(price_source, MemoryPriceSource):
+        price_source.update({symbol: 100.0 + i for i, symbol in enumerate(symbol_names(spec))}, replace=True)
+
+    db = core.SessionLocal()
+    try:
+        if not reuse_dataset:
+            generate_dataset(db, spec)
+    finally:
+        db.close()
+
+    results = []
+    try:
+        with TestClient(app) as client, QueryCounter() as counter:
+            ctx = BenchContext(client, {
+                "reader": _login(client, trader_email(0)),
+                "writer": _login(client, trader_email(1)),
+                "admin": _login(client, BENCH_ADMIN_EMAIL),
+            })
+            first_page = client.get("/trades/", headers=ctx.headers["reader"], params={"limit": 100}).json()
+            ctx.reader_trade_ids = [trade["id"] for trade in first_page["data"]]
+            ctx.reader_cursor = first_page["next_cursor"]
+
+            for scenario in build_scenarios(bulk_rows):
+                if only and only.lower() not in scenario.name.lower():
+                    continue
+                result = run_scenario(ctx, scenario, iterations, warmup, counter)
+                results.append(result)
+                logger.info(
+                    f"{scenario.name:<42} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+                    f"p99 {result['p99_ms']:>8.2f}ms  sql {result['sql_statements_mean']:>5.1f}  "
+                    f"errors {result['errors']}"
+                )
+    finally:
+        if not keep_dataset:
+            db = core.SessionLocal()
+            try:
+                drop_dataset(db)
+            finally:
+                db.close()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": spec._asdict(),
+            "iterations": iterations,
+            "warmup": warmup,
+            "settings": {
+                "USE_ASYNC_DB": settings.USE_ASYNC_DB,
+                "DB_POOL_SIZE": settings.DB_POOL_SIZE,
+                "ANALYTICS_CACHE_URL": settings.ANALYTICS_CACHE_URL,
+                "ANALYTICS_CACHE_TTL_SECONDS": settings.ANALYTICS_CACHE_TTL_SECONDS,
+                "ADMIN_SNAPSHOT_INTERVAL_SECONDS": settings.ADMIN_SNAPSHOT_INTERVAL_SECONDS,
+                "PRICE_SOURCE_URL": settings.PRICE_SOURCE_URL,
+            },
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+
+if __name__ == "__main__":
+    # --help is added with the dataset options, after the first pass
+    parser = argparse.ArgumentParser(description="Benchmark the trades/analytics endpoints", add_help=False)
+    parser.add_argument("--iterations", type=int, default=30, help="Timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per scenario")
+    parser.add_argument("--bulk-rows", type=int, default=500, help="Rows per bulk import, trades per bulk close/delete")
+    parser.add_argument("--only", help="Only run scenarios whose name contains this text")
+    parser.add_argument("--output", help="Write the JSON results here (default: stdout)")
+    parser.add_argument("--async-db", action="store_true", help="Run with USE_ASYNC_DB=true")
+    parser.add_argument("--reuse-dataset", action="store_true", help="Skip generation, use the existing dataset")
+    parser.add_argument("--keep-dataset", action="store_true", help="Do not drop the dataset afterwards")
+    args, _ = parser.parse_known_args()
+
+    # Before anything loads src.config (dataset.py does)
+    if args.async_db:
+        os.environ["USE_ASYNC_DB"] = "true"
+    # The scenarios would drain the per-user buckets within a few iterations
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    # In-process prices for the dataset's symbols, not the deployment's price file
+    os.environ["PRICE_SOURCE_URL"] = "memory://"
+
+    from .dataset import add_spec_arguments, spec_from_args
+    add_spec_arguments(parser)
+    parser.add_argument("-h", "--help", action="help", help="Show this help message and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    # Per-request access logs would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    report = run_benchmark(
+        spec_from_args(args), args.iterations, args.warmup, args.bulk_rows,
+        only=args.only, reuse_dataset=args.reuse_dataset, keep_dataset=args.keep_dataset
+    )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        logger.info(f"Results written to {args.output}")
+    else:
+        print(output)
@@ -0,0 +1 @@
+pytest_plugins = ["src.database.pytest_plugin"]
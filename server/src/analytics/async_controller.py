@@ -0,0 +1,75 @@
+"""
+Async variant of controller.py (same routes and response models).
+Registered instead of it when USE_ASYNC_DB is on, see api.register_routes.
+"""
+from typing import Optional, Union
+from fastapi import APIRouter, HTTPException, Query, status
+from ..database.core import AsyncDbSession
+from ..auth.service import CurrentUser
+from src.entities.user import UserRole
+from src.trades.models import PaginatedTradeResponse
+from src.conditional import async_conditional_get
+from src.rate_limiter import AnalyticsRateLimit
+from . import models, service, async_service
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"], dependencies=[AnalyticsRateLimit])
+
+@router.get(
+    "/summary", 
+    response_model=Union[models.AdminAnalyticsSummary, models.UserAnalyticsSummary], 
+    dependencies=[async_conditional_get(service.summary_version)]
+)
+async def get_dashboard_summary(current_user: CurrentUser, db: AsyncDbSession):
+    if current_user.role == UserRole.ADMIN.value:
+        return await async_service.get_admin_analytics(db)
+    return await async_service.get_user_analytics(current_user, db)
+
+@router.get("/chart", response_model=models.ChartResponse, dependencies=[async_conditional_get()])
+async def get_pnl_chart(
+    current_user: CurrentUser, 
+    db: AsyncDbSession,
+    bucket: Optional[models.ChartBucket] = None,
+    max_points: int = Query(models.DEFAULT_CHART_POINTS, ge=3, le=5000)
+):
+    return await async_service.get_pnl_chart(current_user, db, bucket, max_points)
+
+@router.get(
+    "/unrealized", 
+    response_model=models.UnrealizedPnlResponse, 
+    dependencies=[async_conditional_get(service.valuation_version)]
+)
+async def get_unrealized_pnl(current_user: CurrentUser, db: AsyncDbSession):
+    return await async_service.get_unrealized_pnl(current_user, db)
+
+@router.get("/stats", response_model=models.PerformanceStats, dependencies=[async_conditional_get()])
+async def get_performance_stats(current_user: CurrentUser, db: AsyncDbSession):
+    return await async_service.get_performance_stats(current_user, db)
+
+@router.get(
+    "/admin/leaderboard", 
+    response_model=models.LeaderboardResponse, 
+    dependencies=[async_conditional_get(service.leaderboard_version)]
+)
+async def get_admin_leaderboard(
+    current_user: CurrentUser, 
+    db: AsyncDbSession,
+    window: models.TimeWindow = models.TimeWindow.ALL,
+    metric: models.LeaderboardMetric = models.LeaderboardMetric.NET_PNL,
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=500)
+):
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return await async_service.get_leaderboard(db, window, metric, page, limit)
+
+@router.get("/admin/top-trades", response_model=PaginatedTradeResponse)
+async def get_admin_top_trades(
+    current_user: CurrentUser, 
+    db: AsyncDbSession,
+    limit: int = Query(5, ge=1, le=100),
+    window: models.TimeWindow = models.TimeWindow.ALL,
+    symbol: Optional[str] = None
+):
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return await async_service.get_top_profitable_trades(db, limit, window, symbol)
@@ -0,0 +1,84 @@
+"""
+Async analytics services, used by async_controller.py when USE_ASYNC_DB is on.
+
+The responses are the service's CachedResponse steps, spread over two places:
+only load() (the database round trips) runs through AsyncSession.run_sync() on
+the event loop; the cache lookups (network I/O with a redis backend) and
+build() (NumPy stats, LTTB, valuation) run in the threadpool.
+"""
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.auth.models import TokenData
+from src.trades.models import PaginatedTradeResponse
+from . import models, service
+
+async def _cached(
+    db: AsyncSession,
+    response: service.CachedResponse,
+    load: Optional[Callable[[], Awaitable]] = None
+):
+    """service.cached() for the async stack; `load` replaces response.load when given."""
+    response = response.at_version(await db.run_sync(service.namespace_version, response.namespace))
+    hit = await run_in_threadpool(
+        service.analytics_cache.get, response.namespace, response.name, response.params, response.model
+    )
+    if hit is not None:
+        return hit
+    data = await load() if load else await db.run_sync(response.load)
+    return await run_in_threadpool(service.build_and_store, response, data)
+
+async def get_user_analytics(current_user: TokenData, db: AsyncSession) -> models.UserAnalyticsSummary:
+    snapshot = service.price_source.snapshot()
+
+    async def load():
+        row = await db.run_sync(lambda session: service.load_user_summary_row(session, UUID(current_user.user_id)))
+        return row, await _cached(db, service.user_valuation_response(current_user, snapshot))
+
+    return await _cached(db, service.user_summary_response(current_user, snapshot), load)
+
+async def get_admin_analytics(db: AsyncSession) -> models.AdminAnalyticsSummary:
+    summary = service.platform_snapshot.current()
+    if summary is None:
+        prices = service.price_source.snapshot()
+        row = await db.run_sync(service.load_admin_row)
+        unrealized = await _cached(db, service.valuation_response(service.PLATFORM_NAMESPACE, None, prices))
+        summary = service.platform_snapshot.store(service.admin_summary_from(row, unrealized, prices))
+    return service.check_admin_prices(summary)
+
+async def get_pnl_chart(
+    current_user: TokenData,
+    db: AsyncSession,
+    bucket: Optional[models.ChartBucket] = None,
+    max_points: int = models.DEFAULT_CHART_POINTS
+) -> models.ChartResponse:
+    return await _cached(db, service.chart_response(current_user, bucket, max_points))
+
+async def get_unrealized_pnl(current_user: TokenData, db: AsyncSession) -> models.UnrealizedPnlResponse:
+    return await _cached(db, service.user_valuation_response(current_user, service.price_source.snapshot()))
+
+async def get_performance_stats(current_user: TokenData, db: AsyncSession) -> models.PerformanceStats:
+    return await _cached(db, service.stats_response(current_user))
+
+async def get_leaderboard(
+    db: AsyncSession,
+    window: models.TimeWindow = models.TimeWindow.ALL,
+    metric: models.LeaderboardMetric = models.LeaderboardMetric.NET_PNL,
+    page: int = 1,
+    limit: int = 50
+) -> models.LeaderboardResponse:
+    ranking = await _cached(db, service.leaderboard_response(window, metric))
+    return service.leaderboard_page(ranking, window, metric, page, limit)
+
+async def get_top_profitable_trades(
+    db: AsyncSession,
+    limit: int = 5,
+    window: models.TimeWindow = models.TimeWindow.ALL,
+    symbol: Optional[str] = None
+) -> PaginatedTradeResponse:
+    def run(session):
+        return PaginatedTradeResponse.model_validate(
+            service.get_top_profitable_trades(session, limit, window, symbol), from_attributes=True
+        )
+    return await db.run_sync(run)
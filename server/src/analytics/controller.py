@@ -1,27 +1,73 @@
 
-from typing import Union
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from uuid import UUID
 from ..database.core import DbSession
 from ..auth.service import CurrentUser
 from src.entities.user import UserRole
 from src.trades.models import PaginatedTradeResponse
+from src.conditional import conditional_get
+from src.rate_limiter import AnalyticsRateLimit
 from . import models, service
 
-router = APIRouter(prefix="/analytics", tags=["Analytics"])
+router = APIRouter(prefix="/analytics", tags=["Analytics"], dependencies=[AnalyticsRateLimit])
 
-@router.get("/summary", response_model=Union[models.AdminAnalyticsSummary, models.UserAnalyticsSummary])
+@router.get(
+    "/summary", 
+    response_model=Union[models.AdminAnalyticsSummary, models.UserAnalyticsSummary], 
+    dependencies=[conditional_get(service.summary_version)]
+)
 def get_dashboard_summary(current_user: CurrentUser, db: DbSession):
     if current_user.role == UserRole.ADMIN.value:
         return service.get_admin_analytics(db)
     return service.get_user_analytics(current_user, db)
 
-@router.get("/chart", response_model=models.ChartResponse)
-def get_pnl_chart(current_user: CurrentUser, db: DbSession):
-    return service.get_pnl_chart(current_user, db)
+@router.get("/chart", response_model=models.ChartResponse, dependencies=[conditional_get()])
+def get_pnl_chart(
+    current_user: CurrentUser, 
+    db: DbSession,
+    bucket: Optional[models.ChartBucket] = None,
+    max_points: int = Query(models.DEFAULT_CHART_POINTS, ge=3, le=5000)
+):
+    return service.get_pnl_chart(current_user, db, bucket, max_points)
+
+@router.get(
+    "/unrealized", 
+    response_model=models.UnrealizedPnlResponse, 
+    dependencies=[conditional_get(service.valuation_version)]
+)
+def get_unrealized_pnl(current_user: CurrentUser, db: DbSession):
+    return service.get_unrealized_pnl(current_user, db)
+
+@router.get("/stats", response_model=models.PerformanceStats, dependencies=[conditional_get()])
+def get_performance_stats(current_user: CurrentUser, db: DbSession):
+    return service.get_performance_stats(current_user, db)
+
+@router.get(
+    "/admin/leaderboard", 
+    response_model=models.LeaderboardResponse, 
+    dependencies=[conditional_get(service.leaderboard_version)]
+)
+def get_admin_leaderboard(
+    current_user: CurrentUser, 
+    db: DbSession,
+    window: models.TimeWindow = models.TimeWindow.ALL,
+    metric: models.LeaderboardMetric = models.LeaderboardMetric.NET_PNL,
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=500)
+):
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return service.get_leaderboard(db, window, metric, page, limit)
 
 @router.get("/admin/top-trades", response_model=PaginatedTradeResponse)
-def get_admin_top_trades(current_user: CurrentUser, db: DbSession):
+def get_admin_top_trades(
+    current_user: CurrentUser, 
+    db: DbSession,
+    limit: int = Query(5, ge=1, le=100),
+    window: models.TimeWindow = models.TimeWindow.ALL,
+    symbol: Optional[str] = None
+):
     if current_user.role != UserRole.ADMIN.value:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
-    return service.get_top_profitable_trades(db)
\ No newline at end of file
+    return service.get_top_profitable_trades(db, limit, window, symbol)
@@ -0,0 +1,50 @@
+"""
+Largest-Triangle-Three-Buckets (LTTB) downsampling.
+
+Reduces a time series to a fixed number of points while keeping its visual
+shape (peaks and troughs survive, flat stretches collapse). Used to cap the
+size of the equity curve returned by /analytics/chart.
+Reference: Sveinn Steinarsson, "Downsampling Time Series for Visual Representation" (2013).
+
+Works on NumPy columns and returns the indices to keep: the loop is over the
+output buckets (threshold - 2 of them), each one a few whole-array operations,
+so the series itself is never walked in Python.
+"""
+import numpy as np
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of at most `threshold` points of the series (always keeping the first
+    and last), in order. `x` must be sorted.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Prefix sums: the average of any bucket in O(1)
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+
+    sampled = np.empty(threshold, dtype=np.intp)
+    sampled[0], sampled[-1] = 0, n - 1
+    # Every bucket except the first and last point gets the same share of the data
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # index of the previously selected point
+
+    for i in range(threshold - 2):
+        # Average of the NEXT bucket is the third corner of the triangle
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        span = next_end - next_start
+        avg_x = (x_sums[next_end] - x_sums[next_start]) / span
+        avg_y = (y_sums[next_end] - y_sums[next_start]) / span
+
+        # Pick the point of the CURRENT bucket forming the largest triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y - ay))
+        a = start + int(np.argmax(area))
+        sampled[i + 1] = a
+
+    return sampled
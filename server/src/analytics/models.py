@@ -1,7 +1,17 @@
 
+from enum import Enum
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+from uuid import UUID
+
+# Default cap on the number of points returned by /analytics/chart
+DEFAULT_CHART_POINTS = 500
+
+class ChartBucket(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
 
 class BestAsset(BaseModel):
     symbol: str
@@ -12,6 +22,19 @@ class PnLPoint(BaseModel):
     pnl: float
     cumulative_pnl: float
 
+class TimeWindow(str, Enum):
+    WEEK = "7d"
+    MONTH = "30d"
+    ALL = "all"
+
+# Length of the rolling windows (ALL has no start)
+WINDOW_DAYS = {TimeWindow.WEEK: 7, TimeWindow.MONTH: 30}
+
+class LeaderboardMetric(str, Enum):
+    NET_PNL = "net_pnl"
+    WIN_RATE = "win_rate"
+    PROFIT_FACTOR = "profit_factor"
+
 class UserPerformance(BaseModel):
     username: str
     email: str
@@ -26,14 +49,101 @@ class UserAnalyticsSummary(BaseModel):
     avg_win: float
     avg_loss: float
     best_asset: Optional[BestAsset] = None
+    # Open positions marked to market (positions without a price are not included)
+    unrealized_pnl: float = 0.0
+    unpriced_positions: int = 0
 
 class AdminAnalyticsSummary(BaseModel):
     total_users: int
     total_trades: int
     active_positions: int
     total_platform_pnl: float
+    total_unrealized_pnl: float = 0.0
+    unpriced_positions: int = 0
+    prices_as_of: Optional[datetime] = None
     top_gainer: Optional[UserPerformance] = None
     top_loser: Optional[UserPerformance] = None
+    # When these numbers were computed (the summary is served from a snapshot)
+    as_of: Optional[datetime] = None
 
 class ChartResponse(BaseModel):
-    data: List[PnLPoint]
\ No newline at end of file
+    data: List[PnLPoint]
+    bucket: Optional[ChartBucket] = None
+    # True when the series was reduced to max_points with LTTB
+    downsampled: bool = False
+
+class StatsBreakdown(BaseModel):
+    key: str
+    trades: int
+    win_rate: float
+    net_pnl: float
+    profit_factor: float
+    expectancy: float
+
+class PerformanceStats(BaseModel):
+    total_trades: int
+    net_pnl: float = 0.0
+    win_rate: float = 0.0
+    profit_factor: float = 0.0
+    # Average PnL per trade
+    expectancy: float = 0.0
+    avg_win: float = 0.0
+    avg_loss: float = 0.0
+    largest_win: float = 0.0
+    largest_loss: float = 0.0
+    # Largest drop of the equity curve from a running peak, and when it happened
+    max_drawdown: float = 0.0
+    max_drawdown_start: Optional[datetime] = None
+    max_drawdown_end: Optional[datetime] = None
+    # Days with at least one closed trade; Sharpe/Sortino need two of them
+    trading_days: int = 0
+    sharpe_ratio: Optional[float] = None
+    sortino_ratio: Optional[float] = None
+    longest_win_streak: int = 0
+    longest_loss_streak: int = 0
+    by_symbol: List[StatsBreakdown] = []
+    by_side: List[StatsBreakdown] = []
+
+
+class SymbolValuation(BaseModel):
+    symbol: str
+    positions: int
+    # LONG quantity minus SHORT quantity
+    net_quantity: float
+    # None when the price source has no price for the symbol
+    mark_price: Optional[float] = None
+    unrealized_pnl: Optional[float] = None
+
+class UnrealizedPnlResponse(BaseModel):
+    total_unrealized_pnl: float
+    open_positions: int
+    unpriced_positions: int
+    # Time of the price snapshot the positions were marked with
+    prices_as_of: Optional[datetime] = None
+    by_symbol: List[SymbolValuation] = []
+
+class LeaderboardEntry(BaseModel):
+    # Same RANK() for equal values, with gaps after ties
+    rank: int
+    user_id: UUID
+    username: str
+    email: str
+    closed_trades: int
+    net_pnl: float
+    win_rate: float
+    profit_factor: float
+
+class LeaderboardRanking(BaseModel):
+    """Every ranked trader for one (window, metric): what gets cached."""
+    window_start: Optional[datetime] = None
+    entries: List[LeaderboardEntry]
+
+class LeaderboardResponse(BaseModel):
+    window: TimeWindow
+    metric: LeaderboardMetric
+    # Closed trades since window_start count (None: all time)
+    window_start: Optional[datetime] = None
+    total: int
+    page: int
+    limit: int
+    data: List[LeaderboardEntry]
@@ -0,0 +1,304 @@
+"""
+Incrementally maintained analytics rollups.
+
+Every write in trades/service.py reports the trades it removed and added
+(as TradeContribution tuples) via apply_changes(), inside the same
+transaction as the write itself. The per-user and per-(user, symbol)
+counters are updated with a single UPSERT per table, so the summary
+endpoint can read one row instead of scanning the trades table.
+
+Run as a script to maintain existing data:
+    python -m src.analytics.rollup rebuild   # recompute everything from trades
+    python -m src.analytics.rollup check     # compare rollup vs full recompute
+"""
+import logging
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import func, case, delete, insert, select, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from src.entities.trade import Trade, TradeStatus
+from src.entities.trade_stats import PlatformDataVersion, UserTradeStats, UserSymbolPnl, trade_data_version_seq
+from src.entities.user import User
+
+logger = logging.getLogger(__name__)
+
+# Floats are accumulated incrementally, so allow for rounding drift when checking
+PNL_TOLERANCE = 1e-6
+
+class TradeContribution(NamedTuple):
+    """The part of a trade that the rollups care about."""
+    user_id: UUID
+    symbol: str
+    status: TradeStatus
+    pnl: Optional[float]
+
+def contribution_of(trade) -> TradeContribution:
+    """Works for a Trade entity or any row exposing the same attributes."""
+    return TradeContribution(
+        user_id=trade.user_id,
+        symbol=trade.symbol,
+        status=TradeStatus(trade.status) if trade.status else TradeStatus.OPEN,
+        pnl=trade.pnl
+    )
+
+class _UserDelta:
+    __slots__ = ("closed_count", "open_count", "total_pnl", "gross_profit",
+                 "gross_loss", "win_count", "loss_count")
+
+    def __init__(self):
+        self.closed_count = 0
+        self.open_count = 0
+        self.total_pnl = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.win_count = 0
+        self.loss_count = 0
+
+    def add(self, c: TradeContribution, sign: int):
+        if c.status != TradeStatus.CLOSED:
+            self.open_count += sign
+            return
+        pnl = c.pnl or 0.0
+        self.closed_count += sign
+        self.total_pnl += sign * pnl
+        if pnl > 0:
+            self.gross_profit += sign * pnl
+            self.win_count += sign
+        elif pnl < 0:
+            self.gross_loss += sign * pnl
+            self.loss_count += sign
+
+    def as_values(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class RollupChanges(NamedTuple):
+    """Net effect of a write on the rollup tables (rows for the two UPSERTs)."""
+    users: List[dict]
+    symbols: List[dict]
+
+def net_changes(
+    removed: Iterable[TradeContribution] = (),
+    added: Iterable[TradeContribution] = ()
+) -> RollupChanges:
+    """Sums the contributions per user and per (user, symbol). No database access."""
+    user_deltas = defaultdict(_UserDelta)
+    # (user_id, symbol) -> [closed_count, total_pnl]
+    symbol_deltas = defaultdict(lambda: [0, 0.0])
+
+    for sign, contributions in ((-1, removed), (1, added)):
+        for c in contributions:
+            user_deltas[c.user_id].add(c, sign)
+            if c.status == TradeStatus.CLOSED:
+                entry = symbol_deltas[(c.user_id, c.symbol)]
+                entry[0] += sign
+                entry[1] += sign * (c.pnl or 0.0)
+
+    return RollupChanges(
+        users=[{"user_id": uid, **d.as_values()} for uid, d in user_deltas.items()],
+        # Drop no-op entries (e.g. an edit that didn't touch the symbol or PnL)
+        symbols=[
+            {"user_id": uid, "symbol": symbol, "closed_count": count, "total_pnl": pnl}
+            for (uid, symbol), (count, pnl) in symbol_deltas.items()
+            if count != 0 or pnl != 0.0
+        ]
+    )
+
+def write_changes(db: Session, changes: RollupChanges) -> Dict[UUID, float]:
+    """
+    One UPSERT per rollup table. Returns each written user's total_pnl as of
+    this write (for the trade event), from the same statement.
+    Does NOT commit: the caller commits together with the trade write.
+    """
+    totals = {}
+    if changes.users:
+        stmt = pg_insert(UserTradeStats).values(changes.users)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserTradeStats.user_id],
+            set_={
+                **{name: getattr(UserTradeStats, name) + getattr(stmt.excluded, name)
+                   for name in _UserDelta.__slots__},
+                "updated_at": func.now(),
+                "data_version": trade_data_version_seq.next_value()
+            }
+        )
+        totals = dict(db.execute(stmt.returning(UserTradeStats.user_id, UserTradeStats.total_pnl)).all())
+
+    if changes.symbols:
+        stmt = pg_insert(UserSymbolPnl).values(changes.symbols)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserSymbolPnl.user_id, UserSymbolPnl.symbol],
+            set_={
+                "closed_count": UserSymbolPnl.closed_count + stmt.excluded.closed_count,
+                "total_pnl": UserSymbolPnl.total_pnl + stmt.excluded.total_pnl
+            }
+        )
+        db.execute(stmt)
+    return totals
+
+def apply_changes(
+    db: Session,
+    removed: Iterable[TradeContribution] = (),
+    added: Iterable[TradeContribution] = ()
+) -> Dict[UUID, float]:
+    """
+    Applies the net effect of a write to the rollup tables (see write_changes).
+    Does NOT commit: the caller commits together with the trade write.
+    """
+    return write_changes(db, net_changes(removed, added))
+
+def bump_platform_version(db: Session):
+    """
+    For writes that change the platform views without a trade write: user
+    creation and purge. Does NOT commit: the caller commits with the write.
+    """
+    stmt = pg_insert(PlatformDataVersion).values(id=1, data_version=trade_data_version_seq.next_value())
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[PlatformDataVersion.id],
+        set_={"data_version": trade_data_version_seq.next_value()}
+    ))
+
+def get_data_version(db: Session, user_id: Optional[UUID] = None) -> str:
+    """
+    Opaque version of a user's trade data (or of the whole platform when
+    user_id is None). It changes whenever apply_changes() runs for the user,
+    so it can be used as an ETag without touching the trades table.
+    """
+    if user_id:
+        version = db.query(UserTradeStats.data_version).filter(UserTradeStats.user_id == user_id).scalar()
+        return str(version or 0)
+
+    # Platform views also list users: see PlatformDataVersion. Every part only
+    # grows, so an old ETag can never match again.
+    version = db.scalar(select(func.greatest(
+        func.coalesce(select(func.max(UserTradeStats.data_version)).scalar_subquery(), 0),
+        func.coalesce(select(PlatformDataVersion.data_version).where(PlatformDataVersion.id == 1).scalar_subquery(), 0)
+    )))
+    return str(version)
+
+# ---------------------------------------------------------
+# Full recompute (backfill / rebuild / consistency check)
+# ---------------------------------------------------------
+
+def _closed(expr, extra=None):
+    condition = Trade.status == TradeStatus.CLOSED
+    if extra is not None:
+        condition = and_(condition, extra)
+    return case((condition, expr), else_=0)
+
+def _user_stats_select(user_id: Optional[UUID] = None):
+    query = select(
+        Trade.user_id,
+        func.sum(_closed(1)).label("closed_count"),
+        func.sum(case((Trade.status == TradeStatus.OPEN, 1), else_=0)).label("open_count"),
+        func.coalesce(func.sum(_closed(func.coalesce(Trade.pnl, 0.0))), 0.0).label("total_pnl"),
+        func.coalesce(func.sum(_closed(Trade.pnl, Trade.pnl > 0)), 0.0).label("gross_profit"),
+        func.coalesce(func.sum(_closed(Trade.pnl, Trade.pnl < 0)), 0.0).label("gross_loss"),
+        func.sum(_closed(1, Trade.pnl > 0)).label("win_count"),
+        func.sum(_closed(1, Trade.pnl < 0)).label("loss_count"),
+    ).group_by(Trade.user_id)
+    if user_id:
+        query = query.where(Trade.user_id == user_id)
+    return query
+
+def _symbol_pnl_select(user_id: Optional[UUID] = None):
+    query = select(
+        Trade.user_id,
+        Trade.symbol,
+        func.count(Trade.id).label("closed_count"),
+        func.coalesce(func.sum(func.coalesce(Trade.pnl, 0.0)), 0.0).label("total_pnl"),
+    ).where(Trade.status == TradeStatus.CLOSED).group_by(Trade.user_id, Trade.symbol)
+    if user_id:
+        query = query.where(Trade.user_id == user_id)
+    return query
+
+_STATS_COLUMNS = ["user_id", *_UserDelta.__slots__]
+_SYMBOL_COLUMNS = ["user_id", "symbol", "closed_count", "total_pnl"]
+
+def rebuild_rollups(db: Session, user_id: Optional[UUID] = None):
+    """
+    Recomputes the rollup tables from the trades table (all users, or one).
+    Does NOT commit.
+    """
+    stats_delete = delete(UserTradeStats)
+    symbol_delete = delete(UserSymbolPnl)
+    if user_id:
+        stats_delete = stats_delete.where(UserTradeStats.user_id == user_id)
+        symbol_delete = symbol_delete.where(UserSymbolPnl.user_id == user_id)
+
+    db.execute(stats_delete)
+    db.execute(symbol_delete)
+    db.execute(insert(UserTradeStats).from_select(_STATS_COLUMNS, _user_stats_select(user_id)))
+    db.execute(insert(UserSymbolPnl).from_select(_SYMBOL_COLUMNS, _symbol_pnl_select(user_id)))
+
+def _differs(a, b) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        return abs((a or 0.0) - (b or 0.0)) > PNL_TOLERANCE * max(1.0, abs(a or 0.0), abs(b or 0.0))
+    return (a or 0) != (b or 0)
+
+def check_consistency(db: Session, user_id: Optional[UUID] = None) -> List[str]:
+    """
+    Compares the rollup tables against a full recompute.
+    Returns a list of human readable discrepancies (empty if consistent).
+    """
+    problems = []
+
+    expected = {row.user_id: row for row in db.execute(_user_stats_select(user_id))}
+    stored_query = select(UserTradeStats)
+    if user_id:
+        stored_query = stored_query.where(UserTradeStats.user_id == user_id)
+    stored = {row.user_id: row for row in db.scalars(stored_query)}
+
+    for uid in expected.keys() | stored.keys():
+        exp, got = expected.get(uid), stored.get(uid)
+        for name in _UserDelta.__slots__:
+            exp_val = getattr(exp, name) if exp else 0
+            got_val = getattr(got, name) if got else 0
+            if _differs(exp_val, got_val):
+                problems.append(f"user_trade_stats[{uid}].{name}: expected {exp_val}, stored {got_val}")
+
+    expected_symbols = {(row.user_id, row.symbol): row for row in db.execute(_symbol_pnl_select(user_id))}
+    stored_query = select(UserSymbolPnl)
+    if user_id:
+        stored_query = stored_query.where(UserSymbolPnl.user_id == user_id)
+    stored_symbols = {(row.user_id, row.symbol): row for row in db.scalars(stored_query)}
+
+    for key in expected_symbols.keys() | stored_symbols.keys():
+        exp, got = expected_symbols.get(key), stored_symbols.get(key)
+        for name in ("closed_count", "total_pnl"):
+            exp_val = getattr(exp, name) if exp else 0
+            got_val = getattr(got, name) if got else 0
+            if _differs(exp_val, got_val):
+                problems.append(f"user_symbol_pnl[{key[0]}, {key[1]}].{name}: expected {exp_val}, stored {got_val}")
+
+    return problems
+
+if __name__ == "__main__":
+    from src.database.core import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    db = SessionLocal()
+    try:
+        if command == "rebuild":
+            rebuild_rollups(db)
+            db.commit()
+            logger.info("Analytics rollups rebuilt from trades.")
+        elif command == "check":
+            problems = check_consistency(db)
+            for problem in problems:
+                logger.warning(problem)
+            if problems:
+                logger.error(f"Rollup is inconsistent: {len(problems)} discrepancies found.")
+                sys.exit(1)
+            logger.info("Rollup is consistent with the trades table.")
+        else:
+            logger.error(f"Unknown command '{command}'. Use 'rebuild' or 'check'.")
+            sys.exit(2)
+    finally:
+        db.close()
@@ -1,48 +1,124 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, case, desc, asc  
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, NamedTuple, Optional, Type
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy import BigInteger, cast, extract, func, desc, asc, case, select, true, literal_column, and_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from uuid import UUID
 from src.entities.trade import Trade, TradeStatus
 from src.entities.user import User, UserRole
+from src.entities.trade_stats import UserTradeStats, UserSymbolPnl
 from src.auth.models import TokenData
 from src.trades.models import PaginatedTradeResponse
 from . import models
+from .downsample import lttb_indices
+from . import rollup, stats, valuation
+from .snapshot import PlatformSnapshot
+from .top_trades import TopTradesIndex
+from src.config import settings
+from src.cache import ResponseCache, backend_from_url
+from src.prices import PriceSnapshot, price_source_from_url
+from src.trades import events
+from src import conditional
 
-def get_user_analytics(current_user: TokenData, db: Session) -> models.UserAnalyticsSummary:
-    user_uuid = UUID(current_user.user_id)
-    
-    # 1. Aggregate Math for User Analytics
-    # We use conditional sums (case) to calculate all metrics in a single DB query for performance
-    query = db.query(
-        func.count(Trade.id).label('total_trades'),
-        func.sum(Trade.pnl).label('total_pnl'),
-        # Sum only positive PnL for Gross Profit
-        func.sum(case((Trade.pnl > 0, Trade.pnl), else_=0)).label('gross_profit'),
-        # Sum only negative PnL for Gross Loss (result will be negative, e.g., -500)
-        func.sum(case((Trade.pnl < 0, Trade.pnl), else_=0)).label('gross_loss'),
-        # Count number of winning trades
-        func.sum(case((Trade.pnl > 0, 1), else_=0)).label('win_count'),
-        # Count number of losing trades
-        func.sum(case((Trade.pnl < 0, 1), else_=0)).label('loss_count')
-    ).filter(Trade.user_id == user_uuid, Trade.status == TradeStatus.CLOSED)
-    
-    result = query.first()
-    
-    # 2. Count Active Positions (Open Trades) separately
-    active_count = db.query(func.count(Trade.id)).filter(
-        Trade.user_id == user_uuid, 
-        Trade.status == TradeStatus.OPEN
-    ).scalar() or 0
-
-    # 3. Extract & Sanitize (Handle None if user has 0 trades)
-    total_trades = result.total_trades or 0
-    total_pnl = result.total_pnl or 0.0
-    gross_profit = result.gross_profit or 0.0
+# ---------------------------------------------------------
+# Response cache: one namespace per user, "platform" for admin (all trades) views.
+# Trade writes drop the writer's namespace and the platform one. Entries are also
+# keyed on the namespace's data version (the ETag one), because dropping is not
+# enough: a compute that read before a write can store its result after the drop,
+# and with memory:// the other workers' caches are never dropped at all.
+# ---------------------------------------------------------
+analytics_cache = ResponseCache(
+    backend_from_url(settings.ANALYTICS_CACHE_URL, max_bytes=settings.ANALYTICS_CACHE_MAX_BYTES),
+    ttl=settings.ANALYTICS_CACHE_TTL_SECONDS
+)
+
+PLATFORM_NAMESPACE = "platform"
+
+def _cache_namespace(current_user: TokenData) -> str:
+    if current_user.role == UserRole.ADMIN:
+        return PLATFORM_NAMESPACE
+    return current_user.user_id
+
+# Prices for marking open positions to market; valuations are cached per
+# price snapshot version (and dropped with the namespace on trade writes)
+price_source = price_source_from_url(settings.PRICE_SOURCE_URL)
+
+@events.subscribe
+def _invalidate_cache(event: events.TradeEvent):
+    analytics_cache.invalidate(str(event.user_id))
+    analytics_cache.invalidate(PLATFORM_NAMESPACE)
+
+class CachedResponse(NamedTuple):
+    """
+    A cached analytics response, computed in two steps: load() does the database
+    reads, build() the CPU work on what load returned. The async stack runs them
+    on different threads (see async_service.py).
+    """
+    namespace: str
+    name: str
+    params: dict
+    model: Type[BaseModel]
+    load: Callable[[Session], Any]
+    build: Callable[[Any], BaseModel]
+
+    def at_version(self, version: str) -> "CachedResponse":
+        return self._replace(params={**self.params, "data": version})
+
+def namespace_version(db: Session, namespace: str) -> str:
+    """conditional.data_version() of the data a cache namespace holds."""
+    if namespace == PLATFORM_NAMESPACE:
+        return "p" + rollup.get_data_version(db)
+    return "u" + rollup.get_data_version(db, UUID(namespace))
+
+def cached(db: Session, response: CachedResponse):
+    response = response.at_version(namespace_version(db, response.namespace))
+    return analytics_cache.get_or_compute(
+        response.namespace, response.name, response.params, response.model,
+        lambda: response.build(response.load(db))
+    )
+
+def build_and_store(response: CachedResponse, data):
+    """build() step of a cache miss, storing the result."""
+    value = response.build(data)
+    analytics_cache.put(response.namespace, response.name, response.params, value)
+    return value
+
+def load_user_summary_row(db: Session, user_id: UUID):
+    """
+    The pre-aggregated rollup (maintained by the trade write paths, see rollup.py),
+    with the best asset from the per-symbol rollup in the same round trip.
+    """
+    # CRITICAL FIX: Only a symbol with POSITIVE total PnL (> 0) qualifies as "Best Asset".
+    # This prevents showing a losing asset as your "best" just because it lost the least.
+    # closed_count > 0: once a symbol's trades are all deleted, float drift can leave a tiny total behind.
+    best_asset_query = select(UserSymbolPnl.symbol, UserSymbolPnl.total_pnl)\
+        .where(UserSymbolPnl.user_id == UserTradeStats.user_id, UserSymbolPnl.closed_count > 0,
+               UserSymbolPnl.total_pnl > 0)\
+        .order_by(UserSymbolPnl.total_pnl.desc())\
+        .limit(1)\
+        .lateral('best_asset')
+
+    return db.query(UserTradeStats, best_asset_query.c.symbol, best_asset_query.c.total_pnl)\
+        .outerjoin(best_asset_query, true())\
+        .filter(UserTradeStats.user_id == user_id)\
+        .first()
+
+def user_summary_from(row, unrealized: models.UnrealizedPnlResponse) -> models.UserAnalyticsSummary:
+    stats = row[0] if row else None
+
+    # 1. Extract & Sanitize (Handle missing row if user has 0 trades)
+    total_trades = stats.closed_count if stats else 0
+    active_count = stats.open_count if stats else 0
+    total_pnl = stats.total_pnl if stats else 0.0
+    gross_profit = stats.gross_profit if stats else 0.0
     # Use abs() to get the magnitude of loss (e.g., convert -500 to 500) for correct division
-    gross_loss = abs(result.gross_loss or 0.0)
-    wins = result.win_count or 0
-    losses = result.loss_count or 0
+    gross_loss = abs(stats.gross_loss) if stats else 0.0
+    wins = stats.win_count if stats else 0
+    losses = stats.loss_count if stats else 0
 
-    # 4. Derived Math Calculations
+    # 2. Derived Math Calculations
     
     # Profit Factor: Ratio of money won to money lost
     if gross_loss > 0:
@@ -60,26 +136,12 @@ def get_user_analytics(current_user: TokenData, db: Session) -> models.UserAnaly
     # Avg Loss: Average loss per losing trade
     avg_loss = round(gross_loss / losses, 2) if losses > 0 else 0.0
 
-    # 5. Best Asset Logic
-    # Groups trades by symbol and sums PnL.
-    best_asset_query = db.query(
-        Trade.symbol, 
-        func.sum(Trade.pnl).label('total')
-    ).filter(
-        Trade.user_id == user_uuid, 
-        Trade.status == TradeStatus.CLOSED
-    ).group_by(Trade.symbol)
-    
-    # CRITICAL FIX: Ensure we only return a "Best Asset" if the total PnL is POSITIVE (> 0).
-    # This prevents showing a losing asset as your "best" just because it lost the least.
-    best_asset_row = best_asset_query.having(func.sum(Trade.pnl) > 0)\
-        .order_by(desc('total')).first()
-        
+    # 3. Best Asset
     best_asset = None
-    if best_asset_row:
+    if row and row.symbol:
         best_asset = models.BestAsset(
-            symbol=best_asset_row.symbol, 
-            total_pnl=round(best_asset_row.total, 2)
+            symbol=row.symbol, 
+            total_pnl=round(row.total_pnl, 2)
         )
 
     return models.UserAnalyticsSummary(
@@ -90,44 +152,84 @@ def get_user_analytics(current_user: TokenData, db: Session) -> models.UserAnaly
         active_positions=active_count,
         avg_win=avg_win,
         avg_loss=avg_loss,
-        best_asset=best_asset
+        best_asset=best_asset,
+        # Open positions marked to market
+        unrealized_pnl=unrealized.total_unrealized_pnl,
+        unpriced_positions=unrealized.unpriced_positions
     )
 
-def get_admin_analytics(db: Session) -> models.AdminAnalyticsSummary:
-    # Count users (excluding admins)
-    total_users = db.query(User).filter(User.role != UserRole.ADMIN).count()
-    # Count all trades (open + closed)
-    total_trades = db.query(Trade).count()
-    # Count currently open positions
-    active_positions = db.query(Trade).filter(Trade.status == TradeStatus.OPEN).count()
-    # Sum PnL of ALL closed trades on the platform
-    total_pnl = db.query(func.sum(Trade.pnl)).filter(Trade.status == TradeStatus.CLOSED).scalar() or 0.0
-
-    # Helper function to find Top Gainer / Top Loser
-    def get_outlier(order_func, require_positive=False):
-        query = db.query(
-            Trade.user_id, 
-            func.sum(Trade.pnl).label('total')
-        ).filter(Trade.status == TradeStatus.CLOSED).group_by(Trade.user_id)
-        
-        # CRITICAL FIX: For Top Gainer, require sum(pnl) > 0
-        if require_positive:
-            query = query.having(func.sum(Trade.pnl) > 0)
-
-        row = query.order_by(order_func('total')).first()
-        
-        if row:
-            user = db.query(User).filter(User.id == row.user_id).first()
-            if user: 
-                return models.UserPerformance(
-                    username=user.username, 
-                    email=user.email, 
-                    total_pnl=round(row.total, 2)
-                )
+def user_valuation_response(current_user: TokenData, snapshot: PriceSnapshot) -> CachedResponse:
+    user_id = None if current_user.role == UserRole.ADMIN else UUID(current_user.user_id)
+    return valuation_response(_cache_namespace(current_user), user_id, snapshot)
+
+def compute_user_analytics(
+    current_user: TokenData, 
+    db: Session, 
+    snapshot: Optional[PriceSnapshot] = None
+) -> models.UserAnalyticsSummary:
+    row = load_user_summary_row(db, UUID(current_user.user_id))
+    unrealized = cached(db, user_valuation_response(current_user, snapshot or price_source.snapshot()))
+    return user_summary_from(row, unrealized)
+
+def user_summary_response(current_user: TokenData, snapshot: PriceSnapshot) -> CachedResponse:
+    """
+    The trader summary. Its load() reads the rollup row and the (separately
+    cached) valuation; the async stack does those two steps itself.
+    """
+    def load(db):
+        return load_user_summary_row(db, UUID(current_user.user_id)), cached(db, user_valuation_response(current_user, snapshot))
+    return CachedResponse(
+        _cache_namespace(current_user), "summary", {"prices": snapshot.version},
+        models.UserAnalyticsSummary, load, lambda data: user_summary_from(*data)
+    )
+
+def get_user_analytics(current_user: TokenData, db: Session) -> models.UserAnalyticsSummary:
+    return cached(db, user_summary_response(current_user, price_source.snapshot()))
+
+def _first_by(column, order_by, condition):
+    """Value of `column` on the first row (by order_by) matching condition, in the same aggregate pass."""
+    return func.array_agg(aggregate_order_by(column, order_by, User.id)).filter(condition)[1]
+
+def _outlier(row, prefix: str) -> Optional[models.UserPerformance]:
+    username = getattr(row, f"{prefix}_username")
+    if username is None:
         return None
+    return models.UserPerformance(
+        username=username,
+        email=getattr(row, f"{prefix}_email"),
+        total_pnl=round(getattr(row, f"{prefix}_total_pnl"), 2)
+    )
 
-    top_gainer = get_outlier(desc, require_positive=True)
-    top_loser = get_outlier(asc, require_positive=False)
+def load_admin_row(db: Session):
+    """
+    Platform-wide metrics in ONE query: users LEFT JOIN the per-user rollup,
+    aggregated once. Top gainer/loser are picked in the same pass, so there
+    is no per-outlier User lookup and no scan of the trades table.
+    """
+    has_closed = UserTradeStats.closed_count > 0
+    pnl = UserTradeStats.total_pnl
+
+    return db.query(
+        # Count users (excluding admins)
+        func.count(User.id).filter(User.role != UserRole.ADMIN).label("total_users"),
+        # Count all trades (open + closed)
+        func.coalesce(func.sum(UserTradeStats.closed_count + UserTradeStats.open_count), 0).label("total_trades"),
+        # Count currently open positions
+        func.coalesce(func.sum(UserTradeStats.open_count), 0).label("active_positions"),
+        # Sum PnL of ALL closed trades on the platform
+        func.coalesce(func.sum(pnl), 0.0).label("total_pnl"),
+        # CRITICAL FIX: For Top Gainer, require sum(pnl) > 0
+        *[_first_by(column, pnl.desc(), and_(has_closed, pnl > 0)).label(f"gainer_{name}")
+          for name, column in (("username", User.username), ("email", User.email), ("total_pnl", pnl))],
+        *[_first_by(column, pnl.asc(), has_closed).label(f"loser_{name}")
+          for name, column in (("username", User.username), ("email", User.email), ("total_pnl", pnl))],
+    ).select_from(User).outerjoin(UserTradeStats, UserTradeStats.user_id == User.id).one()
+
+def admin_summary_from(
+    row, unrealized: models.UnrealizedPnlResponse, prices: PriceSnapshot
+) -> models.AdminAnalyticsSummary:
+    top_gainer = _outlier(row, "gainer")
+    top_loser = _outlier(row, "loser")
 
     # CORRECTION: Logic to prevent the same user from appearing as both Gainer and Loser.
     # If the Top Gainer and Top Loser are the same person (e.g., only 1 user has PnL),
@@ -136,42 +238,348 @@ def get_admin_analytics(db: Session) -> models.AdminAnalyticsSummary:
         top_loser = None
 
     return models.AdminAnalyticsSummary(
-        total_users=total_users,
-        total_trades=total_trades,
-        active_positions=active_positions,
-        total_platform_pnl=round(total_pnl, 2),
+        total_users=row.total_users,
+        total_trades=row.total_trades,
+        active_positions=row.active_positions,
+        total_platform_pnl=round(row.total_pnl, 2),
         top_gainer=top_gainer,
-        top_loser=top_loser
+        top_loser=top_loser,
+        total_unrealized_pnl=unrealized.total_unrealized_pnl,
+        unpriced_positions=unrealized.unpriced_positions,
+        prices_as_of=prices.as_of
     )
 
+def compute_admin_analytics(db: Session) -> models.AdminAnalyticsSummary:
+    prices = price_source.snapshot()
+    unrealized = cached(db, valuation_response(PLATFORM_NAMESPACE, None, prices))
+    return admin_summary_from(load_admin_row(db), unrealized, prices)
+
+# Admins read the background-refreshed snapshot (see snapshot.py)
+platform_snapshot = PlatformSnapshot(
+    compute_admin_analytics,
+    interval=settings.ADMIN_SNAPSHOT_INTERVAL_SECONDS,
+    refresh_after=settings.ADMIN_SNAPSHOT_REFRESH_AFTER_MUTATIONS
+)
+
+def get_admin_analytics(db: Session) -> models.AdminAnalyticsSummary:
+    return check_admin_prices(platform_snapshot.get(db))
+
+def check_admin_prices(summary: models.AdminAnalyticsSummary) -> models.AdminAnalyticsSummary:
+    # Prices moved since the snapshot was taken: re-mark the positions in the background
+    if summary.prices_as_of != price_source.snapshot().as_of:
+        platform_snapshot.request_refresh()
+    return summary
+
+# ---------------------------------------------------------
+# Admin leaderboard: every trader ranked by one metric with RANK() OVER, in one
+# query joined to users. The full ranking is cached per (window, metric) in the
+# platform namespace (dropped on every trade write, closes included); pages are
+# slices of it, so browsing thousands of traders costs one query per write.
+# ---------------------------------------------------------
+
+def leaderboard_window_start(window: models.TimeWindow, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Start of a rolling window, moved on the hour so that the cache entry (and
+    ETag) for a window stays valid for up to an hour between trade writes.
+    """
+    days = models.WINDOW_DAYS.get(window)
+    if days is None:
+        return None
+    now = (now or datetime.now(timezone.utc)).replace(minute=0, second=0, microsecond=0)
+    return now - timedelta(days=days)
 
-def get_pnl_chart(current_user: TokenData, db: Session) -> models.ChartResponse:
-    query = db.query(Trade.exit_date, Trade.pnl).filter(
-        Trade.status == TradeStatus.CLOSED,
-        Trade.exit_date.isnot(None)
+def _leaderboard_stats(window_start: Optional[datetime]):
+    """Per-trader closed-trade aggregates: the rollup for all time, a trades scan for a window."""
+    if window_start is None:
+        return select(
+            UserTradeStats.user_id,
+            UserTradeStats.closed_count,
+            UserTradeStats.total_pnl,
+            UserTradeStats.gross_profit,
+            UserTradeStats.gross_loss,
+            UserTradeStats.win_count
+        ).where(UserTradeStats.closed_count > 0).subquery("stats")
+
+    pnl = func.coalesce(Trade.pnl, 0.0)
+    return select(
+        Trade.user_id,
+        func.count().label("closed_count"),
+        func.sum(pnl).label("total_pnl"),
+        func.coalesce(func.sum(pnl).filter(pnl > 0), 0.0).label("gross_profit"),
+        func.coalesce(func.sum(pnl).filter(pnl < 0), 0.0).label("gross_loss"),
+        func.count().filter(pnl > 0).label("win_count")
+    ).where(Trade.status == TradeStatus.CLOSED, Trade.exit_date >= window_start)\
+        .group_by(Trade.user_id).subquery("stats")
+
+def leaderboard_response(window: models.TimeWindow, metric: models.LeaderboardMetric) -> CachedResponse:
+    window_start = leaderboard_window_start(window)
+    stats = _leaderboard_stats(window_start)
+
+    win_rate = stats.c.win_count * 100.0 / stats.c.closed_count
+    # Same rules as the user summary: 99.99 when there are profits but no losses
+    profit_factor = case(
+        (stats.c.gross_loss < 0, stats.c.gross_profit / -stats.c.gross_loss),
+        (stats.c.gross_profit > 0, 99.99),
+        else_=0.0
     )
+    ranked_by = {
+        models.LeaderboardMetric.NET_PNL: stats.c.total_pnl,
+        models.LeaderboardMetric.WIN_RATE: win_rate,
+        models.LeaderboardMetric.PROFIT_FACTOR: profit_factor,
+    }[metric]
+
+    def load(db: Session):
+        return db.execute(
+            select(
+                func.rank().over(order_by=ranked_by.desc()).label("rank"),
+                User.id, User.username, User.email,
+                stats.c.closed_count, stats.c.total_pnl,
+                win_rate.label("win_rate"), profit_factor.label("profit_factor")
+            ).join(User, User.id == stats.c.user_id)\
+            .where(User.role != UserRole.ADMIN)\
+            .order_by(literal_column("rank"), User.username)
+        ).all()
+
+    def build(rows) -> models.LeaderboardRanking:
+        return models.LeaderboardRanking(
+            window_start=window_start,
+            entries=[
+                models.LeaderboardEntry(
+                    rank=row.rank,
+                    user_id=row.id,
+                    username=row.username,
+                    email=row.email,
+                    closed_trades=row.closed_count,
+                    net_pnl=round(row.total_pnl, 2),
+                    win_rate=round(row.win_rate, 1),
+                    profit_factor=round(row.profit_factor, 2)
+                )
+                for row in rows
+            ]
+        )
+
+    return CachedResponse(
+        PLATFORM_NAMESPACE, "leaderboard",
+        {"window": window.value, "metric": metric.value,
+         "start": window_start.isoformat() if window_start else None},
+        models.LeaderboardRanking, load, build
+    )
+
+def compute_leaderboard(
+    db: Session, window: models.TimeWindow, metric: models.LeaderboardMetric
+) -> models.LeaderboardRanking:
+    response = leaderboard_response(window, metric)
+    return response.build(response.load(db))
+
+def leaderboard_page(
+    ranking: models.LeaderboardRanking,
+    window: models.TimeWindow,
+    metric: models.LeaderboardMetric,
+    page: int,
+    limit: int
+) -> models.LeaderboardResponse:
+    offset = (page - 1) * limit
+    return models.LeaderboardResponse(
+        window=window,
+        metric=metric,
+        window_start=ranking.window_start,
+        total=len(ranking.entries),
+        page=page,
+        limit=limit,
+        data=ranking.entries[offset:offset + limit]
+    )
+
+def get_leaderboard(
+    db: Session,
+    window: models.TimeWindow = models.TimeWindow.ALL,
+    metric: models.LeaderboardMetric = models.LeaderboardMetric.NET_PNL,
+    page: int = 1,
+    limit: int = 50
+) -> models.LeaderboardResponse:
+    ranking = cached(db, leaderboard_response(window, metric))
+    return leaderboard_page(ranking, window, metric, page, limit)
+
+def leaderboard_version(current_user: TokenData, db: Session) -> str:
+    """ETag version for the leaderboard: platform data, plus the hour rolling windows move on."""
+    hour = int(datetime.now(timezone.utc).timestamp() // 3600)
+    return f"{conditional.data_version(current_user, db)}.{hour}"
+
+def summary_version(current_user: TokenData, db: Session) -> str:
+    """
+    ETag version for /analytics/summary. The admin summary is served from the
+    snapshot, so its version is the snapshot's timestamp, not the live data's.
+    """
+    if current_user.role == UserRole.ADMIN and platform_snapshot.running and platform_snapshot.as_of:
+        return f"s{platform_snapshot.as_of.timestamp()}"
+    return valuation_version(current_user, db)
+
+def valuation_version(current_user: TokenData, db: Session) -> str:
+    """ETag version for responses that include unrealized PnL: positions and prices."""
+    return f"{conditional.data_version(current_user, db)}.{price_source.snapshot().version}"
+
+def valuation_response(namespace: str, user_id: Optional[UUID], snapshot: PriceSnapshot) -> CachedResponse:
+    filters = [Trade.status == TradeStatus.OPEN]
+    if user_id is not None:
+        filters.append(Trade.user_id == user_id)
+    return CachedResponse(
+        namespace, "unrealized", {"prices": snapshot.version},
+        models.UnrealizedPnlResponse,
+        lambda db: valuation.load_open_positions(db, filters),
+        lambda positions: valuation.value_positions(positions, snapshot)
+    )
+
+def get_unrealized_pnl(current_user: TokenData, db: Session) -> models.UnrealizedPnlResponse:
+    """Open positions marked to market (all users' for admins), per symbol."""
+    return cached(db, user_valuation_response(current_user, price_source.snapshot()))
+
+
+def get_pnl_chart(
+    current_user: TokenData, 
+    db: Session, 
+    bucket: Optional[models.ChartBucket] = None, 
+    max_points: int = models.DEFAULT_CHART_POINTS
+) -> models.ChartResponse:
+    return cached(db, chart_response(current_user, bucket, max_points))
+
+def compute_pnl_chart(
+    current_user: TokenData, 
+    db: Session, 
+    bucket: Optional[models.ChartBucket] = None, 
+    max_points: int = models.DEFAULT_CHART_POINTS
+) -> models.ChartResponse:
+    response = chart_response(current_user, bucket, max_points)
+    return response.build(response.load(db))
+
+class ChartSeries(NamedTuple):
+    """The equity curve as columns, in chart order."""
+    # Exit time (or bucket start), microseconds since the epoch: exact, unlike float seconds
+    micros: np.ndarray
+    pnl: np.ndarray
+    cumulative: np.ndarray
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _load_chart_series(db: Session, query) -> ChartSeries:
+    """Streams (micros, pnl, cumulative_pnl) rows into arrays, like stats.load_closed_trades."""
+    result = db.connection().execute(query.execution_options(stream_results=True, yield_per=stats.FETCH_BATCH_SIZE))
+    chunks = [
+        tuple(np.array(column, dtype=dtype) for column, dtype in zip(zip(*rows), (np.int64, np.float64, np.float64)))
+        for rows in result.partitions()
+    ]
+    if not chunks:
+        return ChartSeries(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0))
+    return ChartSeries(*(np.concatenate(column) for column in zip(*chunks)))
+
+def chart_response(
+    current_user: TokenData, 
+    bucket: Optional[models.ChartBucket] = None, 
+    max_points: int = models.DEFAULT_CHART_POINTS
+) -> CachedResponse:
+    """
+    Equity curve. Aggregation and the running balance are done in Postgres:
+    - bucket=None: one point per closed trade
+    - bucket=day|week|month: PnL summed per date_trunc() period
+    The cumulative PnL is a SUM() OVER window, so Python never loops over trades.
+    Series longer than max_points are reduced with LTTB (shape preserving) on
+    the fetched columns; only the kept points become PnLPoints.
+    """
+    filters = [Trade.status == TradeStatus.CLOSED, Trade.exit_date.isnot(None)]
     if current_user.role != UserRole.ADMIN:
-        query = query.filter(Trade.user_id == UUID(current_user.user_id))
-        
-    trades = query.order_by(Trade.exit_date.asc()).all()
-    
-    chart_data = []
-    running_balance = 0.0
-    for t in trades:
-        pnl = t.pnl or 0.0
-        running_balance += pnl
-        chart_data.append(models.PnLPoint(date=t.exit_date, pnl=pnl, cumulative_pnl=round(running_balance, 2)))
-
-    return models.ChartResponse(data=chart_data)
-
-def get_top_profitable_trades(db: Session) -> PaginatedTradeResponse:
-    trades = db.query(Trade).options(joinedload(Trade.owner))\
-        .filter(Trade.status == TradeStatus.CLOSED, Trade.pnl > 0)\
-        .order_by(desc(Trade.pnl)).limit(5).all()
-        
+        filters.append(Trade.user_id == UUID(current_user.user_id))
+
+    def load(db: Session) -> ChartSeries:
+        pnl = func.coalesce(Trade.pnl, 0.0)
+        if bucket:
+            # Inlined (not a bind param) so SELECT and GROUP BY are the same expression.
+            # Safe: bucket is validated against the ChartBucket enum.
+            period = func.date_trunc(literal_column(f"'{bucket.value}'"), Trade.exit_date)
+            date, order = period, (period,)
+            step, cumulative = func.sum(pnl), func.sum(func.sum(pnl)).over(order_by=period)
+        else:
+            date, order = Trade.exit_date, (Trade.exit_date, Trade.id)
+            step, cumulative = pnl, func.sum(pnl).over(order_by=order)
+        query = select(cast(extract("epoch", date) * 1_000_000, BigInteger), step, cumulative)\
+            .where(*filters)\
+            .order_by(*order)
+        if bucket:
+            query = query.group_by(period)
+        return _load_chart_series(db, query)
+
+    def build(series: ChartSeries) -> models.ChartResponse:
+        micros, pnl, cumulative = series
+        downsampled = len(micros) > max_points
+        if downsampled:
+            # Seconds from the first point: small numbers keep the bucket averages precise
+            keep = lttb_indices((micros - micros[0]) / 1e6, cumulative, max_points)
+            micros, cumulative = micros[keep], cumulative[keep]
+            # After downsampling a point stands for everything since the previous kept point,
+            # so its pnl is the change in balance (identical to the step pnl when nothing was dropped).
+            pnl = np.diff(cumulative, prepend=0.0)
+
+        chart_data = [
+            models.PnLPoint(
+                date=_EPOCH + timedelta(microseconds=us),
+                pnl=round(step_pnl, 2),
+                cumulative_pnl=round(balance, 2)
+            )
+            for us, step_pnl, balance in zip(micros.tolist(), pnl.tolist(), cumulative.tolist())
+        ]
+        return models.ChartResponse(data=chart_data, bucket=bucket, downsampled=downsampled)
+
+    return CachedResponse(
+        _cache_namespace(current_user), "chart",
+        {"bucket": bucket.value if bucket else None, "max_points": max_points},
+        models.ChartResponse, load, build
+    )
+
+def get_performance_stats(current_user: TokenData, db: Session) -> models.PerformanceStats:
+    return cached(db, stats_response(current_user))
+
+def compute_performance_stats(current_user: TokenData, db: Session) -> models.PerformanceStats:
+    response = stats_response(current_user)
+    return response.build(response.load(db))
+
+def stats_response(current_user: TokenData) -> CachedResponse:
+    """
+    Drawdown, Sharpe/Sortino, expectancy, streaks and per-symbol/per-side
+    breakdowns over the closed trades (all users' for admins, like the chart).
+    See stats.py: one streamed query into NumPy arrays, vectorized metrics.
+    """
+    filters = [Trade.status == TradeStatus.CLOSED, Trade.exit_date.isnot(None)]
+    if current_user.role != UserRole.ADMIN:
+        filters.append(Trade.user_id == UUID(current_user.user_id))
+    return CachedResponse(
+        _cache_namespace(current_user), "stats", {},
+        models.PerformanceStats,
+        lambda db: stats.load_closed_trades(db, filters),
+        stats.compute
+    )
+
+# Best closed trades per window, kept in memory and fed by trade events (see top_trades.py)
+top_trades_index = TopTradesIndex(settings.TOP_TRADES_CAPACITY, settings.TOP_TRADES_MAX_AGE_SECONDS)
+
+def get_top_profitable_trades(
+    db: Session,
+    limit: int = 5,
+    window: models.TimeWindow = models.TimeWindow.ALL,
+    symbol: Optional[str] = None
+) -> PaginatedTradeResponse:
+    """
+    The `limit` most profitable closed trades (of `symbol`, closed inside
+    `window`). The ranking comes from the in-memory top-K; only the winners
+    are loaded, by primary key, with their owner.
+    """
+    if symbol:
+        symbol = symbol.strip().upper()
+    ids = [ranked.id for ranked in top_trades_index.top(db, window, limit, symbol or None)]
+
+    trades = db.query(Trade).options(joinedload(Trade.owner)).filter(Trade.id.in_(ids)).all() if ids else []
+    by_id = {trade.id: trade for trade in trades}
+
+    # No total: counting every profitable trade is what this endpoint avoids
     return {
-        "data": trades, 
-        "total": len(trades), 
+        "data": [by_id[trade_id] for trade_id in ids if trade_id in by_id], 
+        "total": None, 
         "page": 1, 
-        "limit": 5
-    }
\ No newline at end of file
+        "limit": limit
+    }
@@ -0,0 +1,127 @@
+"""
+In-memory platform snapshot for the admin dashboard.
+
+The admin summary is the same for every admin, so instead of computing it per
+request a background thread recomputes it:
+  - every ADMIN_SNAPSHOT_INTERVAL_SECONDS, or
+  - as soon as ADMIN_SNAPSHOT_REFRESH_AFTER_MUTATIONS trade writes happened
+    in this worker since the last refresh (counted through trades/events.py),
+  - or when asked to (request_refresh(), e.g. after new market prices).
+
+Requests answer from memory and report when the numbers were computed (as_of).
+Each worker process keeps its own snapshot; writes handled by another worker
+are picked up on the next interval refresh.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from src.database.core import SessionLocal
+from src.trades import events
+from . import models
+
+logger = logging.getLogger(__name__)
+
+class PlatformSnapshot:
+    def __init__(
+        self,
+        compute: Callable[[Session], models.AdminAnalyticsSummary],
+        interval: float,
+        refresh_after: int
+    ):
+        self.compute = compute
+        self.interval = interval
+        self.refresh_after = refresh_after
+        self._summary: Optional[models.AdminAnalyticsSummary] = None
+        self._lock = threading.Lock()
+        self._mutations = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def as_of(self) -> Optional[datetime]:
+        summary = self._summary
+        return summary.as_of if summary else None
+
+    def on_trade_event(self, event: events.TradeEvent):
+        with self._lock:
+            self._mutations += len(event.trade_ids) or 1
+            due = self._mutations >= self.refresh_after
+        if due:
+            self._wake.set()
+
+    def request_refresh(self):
+        """Wakes the background thread for an early refresh (no-op without it)."""
+        self._wake.set()
+
+    def refresh(self, db: Optional[Session] = None) -> models.AdminAnalyticsSummary:
+        """Recomputes the snapshot (with its own session unless one is given)."""
+        with self._lock:
+            # Writes that land while we compute are counted towards the next refresh
+            self._mutations = 0
+
+        session = db or SessionLocal()
+        try:
+            summary = self.compute(session)
+        finally:
+            if db is None:
+                session.close()
+        return self.store(summary)
+
+    def store(self, summary: models.AdminAnalyticsSummary) -> models.AdminAnalyticsSummary:
+        """Makes a freshly computed summary the snapshot."""
+        summary.as_of = datetime.now(timezone.utc)
+        self._summary = summary
+        return summary
+
+    def current(self) -> Optional[models.AdminAnalyticsSummary]:
+        """The snapshot kept by the background thread; None when it must be computed on the spot."""
+        summary = self._summary
+        if summary is None or not self.running:
+            return None
+        return summary
+
+    def get(self, db: Session) -> models.AdminAnalyticsSummary:
+        """
+        Returns the current snapshot. Without the background thread (scripts,
+        ADMIN_SNAPSHOT_INTERVAL_SECONDS=0) it is computed on the spot.
+        """
+        return self.current() or self.refresh(db)
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Platform snapshot refresh failed")
+            logger.debug(f"Platform snapshot refreshed in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        if self.interval <= 0 or self.running:
+            return
+        self._stop.clear()
+        events.subscribe(self.on_trade_event)
+        self._thread = threading.Thread(target=self._run, name="platform-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        events.unsubscribe(self.on_trade_event)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+        self._summary = None
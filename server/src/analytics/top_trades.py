@@ -0,0 +1,198 @@
+"""
+In-memory top-K of the most profitable closed trades, one per time window.
+
+/analytics/admin/top-trades used to sort every closed trade by pnl on each
+call. Instead each window keeps the (at most) TOP_TRADES_CAPACITY best trades
+in a min-heap, maintained from the trade events:
+
+  - a close / update / import adds the trade when it beats the heap's floor,
+  - a delete, or an update that lowers the pnl, removes it,
+  - when the heap overflows, the smallest entry is evicted and becomes the floor.
+
+Trades are ordered by (pnl, exit_date, id), the same total order as the
+fallback query. Invariant: every qualifying trade (closed, pnl > 0, inside
+the window) ranked above the floor is in the heap. So the best N trades (of
+one symbol, too) can be answered from memory whenever at least N entries
+match, or when the heap has never evicted anything. Otherwise, and on a cold start, the caller
+falls back to the indexed query (ix_trades_pnl_closed) and reloads the heap.
+
+Each worker process keeps its own heaps; they are reloaded every
+TOP_TRADES_MAX_AGE_SECONDS to pick up writes handled by other workers.
+"""
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.entities.trade import Trade, TradeStatus
+from src.trades import events
+from . import models
+
+class RankedTrade(NamedTuple):
+    # Field order is the ranking order
+    pnl: float
+    exit_date: datetime
+    id: UUID
+    symbol: str
+
+def _ranked(trade) -> Optional[RankedTrade]:
+    """The heap entry for a trade (row or event mapping), None when it does not qualify."""
+    pnl = trade["pnl"]
+    if trade["status"] != TradeStatus.CLOSED or pnl is None or pnl <= 0 or trade["exit_date"] is None:
+        return None
+    return RankedTrade(pnl, trade["exit_date"], trade["id"], trade["symbol"])
+
+class TopTrades:
+    """Top-K heap for one window (days=None: all time)."""
+
+    def __init__(self, capacity: int, days: Optional[int], max_age: float):
+        self.capacity = capacity
+        self.days = days
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        # Min-heap with lazy deletion: entries no longer in _entries are stale
+        self._heap: List[RankedTrade] = []
+        self._entries: Dict[UUID, RankedTrade] = {}
+        # Everything ranked above the floor is held; None means nothing was ever evicted
+        self._floor: Optional[RankedTrade] = None
+        self._loaded_at: Optional[float] = None
+        self._pending: Optional[List[events.TradeEvent]] = None
+
+    def window_start(self) -> Optional[datetime]:
+        if self.days is None:
+            return None
+        return datetime.now(timezone.utc) - timedelta(days=self.days)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.max_age
+
+    # --- maintenance (caller holds the lock) ---
+
+    def _discard(self, trade_id: UUID):
+        self._entries.pop(trade_id, None)
+
+    def _add(self, entry: RankedTrade):
+        if self._floor is not None and entry <= self._floor:
+            return
+        self._entries[entry.id] = entry
+        heapq.heappush(self._heap, entry)
+        while len(self._entries) > self.capacity:
+            evicted = heapq.heappop(self._heap)
+            if self._entries.get(evicted.id) == evicted:
+                del self._entries[evicted.id]
+                self._floor = evicted if self._floor is None else max(self._floor, evicted)
+        # Compact once stale entries outnumber live ones
+        if len(self._heap) > 2 * max(len(self._entries), self.capacity):
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+
+    def _apply(self, event: events.TradeEvent):
+        start = self.window_start()
+        trades = {trade["id"]: trade for trade in event.trades}
+        for trade_id in event.trade_ids:
+            self._discard(trade_id)
+            trade = trades.get(trade_id)
+            if trade is None:
+                if event.action != events.TradeAction.DELETED:
+                    # A write we cannot see into: start over from the database
+                    self._loaded_at = None
+                continue
+            entry = _ranked(trade)
+            if entry and (start is None or entry.exit_date >= start):
+                self._add(entry)
+
+    def on_trade_event(self, event: events.TradeEvent):
+        with self._lock:
+            if self._pending is not None:
+                # A reload is running: replay once its rows are in
+                self._pending.append(event)
+            elif self._loaded_at is not None:
+                self._apply(event)
+
+    # --- reads ---
+
+    def top(self, limit: int, symbol: Optional[str] = None) -> Optional[List[RankedTrade]]:
+        """The best `limit` trades, or None when the heap cannot tell (not loaded, too few entries)."""
+        with self._lock:
+            if not self.loaded:
+                return None
+            start = self.window_start()
+            candidates = [
+                e for e in self._entries.values()
+                if (start is None or e.exit_date >= start) and (symbol is None or e.symbol == symbol)
+            ]
+            if len(candidates) < limit and self._floor is not None:
+                return None
+        return heapq.nlargest(limit, candidates)
+
+    def query(self, limit: int, symbol: Optional[str] = None):
+        """Indexed fallback: closed trades by pnl DESC (ix_trades_pnl_closed)."""
+        filters = [Trade.status == TradeStatus.CLOSED, Trade.pnl > 0]
+        start = self.window_start()
+        if start is not None:
+            filters.append(Trade.exit_date >= start)
+        if symbol is not None:
+            filters.append(Trade.symbol == symbol)
+        return select(Trade.pnl, Trade.exit_date, Trade.id, Trade.symbol)\
+            .where(*filters)\
+            .order_by(Trade.pnl.desc(), Trade.exit_date.desc(), Trade.id.desc())\
+            .limit(limit)
+
+    def reload(self, db: Session):
+        """Refills the heap from the database (skipped when another reload is running)."""
+        with self._lock:
+            if self._pending is not None:
+                return
+            self._pending = []
+        try:
+            rows = [RankedTrade(*row) for row in db.execute(self.query(self.capacity))]
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            self._entries = {row.id: row for row in rows}
+            self._heap = list(rows)
+            heapq.heapify(self._heap)
+            self._floor = rows[-1] if len(rows) >= self.capacity else None
+            self._loaded_at = time.monotonic()
+            pending, self._pending = self._pending, None
+            for event in pending:
+                self._apply(event)
+
+class TopTradesIndex:
+    """One TopTrades per window, fed by the trade events."""
+
+    def __init__(self, capacity: int, max_age: float):
+        self.windows = {
+            window: TopTrades(capacity, models.WINDOW_DAYS.get(window), max_age)
+            for window in models.TimeWindow
+        }
+        events.subscribe(self.on_trade_event)
+
+    def on_trade_event(self, event: events.TradeEvent):
+        for top in self.windows.values():
+            top.on_trade_event(event)
+
+    def top(
+        self, db: Session, window: models.TimeWindow, limit: int, symbol: Optional[str] = None
+    ) -> List[RankedTrade]:
+        top = self.windows[window]
+        ranked = top.top(limit, symbol)
+        if ranked is not None:
+            return ranked
+
+        if not top.loaded:
+            top.reload(db)
+            ranked = top.top(limit, symbol)
+            if ranked is not None:
+                return ranked
+        # Fewer matches in memory than asked for (e.g. a rare symbol): ask the index
+        return [RankedTrade(*row) for row in db.execute(top.query(limit, symbol))]
@@ -0,0 +1,92 @@
+"""
+Mark-to-market valuation of open positions.
+
+Open trades are loaded as columns (symbol code, is_long, quantity, entry
+price) and valued against a price snapshot (see src/prices.py) in one
+vectorized pass: each symbol's mark is looked up once, broadcast to its
+positions with a take(), and the per-symbol totals come from bincount().
+
+    unrealized = (mark - entry_price) * quantity      LONG
+    unrealized = (entry_price - mark) * quantity      SHORT
+
+Positions whose symbol has no price are reported (unpriced_positions) but
+left out of the total rather than valued at their entry price.
+"""
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+from sqlalchemy import select
+
+from src.entities.trade import Trade, TradeSide
+from src.prices import PriceSnapshot
+from . import models
+
+# Rows per fetch while streaming the positions into the arrays
+FETCH_BATCH_SIZE = 20_000
+
+class PositionColumns(NamedTuple):
+    symbol: np.ndarray
+    is_long: np.ndarray
+    quantity: np.ndarray
+    entry_price: np.ndarray
+    symbols: List[str]
+
+def load_open_positions(db, filters) -> PositionColumns:
+    """Streams the open trades matching `filters` (one query) into column arrays."""
+    query = select(
+        Trade.symbol,
+        Trade.side == TradeSide.LONG,
+        Trade.quantity,
+        Trade.entry_price,
+    ).where(*filters)
+
+    result = db.connection().execute(query.execution_options(stream_results=True, yield_per=FETCH_BATCH_SIZE))
+    symbol_codes: Dict[str, int] = {}
+    chunks = []
+    for rows in result.partitions():
+        symbol, is_long, quantity, entry_price = zip(*rows)
+        chunks.append((
+            np.array([symbol_codes.setdefault(s, len(symbol_codes)) for s in symbol], dtype=np.int32),
+            np.array(is_long, dtype=bool),
+            np.array(quantity, dtype=np.float64),
+            np.array(entry_price, dtype=np.float64),
+        ))
+
+    if not chunks:
+        empty = np.empty(0)
+        return PositionColumns(np.empty(0, dtype=np.int32), np.empty(0, dtype=bool), empty, empty, [])
+    columns = [np.concatenate(column) for column in zip(*chunks)]
+    return PositionColumns(*columns, symbols=list(symbol_codes))
+
+def value_positions(positions: PositionColumns, snapshot: PriceSnapshot) -> models.UnrealizedPnlResponse:
+    size = len(positions.symbols)
+    # One lookup per symbol, NaN when the snapshot has no price for it
+    marks = np.array([snapshot.prices.get(symbol, np.nan) for symbol in positions.symbols], dtype=np.float64)
+    mark = marks[positions.symbol]
+    direction = np.where(positions.is_long, 1.0, -1.0)
+    unrealized = np.nan_to_num((mark - positions.entry_price) * positions.quantity * direction)
+
+    counts = np.bincount(positions.symbol, minlength=size)
+    net_quantity = np.bincount(positions.symbol, weights=positions.quantity * direction, minlength=size)
+    symbol_pnl = np.bincount(positions.symbol, weights=unrealized, minlength=size)
+    priced = ~np.isnan(marks)
+
+    by_symbol = [
+        models.SymbolValuation(
+            symbol=positions.symbols[i],
+            positions=int(counts[i]),
+            net_quantity=round(float(net_quantity[i]), 8),
+            mark_price=float(marks[i]) if priced[i] else None,
+            unrealized_pnl=round(float(symbol_pnl[i]), 2) if priced[i] else None,
+        )
+        for i in range(size)
+    ]
+    by_symbol.sort(key=lambda row: (row.unrealized_pnl is None, -(row.unrealized_pnl or 0.0)))
+
+    return models.UnrealizedPnlResponse(
+        total_unrealized_pnl=round(float(symbol_pnl[priced].sum()), 2),
+        open_positions=len(positions.symbol),
+        unpriced_positions=int(counts[~priced].sum()),
+        prices_as_of=snapshot.as_of,
+        by_symbol=by_symbol,
+    )
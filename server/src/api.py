@@ -1,10 +1,19 @@
 
 from fastapi import APIRouter   
     
+from src.config import settings
 from src.auth.controller import router as auth_router
 from src.users.controller import router as users_router
-from src.trades.controller import router as trades_router
-from src.analytics.controller import router as analytics_router
+from src.internal.controller import router as internal_router
+from src.live.controller import router as live_router
+
+# USE_ASYNC_DB switches the trades/analytics routes to the async stack (same API)
+if settings.USE_ASYNC_DB:
+    from src.trades.async_controller import router as trades_router
+    from src.analytics.async_controller import router as analytics_router
+else:
+    from src.trades.controller import router as trades_router
+    from src.analytics.controller import router as analytics_router
 
 def register_routes(app):
     app.include_router(auth_router)
@@ -13,4 +22,8 @@ def register_routes(app):
     
     app.include_router(trades_router)
 
-    app.include_router(analytics_router)
\ No newline at end of file
+    app.include_router(analytics_router)
+
+    app.include_router(live_router)
+
+    app.include_router(internal_router)
@@ -0,0 +1,104 @@
+"""
+Password hashing off the event loop.
+
+bcrypt costs tens to hundreds of milliseconds of pure CPU per call. Running it
+inline in an async route blocks the whole worker, so logins and registrations
+go through a dedicated, bounded process pool instead:
+- PASSWORD_HASH_WORKERS processes do the hashing (no GIL contention with the API)
+- at most PASSWORD_HASH_QUEUE_DEPTH more calls may wait for a free worker;
+  beyond that we fail fast with 503 instead of queueing without limit.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from src.config import settings
+from ..exceptions import ServiceUnavailableException
+
+logger = logging.getLogger(__name__)
+
+# min == max == default: any hash made with a different cost reports needs_update,
+# so it gets transparently re-hashed on the next successful login.
+bcrypt_context = CryptContext(
+    schemes=['bcrypt'], 
+    deprecated='auto',
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+
+# Module level so they can be pickled into the worker processes
+def _hash(password: str) -> str:
+    return bcrypt_context.hash(password)
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return bcrypt_context.verify_and_update(password, hashed_password)
+
+class PasswordHasher:
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Only touched from the event loop, no lock needed
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency_total_seconds = 0.0
+        self.latency_max_seconds = 0.0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs threads (anyio, DB pool) is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, 
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self.in_flight >= self.workers + self.queue_depth:
+            self.rejected += 1
+            raise ServiceUnavailableException("Authentication is busy, please retry shortly")
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_flight -= 1
+            self.completed += 1
+            self.latency_total_seconds += elapsed
+            self.latency_max_seconds = max(self.latency_max_seconds, elapsed)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash). new_hash is set when the stored hash used another cost."""
+        return await self._submit(_verify_and_update, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_capacity": self.queue_depth,
+            "in_flight": self.in_flight,
+            "queued": max(self.in_flight - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_avg_ms": round(self.latency_total_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+            "latency_max_ms": round(self.latency_max_seconds * 1000, 3),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_DEPTH)
@@ -2,32 +2,46 @@ from datetime import timedelta, datetime, timezone
 from typing import Annotated
 from uuid import uuid4
 from fastapi import Depends
-from passlib.context import CryptContext
+from fastapi.concurrency import run_in_threadpool
 import jwt
 from jwt import PyJWTError
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 
+from src.analytics import rollup
 from src.config import settings
 from src.entities.user import User, UserRole
 from . import models
+from .hashing import bcrypt_context, password_hasher
 from ..exceptions import AuthenticationError
 
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl='auth/login')
-bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
+# Blocking helpers, for scripts (create_admin, seed_data). Requests use password_hasher.
 def get_password_hash(password: str) -> str:
     return bcrypt_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt_context.verify(plain_password, hashed_password)
 
-def authenticate_user(email: str, password: str, db: Session) -> User | bool:
-    user = db.query(User).filter(User.email == email).first()
+def _get_user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
+
+def _save_password_hash(db: Session, user: User, hashed_password: str):
+    user.hashed_password = hashed_password
+    db.commit()
+
+async def authenticate_user(email: str, password: str, db: Session) -> User | bool:
+    # DB calls go to the threadpool, bcrypt to the hashing pool: the event loop never blocks
+    user = await run_in_threadpool(_get_user_by_email, db, email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         return False
+    # Stored hash uses an outdated cost (BCRYPT_ROUNDS changed): upgrade it transparently
+    if new_hash:
+        await run_in_threadpool(_save_password_hash, db, user, new_hash)
     return user
 
 def create_access_token(user: User, expires_delta: timedelta) -> str:
@@ -57,8 +71,8 @@ def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]) -> models.To
 
 CurrentUser = Annotated[models.TokenData, Depends(get_current_user)]
 
-def login_for_access_token(form_data: OAuth2PasswordRequestForm, db: Session) -> models.Token:
-    user = authenticate_user(form_data.username, form_data.password, db)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm, db: Session) -> models.Token:
+    user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         raise AuthenticationError("Incorrect email or password")
     
@@ -67,9 +81,19 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm, db: Session) ->
     
     return models.Token(access_token=token, token_type='bearer')
 
-def register_user(db: Session, req: models.RegisterUserRequest) -> models.Token:
+def _is_taken(db: Session, email: str, username: str) -> bool:
+    return db.query(User).filter((User.email == email) | (User.username == username)).first() is not None
+
+def _insert_user(db: Session, user: User) -> User:
+    db.add(user)
+    rollup.bump_platform_version(db)
+    db.commit()
+    db.refresh(user)
+    return user
+
+async def register_user(db: Session, req: models.RegisterUserRequest) -> models.Token:
     
-    if db.query(User).filter((User.email == req.email) | (User.username == req.username)).first():
+    if await run_in_threadpool(_is_taken, db, req.email, req.username):
         raise AuthenticationError("Email or Username already taken")
 
     
@@ -77,13 +101,11 @@ def register_user(db: Session, req: models.RegisterUserRequest) -> models.Token:
         id=uuid4(),
         email=req.email,
         username=req.username,
-        hashed_password=get_password_hash(req.password),
+        hashed_password=await password_hasher.hash(req.password),
         role=UserRole.TRADER
     )
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    new_user = await run_in_threadpool(_insert_user, db, new_user)
 
     token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(new_user, token_expires)
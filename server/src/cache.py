@@ -0,0 +1,234 @@
+"""
+Small response cache with pluggable backends.
+
+    cache = ResponseCache(backend_from_url("memory://"), ttl=60)
+    summary = cache.get_or_compute(namespace, "summary", params, Model, compute)
+
+Entries are pydantic models stored as JSON bytes, grouped by namespace (e.g.
+a user id) so all of a namespace's entries can be dropped at once when the
+underlying data changes.
+
+Backends (selected by URL):
+  memory://          in-process LRU with TTL and a memory budget (default)
+  redis://host/db    shared between workers/hosts, needs the `redis` package
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Type, TypeVar
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+class CacheBackend(ABC):
+    """Stores bytes under string keys, grouped by namespace."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: bytes, ttl: float):
+        ...
+
+    @abstractmethod
+    def delete_namespace(self, namespace: str) -> int:
+        """Drops every entry of the namespace, returns how many were dropped."""
+
+    def stats(self) -> dict:
+        return {}
+
+class MemoryBackend(CacheBackend):
+    """
+    Per-process LRU. Entries expire after their TTL and the least recently used
+    ones are evicted once the stored values exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple[bytes, float, str]]" = OrderedDict()
+        self._namespaces: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _drop(self, key: str):
+        value, _, namespace = self._entries.pop(key)
+        self._bytes -= len(value)
+        keys = self._namespaces.get(namespace)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._namespaces[namespace]
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: float):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.monotonic() + ttl, namespace)
+            self._namespaces.setdefault(namespace, set()).add(key)
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete_namespace(self, namespace: str) -> int:
+        with self._lock:
+            keys = list(self._namespaces.get(namespace, ()))
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes,
+                    "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+class RedisBackend(CacheBackend):
+    """
+    Shared cache for multi-worker deployments. Redis handles expiry and
+    eviction (configure maxmemory-policy allkeys-lru on the server); each
+    namespace keeps a set of its keys so it can be invalidated from any worker.
+    `client` can be any object with the redis-py API (e.g. fakeredis in tests).
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "tradelog:cache:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("The redis:// cache backend needs the 'redis' package") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _namespace_key(self, namespace: str) -> str:
+        return f"{self.prefix}ns:{namespace}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: float):
+        ttl_ms = max(1, int(ttl * 1000))
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, value, px=ttl_ms)
+        pipe.sadd(self._namespace_key(namespace), self.prefix + key)
+        pipe.pexpire(self._namespace_key(namespace), ttl_ms)
+        pipe.execute()
+
+    def delete_namespace(self, namespace: str) -> int:
+        namespace_key = self._namespace_key(namespace)
+        keys = self.client.smembers(namespace_key)
+        if keys:
+            self.client.delete(*keys)
+        self.client.delete(namespace_key)
+        return len(keys)
+
+def backend_from_url(url: str, max_bytes: int = 16 * 1024 * 1024) -> CacheBackend:
+    if url.startswith("memory://"):
+        return MemoryBackend(max_bytes)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache backend URL '{url}'")
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def make_key(namespace: str, name: str, params: dict) -> str:
+        encoded = json.dumps(params, sort_keys=True, default=str).encode()
+        return f"{namespace}:{name}:{hashlib.sha1(encoded).hexdigest()}"
+
+    def get(self, namespace: str, name: str, params: dict, model: Type[T]) -> Optional[T]:
+        """The cached value, None on a miss (or when caching is disabled)."""
+        if not self.enabled:
+            return None
+
+        key = self.make_key(namespace, name, params)
+        # A broken shared store must not take the endpoint down: fall back to computing
+        try:
+            cached = self.backend.get(key)
+        except Exception:
+            self.errors += 1
+            logger.exception("Cache read failed")
+            cached = None
+
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return model.model_validate_json(cached)
+
+    def put(self, namespace: str, name: str, params: dict, value: BaseModel):
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(namespace, self.make_key(namespace, name, params), value.model_dump_json().encode(), self.ttl)
+        except Exception:
+            self.errors += 1
+            logger.exception("Cache write failed")
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        name: str,
+        params: dict,
+        model: Type[T],
+        compute: Callable[[], T]
+    ) -> T:
+        cached = self.get(namespace, name, params, model)
+        if cached is not None:
+            return cached
+        value = compute()
+        self.put(namespace, name, params, value)
+        return value
+
+    def invalidate(self, namespace: str):
+        try:
+            self.backend.delete_namespace(namespace)
+            self.invalidations += 1
+        except Exception:
+            self.errors += 1
+            logger.exception(f"Cache invalidation failed for '{namespace}'")
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            **self.backend.stats()
+        }
@@ -0,0 +1,67 @@
+"""
+Conditional GET (ETag / If-None-Match) for the polled read endpoints.
+
+    @router.get("/", dependencies=[conditional_get()])
+
+The dependency runs before the route: it looks up the caller's data version
+(one indexed read on user_trade_stats, see rollup.get_data_version) and
+answers 304 Not Modified right away when the client already has it. Otherwise
+the ETag is attached to the normal 200 response.
+"""
+import hashlib
+from typing import Callable
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from src.auth.models import TokenData
+from src.auth.service import CurrentUser
+from src.database.core import DbSession, AsyncDbSession
+from src.entities.user import UserRole
+from src.analytics import rollup
+
+VersionFunc = Callable[[TokenData, Session], str]
+
+def data_version(current_user: TokenData, db: Session) -> str:
+    """Admins see every user's trades, so they get the platform-wide version."""
+    if current_user.role == UserRole.ADMIN:
+        return "p" + rollup.get_data_version(db)
+    return "u" + rollup.get_data_version(db, UUID(current_user.user_id))
+
+def make_etag(request: Request, current_user: TokenData, version: str) -> str:
+    # The same URL returns different data per user and per query string
+    scope = f"{current_user.user_id}|{current_user.role}|{request.url.path}|{request.url.query}"
+    return f'W/"{version}-{hashlib.sha1(scope.encode()).hexdigest()[:16]}"'
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110): W/ prefixes are ignored
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+def check_not_modified(request: Request, response: Response, current_user: TokenData, version: str):
+    etag = make_etag(request, current_user, version)
+    headers = {
+        "ETag": etag,
+        # Always revalidate; responses are per user
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+def conditional_get(version: VersionFunc = data_version):
+    def dependency(request: Request, response: Response, current_user: CurrentUser, db: DbSession):
+        check_not_modified(request, response, current_user, version(current_user, db))
+    return Depends(dependency)
+
+def async_conditional_get(version: VersionFunc = data_version):
+    """Same as conditional_get() for the async routers."""
+    async def dependency(request: Request, response: Response, current_user: CurrentUser, db: AsyncDbSession):
+        current = await db.run_sync(lambda session: version(current_user, session))
+        check_not_modified(request, response, current_user, current)
+    return Depends(dependency)
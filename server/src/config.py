@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +7,93 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # Password hashing: bcrypt cost, worker processes and how many calls may wait
+    # for a worker before login/register answer 503
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_DEPTH: int = 32
+
+    # Serve trades/analytics through the async stack (AsyncEngine + asyncpg)
+    USE_ASYNC_DB: bool = False
+    # Defaults to DATABASE_URL with the asyncpg driver
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool (per engine, i.e. per worker process). Defaults match SQLAlchemy's.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds to wait for a free connection before failing
+    DB_POOL_TIMEOUT: float = 30
+    # Recycle connections older than this many seconds (-1 = never)
+    DB_POOL_RECYCLE: int = -1
+    # Test connections with a ping on checkout (drops stale ones after DB restarts)
+    DB_POOL_PRE_PING: bool = False
+
+    # Admin dashboard snapshot: refresh every N seconds (0 = compute per request),
+    # or sooner once this many trade writes happened in the worker
+    ADMIN_SNAPSHOT_INTERVAL_SECONDS: float = 30
+    ADMIN_SNAPSHOT_REFRESH_AFTER_MUTATIONS: int = 100
+
+    # Admin top trades: best N closed trades kept in memory per window, reloaded
+    # from the database every N seconds (writes in other workers show up then)
+    TOP_TRADES_CAPACITY: int = 1000
+    TOP_TRADES_MAX_AGE_SECONDS: float = 60
+
+    # Live updates (GET /live/stream): memory:// reaches this worker's streams only,
+    # redis://... all workers. QUEUE_SIZE messages buffered per stream before a slow
+    # client is reset to a `resync`; EVENT_BACKLOG trade events waiting to be built.
+    LIVE_BROKER_URL: str = "memory://"
+    LIVE_QUEUE_SIZE: int = 100
+    LIVE_EVENT_BACKLOG: int = 1000
+    LIVE_MAX_TRADES_PER_UPDATE: int = 100
+    LIVE_KEEPALIVE_SECONDS: float = 15
+
+    # Per-user analytics response cache: memory:// (per worker) or redis://... (shared).
+    # TTL 0 disables it; MAX_BYTES bounds the in-memory backend.
+    ANALYTICS_CACHE_URL: str = "memory://"
+    ANALYTICS_CACHE_TTL_SECONDS: float = 300
+    ANALYTICS_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # Mark-to-market prices for open positions: file:///path/prices.json
+    # ({"BTC/USDT": 64250.5, ...}, reloaded when it changes) or memory:// (set
+    # in-process, tests). The default is prices.json in the working directory;
+    # publish to it with `python -m src.prices set BTC/USDT=64250.5` (see prices.py).
+    PRICE_SOURCE_URL: str = "file://prices.json"
+
+    # Serve Prometheus metrics at /metrics to admins (per-route latency, SQL counts, pool stats)
+    METRICS_ENABLED: bool = True
+
+    # SQL diagnostics (development/staging): log statements slower than the threshold
+    # (with their EXPLAIN plan) and warn when a request repeats one statement too often
+    SQL_DIAGNOSTICS: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 100
+    SLOW_QUERY_EXPLAIN: bool = True
+    N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Token-bucket rate limits per route class ("N/second|minute|hour|day": burst of N,
+    # refilled at N per period). Auth routes are keyed on the client address,
+    # the others on the user id. Storage: memory:// (per worker) or sqlite:///path
+    # (shared by the workers of a host; default is a file in the temp directory).
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORAGE_URL: Optional[str] = None
+    RATE_LIMIT_AUTH: str = "10/minute"
+    RATE_LIMIT_READ: str = "300/minute"
+    RATE_LIMIT_WRITE: str = "60/minute"
+    RATE_LIMIT_ANALYTICS: str = "30/minute"
+    # Take the client address from X-Forwarded-For (only behind a trusted proxy)
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+
+    # Rows fetched per round trip by the streaming trade export
+    EXPORT_BATCH_SIZE: int = 2000
+
+    # Bulk import: max rows per call, and rows per multi-row INSERT
+    # (10 columns per row, Postgres allows 65535 bind parameters per statement)
+    BULK_IMPORT_MAX_ROWS: int = 100_000
+    BULK_INSERT_CHUNK_SIZE: int = 1000
+    # Bulk close/delete: max explicit trade ids per call
+    BULK_WRITE_MAX_IDS: int = 10_000
+    # Account purge: trades deleted per transaction
+    USER_PURGE_CHUNK_SIZE: int = 5000
+
     class Config:
         env_file = ".env"
 
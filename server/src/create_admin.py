@@ -1,4 +1,5 @@
 import logging
+from src.analytics import rollup
 from src.database.core import SessionLocal
 from src.entities.user import User, UserRole
 from src.auth.service import get_password_hash
@@ -32,6 +33,7 @@ def create_initial_admin():
         )
         
         db.add(new_admin)
+        rollup.bump_platform_version(db)
         db.commit()
         logger.info("Admin user created successfully!")
         
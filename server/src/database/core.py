@@ -1,12 +1,33 @@
 
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 from fastapi import Depends
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
 from src.config import settings
+from . import pool_metrics, diagnostics
+from src import metrics
+
+# Pool sizing is per engine, i.e. per worker process
+POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
 
 # Connect to Postgres using the URL from .env
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(
+    settings.DATABASE_URL, 
+    poolclass=pool_metrics.pool_class_for("sync"), 
+    **POOL_OPTIONS
+)
+pool_metrics.instrument(engine, "sync")
+metrics.instrument_engine(engine)
+if settings.SQL_DIAGNOSTICS:
+    diagnostics.instrument(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -19,4 +40,38 @@ def get_db():
     finally:
         db.close()
         
-DbSession = Annotated[Session, Depends(get_db)]
\ No newline at end of file
+DbSession = Annotated[Session, Depends(get_db)]
+
+# ---------------------------------------------------------
+# Async stack (opt-in with USE_ASYNC_DB, see api.register_routes)
+# ---------------------------------------------------------
+
+def get_async_database_url() -> str:
+    """ASYNC_DATABASE_URL if set, else DATABASE_URL with the asyncpg driver."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+# Only built when enabled, so asyncpg is not needed by the sync stack
+async_engine = None
+if settings.USE_ASYNC_DB:
+    async_engine = create_async_engine(
+        get_async_database_url(),
+        poolclass=pool_metrics.pool_class_for("async", pool_metrics.InstrumentedAsyncQueuePool),
+        **POOL_OPTIONS
+    )
+    pool_metrics.instrument(async_engine, "async")
+    metrics.instrument_engine(async_engine.sync_engine)
+    if settings.SQL_DIAGNOSTICS:
+        diagnostics.instrument(async_engine.sync_engine)
+
+# expire_on_commit=False: attributes must stay readable after commit without implicit (sync) IO
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+) if async_engine else None
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+AsyncDbSession = Annotated[AsyncSession, Depends(get_async_db)]
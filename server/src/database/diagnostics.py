@@ -0,0 +1,152 @@
+"""
+Opt-in SQL diagnostics (SQL_DIAGNOSTICS=true), meant for development/staging.
+
+- Slow query log: any statement slower than SLOW_QUERY_THRESHOLD_MS is logged
+  with its parameters and (SLOW_QUERY_EXPLAIN) its EXPLAIN plan.
+- N+1 detector: DiagnosticsMiddleware counts statements per request by shape
+  (the compiled SQL text, parameters excluded) and warns when one shape ran
+  more than N_PLUS_ONE_THRESHOLD times, e.g. a lazy load inside a loop.
+
+QueryCounter / assert_max_queries() are always available; the pytest fixture
+in pytest_plugin.py builds on them to put a query budget on endpoints.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+_MAX_PARAMS_LOGGED = 500
+
+# Statement shapes of the current request (set by DiagnosticsMiddleware)
+_request_shapes: ContextVar[Optional[Counter]] = ContextVar("request_shapes", default=None)
+
+def _short(value, limit: int = _MAX_PARAMS_LOGGED) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+def _explain_text(conn, statement: str, parameters) -> str:
+    # Re-entrancy guard: the EXPLAIN itself goes through the same engine events
+    conn.info["diagnostics_explaining"] = True
+    try:
+        # In a SAVEPOINT: a failing EXPLAIN must not abort the request's transaction
+        with conn.begin_nested():
+            rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters or ()).fetchall()
+        return "\n".join(row[0] for row in rows)
+    except Exception as e:
+        logger.warning(f"EXPLAIN failed: {e}")
+        return "(EXPLAIN failed)"
+    finally:
+        conn.info["diagnostics_explaining"] = False
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("diagnostics_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["diagnostics_query_start"].pop()) * 1000
+    if conn.info.get("diagnostics_explaining"):
+        return
+
+    shapes = _request_shapes.get()
+    if shapes is not None:
+        shapes[statement] += 1
+
+    if elapsed_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    message = f"Slow query ({elapsed_ms:.1f}ms): {statement}\nparameters: {_short(parameters)}"
+    explainable = statement.lstrip().upper().startswith(_EXPLAINABLE)
+    if settings.SLOW_QUERY_EXPLAIN and explainable and not executemany:
+        message += "\nplan:\n" + _explain_text(conn, statement, parameters)
+    logger.warning(message)
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("diagnostics_query_start"):
+        conn.info["diagnostics_query_start"].pop()
+
+def instrument(engine):
+    """Registers the diagnostics hooks (pass AsyncEngine.sync_engine for async engines)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+class DiagnosticsMiddleware:
+    """Pure ASGI middleware reporting repeated statement shapes per request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        shapes = Counter()
+        token = _request_shapes.set(shapes)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_shapes.reset(token)
+            route = getattr(scope.get("route"), "path", scope["path"])
+            for statement, count in shapes.items():
+                if count > settings.N_PLUS_ONE_THRESHOLD:
+                    logger.warning(
+                        f"Possible N+1 in {scope['method']} {route}: "
+                        f"same statement executed {count} times: {statement}"
+                    )
+
+# ---------------------------------------------------------
+# Query counting (tests, benchmarks)
+# ---------------------------------------------------------
+
+def default_engines() -> list:
+    from src.database import core
+    engines = [core.engine]
+    if core.async_engine is not None:
+        engines.append(core.async_engine.sync_engine)
+    return engines
+
+class QueryCounter:
+    """Records every statement executed on the engines while active."""
+
+    def __init__(self, engines: Optional[list] = None):
+        self.engines = engines if engines is not None else default_engines()
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self):
+        self.statements = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not conn.info.get("diagnostics_explaining"):
+            self.statements.append(statement)
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+
+@contextmanager
+def assert_max_queries(limit: int, engines: Optional[list] = None):
+    """Fails with the list of statements if the block executes more than `limit`."""
+    with QueryCounter(engines) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(f"  {i + 1}. {statement}" for i, statement in enumerate(counter.statements))
+        raise AssertionError(f"Expected at most {limit} queries, {counter.count} were executed:\n{listing}")
@@ -0,0 +1,177 @@
+"""
+EXPLAIN-based index check for the hot-path service queries.
+
+HOT_PATH_CHECKS runs the read paths of trades/service.py and
+analytics/service.py, each with the index it was written for. Every SQL
+statement a check issues is EXPLAINed with the normal planner settings, and
+the check fails unless its index appears in one of the plans. So it catches
+a query that no longer matches its index as well as a plan that stopped
+choosing it. tests/test_query_plans.py runs the checks on the benchmark
+dataset; against the configured database:
+
+    python -m benchmarks.dataset generate
+    python -m src.database.explain
+
+The data must be realistically sized: on a handful of rows a Seq Scan is the
+cheapest plan for everything.
+"""
+import json
+import logging
+import sys
+from contextlib import contextmanager
+from typing import Callable, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from src.auth.models import TokenData
+from src.entities.trade import Trade, TradeStatus
+from src.entities.user import UserRole
+from src.trades import service as trades_service
+from src.analytics import service as analytics_service
+from src.analytics import models as analytics_models
+
+logger = logging.getLogger(__name__)
+
+@contextmanager
+def capture_statements(engine: Engine):
+    """Collects (statement, parameters) for every SELECT run on the engine."""
+    captured: List[Tuple[str, object]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def explain(conn: Connection, statement: str, parameters=None, analyze: bool = False) -> dict:
+    """Returns the top-level plan node of EXPLAIN (FORMAT JSON)."""
+    options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+    raw = conn.exec_driver_sql(f"EXPLAIN ({options}) {statement}", parameters or ()).scalar()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    return plan[0]["Plan"]
+
+def iter_plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+def seq_scanned_tables(plan: dict) -> List[str]:
+    return [
+        node.get("Relation Name")
+        for node in iter_plan_nodes(plan)
+        if node.get("Node Type") == "Seq Scan"
+    ]
+
+def plan_indexes(plan: dict) -> Set[str]:
+    """Names of the indexes the plan scans (Index, Index Only and Bitmap Index Scans)."""
+    return {node["Index Name"] for node in iter_plan_nodes(plan) if "Index Name" in node}
+
+# ---------------------------------------------------------
+# Hot-path checks
+# ---------------------------------------------------------
+
+class PlanContext(NamedTuple):
+    db: Session
+    trader: TokenData
+    admin: TokenData
+    # Second page of the trader's trade list
+    cursor: str
+
+class PlanCheck(NamedTuple):
+    name: str
+    # Must appear in the plan of (at least) one of the statements run
+    index: str
+    run: Callable[[PlanContext], object]
+
+def _top_trades(ctx: PlanContext):
+    # The service answers from the in-memory top-K once loaded; this is its query
+    top = analytics_service.top_trades_index.windows[analytics_models.TimeWindow.ALL]
+    return ctx.db.execute(top.query(10)).all()
+
+# The platform-wide equity curve reads every closed trade, so a Seq Scan is its
+# right plan and it has no check here.
+HOT_PATH_CHECKS: List[PlanCheck] = [
+    PlanCheck("trades.get_trades (trader)", "ix_trades_user_entry_date",
+              lambda ctx: trades_service.get_trades(ctx.trader, ctx.db, limit=20)),
+    PlanCheck("trades.get_trades (trader, status)", "ix_trades_user_status_entry_date",
+              lambda ctx: trades_service.get_trades(ctx.trader, ctx.db, limit=20, status=TradeStatus.OPEN)),
+    PlanCheck("trades.get_trades (trader, cursor)", "ix_trades_user_entry_date",
+              lambda ctx: trades_service.get_trades(ctx.trader, ctx.db, limit=20, cursor=ctx.cursor)),
+    PlanCheck("trades.get_trades (admin)", "ix_trades_entry_date",
+              lambda ctx: trades_service.get_trades(ctx.admin, ctx.db, limit=20, include_total=False)),
+    PlanCheck("analytics.compute_pnl_chart (trader)", "ix_trades_user_exit_date_closed",
+              lambda ctx: analytics_service.compute_pnl_chart(ctx.trader, ctx.db)),
+    PlanCheck("analytics.compute_performance_stats (trader)", "ix_trades_user_exit_date_closed",
+              lambda ctx: analytics_service.compute_performance_stats(ctx.trader, ctx.db)),
+    PlanCheck("analytics.compute_leaderboard (30d)", "ix_trades_exit_date_closed",
+              lambda ctx: analytics_service.compute_leaderboard(
+                  ctx.db, analytics_models.TimeWindow.MONTH, analytics_models.LeaderboardMetric.NET_PNL
+              )),
+    PlanCheck("analytics top trades (all time)", "ix_trades_pnl_closed", _top_trades),
+]
+
+def plan_context(db: Session, user_id: Optional[UUID] = None) -> PlanContext:
+    """Checks run as `user_id` (default: the first user with trades) and as an admin."""
+    if user_id is None:
+        user_id = db.scalar(select(Trade.user_id).limit(1))
+        if user_id is None:
+            raise SystemExit("No trades found. Generate a dataset first (python -m benchmarks.dataset generate).")
+
+    trader = TokenData(user_id=str(user_id), role=UserRole.TRADER.value)
+    admin = TokenData(user_id=str(user_id), role=UserRole.ADMIN.value)
+    first_page = trades_service.get_trades(trader, db, limit=1, include_total=False)
+    cursor = first_page["next_cursor"] or trades_service.encode_cursor(
+        first_page["data"][0]["entry_date"], first_page["data"][0]["id"]
+    )
+    db.rollback()
+    return PlanContext(db, trader, admin, cursor)
+
+def check_plan(ctx: PlanContext, check: PlanCheck) -> Optional[str]:
+    """Runs the check and EXPLAINs what it issued; returns the problem, or None when the index is used."""
+    engine = ctx.db.get_bind()
+    with capture_statements(engine) as statements:
+        check.run(ctx)
+    ctx.db.rollback()
+
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plans.append((statement, explain(conn, statement, parameters)))
+
+    used = set().union(*(plan_indexes(plan) for _, plan in plans))
+    if check.index in used:
+        logger.info(f"✅ {check.name}: {', '.join(sorted(used))}")
+        return None
+
+    listing = "\n".join(
+        f"  indexes {sorted(plan_indexes(plan)) or '-'}, seq scans {seq_scanned_tables(plan) or '-'}: {statement}"
+        for statement, plan in plans
+    )
+    logger.warning(f"❌ {check.name}: {check.index} not used")
+    return f"{check.name}: expected {check.index} in the plan, got:\n{listing}"
+
+if __name__ == "__main__":
+    from src.database.core import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+
+    db = SessionLocal()
+    try:
+        ctx = plan_context(db)
+        problems = [problem for check in HOT_PATH_CHECKS if (problem := check_plan(ctx, check))]
+    finally:
+        db.close()
+
+    for problem in problems:
+        logger.error(problem)
+    if problems:
+        logger.error(f"{len(problems)} hot-path queries do not use their index on trades.")
+        sys.exit(1)
+    logger.info("All hot-path queries use their index on trades.")
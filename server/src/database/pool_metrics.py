@@ -0,0 +1,132 @@
+"""
+Connection pool instrumentation.
+
+Counters are fed by SQLAlchemy pool events (connect / checkout / checkin /
+invalidate / soft_invalidate). The time spent waiting for a connection is not
+visible to events, so the engines use a QueuePool subclass that times
+Pool.connect(), i.e. the queueing for a free slot (plus the connect itself
+when a new connection has to be opened).
+"""
+import logging
+import threading
+import time
+from typing import Dict, Type
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total_seconds = 0.0
+        self.wait_max_seconds = 0.0
+        self.pool = None
+
+    def incr(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_seconds += seconds
+            if seconds > self.wait_max_seconds:
+                self.wait_max_seconds = seconds
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            avg_wait = self.wait_total_seconds / self.wait_count if self.wait_count else 0.0
+            return {
+                "name": self.name,
+                "pool_size": pool.size() if pool else 0,
+                "checked_out": pool.checkedout() if pool else 0,
+                "checked_in": pool.checkedin() if pool else 0,
+                # QueuePool.overflow() starts at -pool_size; only positive values are extra connections
+                "overflow_in_use": max(pool.overflow(), 0) if pool else 0,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(avg_wait * 1000, 3),
+                "wait_max_ms": round(self.wait_max_seconds * 1000, 3),
+                "wait_total_ms": round(self.wait_total_seconds * 1000, 3),
+            }
+
+# SQLAlchemy logs pools under "<module>.<class>" and keeps its own loggers at WARNING
+# by default; do the same for our subclasses so dispose/recreate stays quiet.
+logging.getLogger(__name__).setLevel(logging.WARNING)
+
+# name -> metrics, for every instrumented engine
+registry: Dict[str, PoolMetrics] = {}
+
+class _TimedConnectMixin:
+    metrics: PoolMetrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.metrics.incr("timeouts")
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start)
+
+class InstrumentedQueuePool(_TimedConnectMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_TimedConnectMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_class_for(name: str, base: Type = InstrumentedQueuePool) -> Type:
+    """
+    A pool class bound to the metrics of `name`. Pool.recreate() (dispose,
+    invalidation) instantiates the same class, so the binding survives.
+    """
+    metrics = registry.setdefault(name, PoolMetrics(name))
+    return type(base.__name__, (base,), {"metrics": metrics})
+
+def instrument(engine, name: str) -> PoolMetrics:
+    """Attaches the pool event listeners of `name` to an engine (sync or async)."""
+    metrics = registry.setdefault(name, PoolMetrics(name))
+    sync_engine = getattr(engine, "sync_engine", engine)
+    metrics.pool = sync_engine.pool
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.incr("connects")
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.incr("checkouts")
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.incr("checkins")
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr("invalidations")
+
+    @event.listens_for(sync_engine, "soft_invalidate")
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr("soft_invalidations")
+
+    # Engine.dispose() swaps in a new pool instance
+    @event.listens_for(sync_engine, "engine_disposed")
+    def on_disposed(engine):
+        metrics.pool = engine.pool
+
+    return metrics
@@ -0,0 +1,24 @@
+"""
+pytest fixtures for query budgets (registered in server/conftest.py).
+
+    def test_trade_list(client, auth, assert_max_queries):
+        with assert_max_queries(3):
+            client.get("/trades/", headers=auth.reader)
+
+tests/test_query_budgets.py holds the budgets of the hot endpoints.
+
+The block fails with the full list of executed statements when the budget is
+exceeded, so an N+1 regression shows up in CI with the offending query.
+"""
+import pytest
+
+from .diagnostics import QueryCounter, assert_max_queries as _assert_max_queries
+
+@pytest.fixture
+def assert_max_queries():
+    return _assert_max_queries
+
+@pytest.fixture
+def query_counter():
+    with QueryCounter() as counter:
+        yield counter
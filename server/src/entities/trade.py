@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Computed, String, Float, DateTime, ForeignKey, Enum, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -15,26 +15,53 @@ class TradeStatus(str, enum.Enum):
     OPEN = "OPEN"
     CLOSED = "CLOSED"
 
+# Realized PnL of a closed trade. The only place the formula lives: trades.pnl is a
+# column generated by Postgres from it (migration: e5b81f3c0d92_generated_trade_pnl),
+# so every write path (ORM, bulk INSERT, UPDATE ... RETURNING) gets the same value.
+PNL_EXPRESSION = (
+    "CASE WHEN status = 'CLOSED' AND exit_price IS NOT NULL THEN "
+    "CASE WHEN side = 'LONG' THEN (exit_price - entry_price) * quantity "
+    "ELSE (entry_price - exit_price) * quantity END "
+    "END"
+)
+
 class Trade(Base):
     __tablename__ = 'trades'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     
     symbol = Column(String, nullable=False, index=True) 
     side = Column(Enum(TradeSide), nullable=False)
     quantity = Column(Float, nullable=False)
     
     entry_price = Column(Float, nullable=False)
-    entry_date = Column(DateTime(timezone=True), server_default=func.now())
+    entry_date = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     exit_price = Column(Float, nullable=True)
     exit_date = Column(DateTime(timezone=True), nullable=True)
     
     status = Column(Enum(TradeStatus), default=TradeStatus.OPEN, index=True)
-    pnl = Column(Float, nullable=True) 
+    pnl = Column(Float, Computed(PNL_EXPRESSION, persisted=True), nullable=True)
 
     owner = relationship("src.entities.user.User", back_populates="trades")
 
+    # Hot-path indexes, matched to the queries in trades/service.py and analytics/service.py
+    # (migration: a7d3c9e2f150_hot_path_trade_indexes)
+    __table_args__ = (
+        # Trade list (+ keyset cursor) for a trader, with and without a status filter
+        Index('ix_trades_user_entry_date', 'user_id', entry_date.desc(), id.desc()),
+        Index('ix_trades_user_status_entry_date', 'user_id', 'status', entry_date.desc(), id.desc()),
+        # Trade list for admins (all users)
+        Index('ix_trades_entry_date', entry_date.desc(), id.desc()),
+        # Equity curve per user / platform wide: index-only scans thanks to INCLUDE (pnl)
+        Index('ix_trades_user_exit_date_closed', 'user_id', 'exit_date',
+              postgresql_where=text("status = 'CLOSED'"), postgresql_include=['pnl']),
+        Index('ix_trades_exit_date_closed', 'exit_date',
+              postgresql_where=text("status = 'CLOSED'"), postgresql_include=['pnl']),
+        # Top profitable trades
+        Index('ix_trades_pnl_closed', pnl.desc(), postgresql_where=text("status = 'CLOSED'")),
+    )
+
     def __repr__(self):
         return f"<Trade(symbol='{self.symbol}', side='{self.side}', status='{self.status}')>"
\ No newline at end of file
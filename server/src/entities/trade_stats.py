@@ -0,0 +1,65 @@
+
+from sqlalchemy import Column, String, Float, Integer, BigInteger, DateTime, ForeignKey, Index, Sequence
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from ..database.core import Base 
+
+# Shared by all users, so every trade write gets a version number that is
+# greater than any version handed out before (used for ETags)
+trade_data_version_seq = Sequence('trade_data_version_seq', metadata=Base.metadata)
+
+class UserTradeStats(Base):
+    """
+    Per-user rollup of the trades table, maintained incrementally by the
+    trade write paths (see src/analytics/rollup.py).
+    """
+    __tablename__ = 'user_trade_stats'
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+
+    closed_count = Column(Integer, nullable=False, default=0)
+    open_count = Column(Integer, nullable=False, default=0)
+
+    total_pnl = Column(Float, nullable=False, default=0.0)
+    gross_profit = Column(Float, nullable=False, default=0.0)
+    # Stored as a negative number, same as SUM(pnl) over losing trades
+    gross_loss = Column(Float, nullable=False, default=0.0)
+    win_count = Column(Integer, nullable=False, default=0)
+    loss_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped (from trade_data_version_seq) by every write that touches this user's trades
+    data_version = Column(BigInteger, nullable=False, index=True,
+                          server_default=trade_data_version_seq.next_value())
+
+    def __repr__(self):
+        return f"<UserTradeStats(user_id='{self.user_id}', closed={self.closed_count}, open={self.open_count})>"
+
+class PlatformDataVersion(Base):
+    """
+    One row (id 1), set from trade_data_version_seq when a user is created or
+    purged. The platform version is the greatest of it and every user's
+    data_version, so it never goes back: a purge that removes the user with
+    the highest version moves this row above it.
+    """
+    __tablename__ = 'platform_data_version'
+
+    id = Column(Integer, primary_key=True)
+    data_version = Column(BigInteger, nullable=False, server_default=trade_data_version_seq.next_value())
+
+class UserSymbolPnl(Base):
+    """Realized PnL per (user, symbol), used for the 'Best Asset' card."""
+    __tablename__ = 'user_symbol_pnl'
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    symbol = Column(String, primary_key=True)
+
+    closed_count = Column(Integer, nullable=False, default=0)
+    total_pnl = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        Index('ix_user_symbol_pnl_user_total', 'user_id', total_pnl.desc()),
+    )
+
+    def __repr__(self):
+        return f"<UserSymbolPnl(user_id='{self.user_id}', symbol='{self.symbol}', total_pnl={self.total_pnl})>"
@@ -21,7 +21,8 @@ class User(Base):
     role = Column(Enum(UserRole), default=UserRole.TRADER, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    trades = relationship("Trade", back_populates="owner", cascade="all, delete-orphan")
+    # The database deletes a user's trades (ON DELETE CASCADE); the ORM never loads them for it
+    trades = relationship("Trade", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<User(username='{self.username}', email='{self.email}', role='{self.role}')>"
\ No newline at end of file
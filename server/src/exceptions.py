@@ -28,6 +28,24 @@ class AuthenticationError(TradeLogException):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+class ServiceUnavailableException(TradeLogException):
+    """For shedding load (e.g. a saturated worker pool): the client should retry later"""
+    def __init__(self, detail: str = "Service temporarily unavailable", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, 
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+class RateLimitExceededException(TradeLogException):
+    """The caller's token bucket for this route class is empty"""
+    def __init__(self, retry_after: int = 1, headers: dict | None = None):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS, 
+            detail="Rate limit exceeded",
+            headers={**(headers or {}), "Retry-After": str(retry_after)},
+        )
+
 async def global_exception_handler(request: Request, exc: Exception):
     """Catches any unhandled server errors"""
     return JSONResponse(
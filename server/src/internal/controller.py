@@ -0,0 +1,40 @@
+"""
+Internal/operational endpoints (admin only). Numbers are per worker process.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from ..auth.service import CurrentUser
+from src.entities.user import UserRole
+from src.database import pool_metrics
+from src.auth.hashing import password_hasher
+from src.analytics.service import analytics_cache
+from src.rate_limiter import limiter
+from src.live.service import live_updates
+from src.live.models import LiveStats
+from . import models
+
+def require_admin(current_user: CurrentUser):
+    if current_user.role != UserRole.ADMIN.value:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+
+router = APIRouter(prefix="/internal", tags=["Internal"], dependencies=[Depends(require_admin)])
+
+@router.get("/pool", response_model=models.PoolStatsResponse)
+def get_pool_stats():
+    return {"pools": [metrics.snapshot() for metrics in pool_metrics.registry.values()]}
+
+@router.get("/hashing", response_model=models.HashingStats)
+def get_hashing_stats():
+    return password_hasher.stats()
+
+
+@router.get("/cache", response_model=models.CacheStats)
+def get_cache_stats():
+    return analytics_cache.stats()
+
+@router.get("/rate-limits", response_model=models.RateLimitStats)
+def get_rate_limit_stats():
+    return limiter.stats()
+
+@router.get("/live", response_model=LiveStats)
+def get_live_stats():
+    return live_updates.stats()
@@ -0,0 +1,58 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class PoolStats(BaseModel):
+    name: str
+    pool_size: int
+    checked_out: int
+    checked_in: int
+    overflow_in_use: int
+    connects: int
+    checkouts: int
+    checkins: int
+    invalidations: int
+    soft_invalidations: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_max_ms: float
+    wait_total_ms: float
+
+class PoolStatsResponse(BaseModel):
+    pools: List[PoolStats]
+
+
+class HashingStats(BaseModel):
+    workers: int
+    queue_capacity: int
+    in_flight: int
+    queued: int
+    completed: int
+    rejected: int
+    latency_avg_ms: float
+    latency_max_ms: float
+
+class CacheStats(BaseModel):
+    backend: str
+    ttl_seconds: float
+    hits: int
+    misses: int
+    invalidations: int
+    errors: int
+    # Only reported by the in-memory backend
+    entries: Optional[int] = None
+    bytes: Optional[int] = None
+    max_bytes: Optional[int] = None
+    evictions: Optional[int] = None
+
+class RateClassStats(BaseModel):
+    name: str
+    capacity: float
+    refill_per_second: float
+    # Decisions taken by this worker (the buckets themselves may be shared)
+    allowed: int
+    rejected: int
+
+class RateLimitStats(BaseModel):
+    store: str
+    enabled: bool
+    classes: List[RateClassStats]
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from ..auth.service import CurrentUser
+from . import service
+
+router = APIRouter(prefix="/live", tags=["Live"])
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_updates(current_user: CurrentUser):
+    """
+    Server-sent events for the dashboard. After each trade write: an `update`
+    event whose data is a LiveUpdate (JSON). A `resync` event means updates
+    were dropped: refetch /trades, /analytics/summary and /analytics/chart.
+    """
+    return StreamingResponse(
+        service.stream(current_user),
+        media_type="text/event-stream",
+        # No proxy buffering, or events arrive in batches
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,201 @@
+"""
+Fan-out of live-update messages to the open event streams of this worker.
+
+    hub.publish("user:<id>", "update", payload)         # any thread
+    subscription = hub.subscribe("user:<id>", loop)     # on the event loop
+    frame = await subscription.next(timeout)            # SSE-framed bytes
+
+Messages go through a broker, so a write handled by one worker reaches the
+streams held by the others (selected by URL):
+  memory://          in-process: the local stand-in for a pub/sub server,
+                     enough for a single worker (and tests)
+  redis://host/db    Redis PUBLISH / PSUBSCRIBE, needs the `redis` package
+
+Backpressure: each stream buffers at most LIVE_QUEUE_SIZE messages. A client
+that falls further behind does not get to hold memory or slow anyone else
+down: its backlog is dropped and replaced by one `resync` event, which tells
+it to refetch the full state.
+"""
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+RESYNC_FRAME = b"event: resync\ndata: {}\n\n"
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+def frame(event: str, data: bytes) -> bytes:
+    """One server-sent event (data must be a single line, e.g. compact JSON)."""
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+Deliver = Callable[[str, bytes], None]
+
+class Broker(ABC):
+    # True when messages never leave this process (no subscriber here: nobody to tell)
+    local = False
+
+    @abstractmethod
+    def start(self, deliver: Deliver):
+        ...
+
+    @abstractmethod
+    def publish(self, channel: str, data: bytes):
+        ...
+
+    def stop(self):
+        pass
+
+class LocalBroker(Broker):
+    local = True
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    def publish(self, channel: str, data: bytes):
+        if self._deliver is not None:
+            self._deliver(channel, data)
+
+    def stop(self):
+        self._deliver = None
+
+class RedisBroker(Broker):
+    """
+    Every worker PSUBSCRIBEs to the prefix and delivers to its own streams.
+    `client` can be any object with the redis-py API (e.g. fakeredis in tests).
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "tradelog:live:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("The redis:// live-update broker needs the 'redis' package") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._worker = None
+
+    def start(self, deliver: Deliver):
+        def on_message(message):
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            deliver(channel[len(self.prefix):], message["data"])
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(**{f"{self.prefix}*": on_message})
+        self._worker = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def publish(self, channel: str, data: bytes):
+        self.client.publish(f"{self.prefix}{channel}", data)
+
+    def stop(self):
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+
+def broker_from_url(url: str) -> Broker:
+    if url.startswith("memory://"):
+        return LocalBroker()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBroker(url)
+    raise ValueError(f"Unsupported live-update broker URL '{url}'")
+
+class Subscription:
+    """One open stream. Only touched on its event loop (the hub hops over with call_soon_threadsafe)."""
+
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.channel = channel
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.resyncs = 0
+
+    def offer(self, data: bytes):
+        if self.queue.full():
+            # Slow consumer: drop what it has not read yet, it refetches instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            data = RESYNC_FRAME
+            self.resyncs += 1
+        self.queue.put_nowait(data)
+
+    async def next(self, timeout: float) -> Optional[bytes]:
+        """The next frame, or None when nothing arrived within timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class LiveHub:
+    def __init__(self, broker: Broker, max_queue: int):
+        self.broker = broker
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._published = 0
+        self._delivered = 0
+        self._resyncs = 0
+
+    def start(self):
+        self.broker.start(self._deliver)
+
+    def stop(self):
+        self.broker.stop()
+
+    def subscribe(self, channel: str, loop: asyncio.AbstractEventLoop) -> Subscription:
+        subscription = Subscription(channel, loop, self.max_queue)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.channel]
+            self._resyncs += subscription.resyncs
+
+    def wants(self, channel: str) -> bool:
+        """False when nobody can be listening on the channel (skip building the message)."""
+        return not self.broker.local or channel in self._subscriptions
+
+    def publish(self, channel: str, event: str, data: bytes):
+        self._published += 1
+        self.broker.publish(channel, frame(event, data))
+
+    def resync(self, channel: str):
+        self._published += 1
+        self.broker.publish(channel, RESYNC_FRAME)
+
+    def _deliver(self, channel: str, data: bytes):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, data)
+            except RuntimeError:
+                # Its loop is gone (shutdown); the stream's cleanup unsubscribes it
+                continue
+            self._delivered += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            streams = [s for subscribers in self._subscriptions.values() for s in subscribers]
+            return {
+                "broker": type(self.broker).__name__,
+                "streams": len(streams),
+                "channels": len(self._subscriptions),
+                "queue_capacity": self.max_queue,
+                "published": self._published,
+                "delivered": self._delivered,
+                "resyncs": self._resyncs + sum(s.resyncs for s in streams),
+            }
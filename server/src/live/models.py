@@ -0,0 +1,33 @@
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel
+from src.trades.events import TradeAction
+from src.trades.models import TradeResponse
+from src.analytics.models import PnLPoint, UserAnalyticsSummary
+
+class LiveUpdate(BaseModel):
+    """Data of an `update` event on GET /live/stream, sent after a trade write."""
+    action: TradeAction
+    # Trades as written (created, changed, closed or imported)
+    trades: List[TradeResponse] = []
+    deleted: List[UUID] = []
+    # More trades were written than listed: refetch the trade list
+    truncated: bool = False
+    # The writer's new dashboard numbers (not sent on the admin stream)
+    summary: Optional[UserAnalyticsSummary] = None
+    # Points appended to the equity curve (GET /analytics/chart without bucket)
+    chart_points: List[PnLPoint] = []
+    # The change is not an append (edit, delete, backdated close): refetch the chart
+    chart_reset: bool = False
+
+class LiveStats(BaseModel):
+    broker: str
+    streams: int
+    channels: int
+    queue_capacity: int
+    published: int
+    delivered: int
+    # Streams reset because their client fell LIVE_QUEUE_SIZE messages behind
+    resyncs: int
+    # Trade events not turned into updates because the builder was behind
+    dropped_events: int
@@ -0,0 +1,185 @@
+"""
+Live dashboard updates, built from the trade events.
+
+events.publish() runs inside the writing request, so the subscriber here only
+queues the event. A background thread turns it into a compact LiveUpdate
+(with its own session) and publishes it through the hub:
+
+  user:<id>   the trades written, the writer's new summary and, for closes,
+              the points appended to the equity curve
+  admin       the trades written by anyone (admins see every trade)
+
+The summary is the cached /analytics/summary response, so building it also
+warms the cache for the writer's next poll.
+"""
+import asyncio
+import logging
+import queue
+import threading
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.auth.models import TokenData
+from src.config import settings
+from src.database.core import SessionLocal
+from src.entities.trade import Trade, TradeStatus
+from src.entities.user import UserRole
+from src.analytics import service as analytics_service
+from src.analytics.models import PnLPoint
+from src.trades import events
+from src.trades.models import TradeResponse
+from . import models
+from .hub import KEEPALIVE_FRAME, LiveHub, broker_from_url
+
+logger = logging.getLogger(__name__)
+
+ADMIN_CHANNEL = "admin"
+
+def user_channel(user_id) -> str:
+    return f"user:{user_id}"
+
+def channel_for(current_user: TokenData) -> str:
+    if current_user.role == UserRole.ADMIN:
+        return ADMIN_CHANNEL
+    return user_channel(current_user.user_id)
+
+def _chart_delta(db: Session, event: events.TradeEvent, closed: list, truncated: bool):
+    """
+    (points appended to the user's equity curve, whether the client must refetch it instead).
+
+    The balance comes from the event's total_pnl: by the time the event is
+    handled, later writes may have moved the rollup row on. A later write that
+    changes the curve before these points sends its own reset.
+    """
+    if event.action == events.TradeAction.DELETED:
+        # Deletes carry no rows, so whether a closed trade went is unknown
+        return [], True
+    if not closed:
+        return [], False
+    if event.action == events.TradeAction.UPDATED or truncated or event.total_pnl is None:
+        return [], True
+
+    # Appending is only right if every other closed trade comes earlier on the curve
+    previous_last = db.scalar(
+        select(func.max(Trade.exit_date))
+        .where(Trade.user_id == event.user_id, Trade.status == TradeStatus.CLOSED,
+               Trade.id.notin_([trade["id"] for trade in closed]))
+    )
+    if previous_last is not None and closed[0]["exit_date"] <= previous_last:
+        return [], True
+
+    balance = event.total_pnl - sum(trade["pnl"] for trade in closed)
+    points = []
+    for trade in closed:
+        balance += trade["pnl"]
+        points.append(PnLPoint(date=trade["exit_date"], pnl=round(trade["pnl"], 2), cumulative_pnl=round(balance, 2)))
+    return points, False
+
+def build_update(db: Session, event: events.TradeEvent, max_trades: int, with_user_data: bool = True) -> models.LiveUpdate:
+    truncated = len(event.trade_ids) > max_trades
+    update = models.LiveUpdate(
+        action=event.action,
+        trades=[TradeResponse.model_validate(trade) for trade in event.trades[:max_trades]],
+        deleted=list(event.trade_ids[:max_trades]) if event.action == events.TradeAction.DELETED else [],
+        truncated=truncated
+    )
+    if not with_user_data:
+        return update
+
+    # Same order as the chart: (exit_date, id)
+    closed = sorted(
+        (trade for trade in event.trades
+         if trade["status"] == TradeStatus.CLOSED and trade["exit_date"] is not None and trade["pnl"] is not None),
+        key=lambda trade: (trade["exit_date"], trade["id"])
+    )
+    update.chart_points, update.chart_reset = _chart_delta(db, event, closed, truncated)
+    trader = TokenData(user_id=str(event.user_id), role=UserRole.TRADER.value)
+    update.summary = analytics_service.get_user_analytics(trader, db)
+    return update
+
+class LiveUpdates:
+    def __init__(self, hub: LiveHub, max_events: int, max_trades: int):
+        self.hub = hub
+        self.max_trades = max_trades
+        self._events: queue.Queue = queue.Queue(max_events)
+        self._thread: Optional[threading.Thread] = None
+        self._dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def on_trade_event(self, event: events.TradeEvent):
+        channel = user_channel(event.user_id)
+        if not (self.hub.wants(channel) or self.hub.wants(ADMIN_CHANNEL)):
+            return
+        try:
+            self._events.put_nowait(event)
+        except queue.Full:
+            # Builder too far behind: the writer's streams refetch instead
+            self._dropped += 1
+            self.hub.resync(channel)
+            self.hub.resync(ADMIN_CHANNEL)
+
+    def publish(self, db: Session, event: events.TradeEvent):
+        channel = user_channel(event.user_id)
+        if self.hub.wants(channel):
+            update = build_update(db, event, self.max_trades)
+            self.hub.publish(channel, "update", update.model_dump_json().encode())
+        if self.hub.wants(ADMIN_CHANNEL):
+            update = build_update(db, event, self.max_trades, with_user_data=False)
+            self.hub.publish(ADMIN_CHANNEL, "update", update.model_dump_json().encode())
+
+    def _run(self):
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            db = SessionLocal()
+            try:
+                self.publish(db, event)
+            except Exception:
+                logger.exception(f"Live update for {event.action.value} by {event.user_id} failed")
+                self.hub.resync(user_channel(event.user_id))
+            finally:
+                db.close()
+
+    def start(self):
+        if self.running:
+            return
+        self.hub.start()
+        events.subscribe(self.on_trade_event)
+        self._thread = threading.Thread(target=self._run, name="live-updates", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        events.unsubscribe(self.on_trade_event)
+        if self._thread is not None:
+            self._events.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.hub.stop()
+
+    def stats(self) -> dict:
+        return {**self.hub.stats(), "dropped_events": self._dropped}
+
+hub = LiveHub(broker_from_url(settings.LIVE_BROKER_URL), max_queue=settings.LIVE_QUEUE_SIZE)
+live_updates = LiveUpdates(hub, max_events=settings.LIVE_EVENT_BACKLOG, max_trades=settings.LIVE_MAX_TRADES_PER_UPDATE)
+
+async def stream(current_user: TokenData) -> AsyncIterator[bytes]:
+    """
+    The SSE body: `update` events, `resync` when the client fell behind, and a
+    comment line every LIVE_KEEPALIVE_SECONDS. Ends when the client disconnects
+    (Starlette cancels the generator).
+    """
+    subscription = hub.subscribe(channel_for(current_user), asyncio.get_running_loop())
+    try:
+        # Reconnect delay for EventSource; a reconnecting client should refetch
+        yield b"retry: 3000\n\n"
+        while True:
+            frame = await subscription.next(settings.LIVE_KEEPALIVE_SECONDS)
+            yield frame if frame is not None else KEEPALIVE_FRAME
+    finally:
+        hub.unsubscribe(subscription)
@@ -1,26 +1,37 @@
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
 
 from src.config import settings
 from src.logging import configure_logging
 from src.api import register_routes
-from src.rate_limiter import limiter
+from src.metrics import MetricsMiddleware, metrics_endpoint
+from src.database.diagnostics import DiagnosticsMiddleware
 from src.database.core import Base, engine
+from src.auth.hashing import password_hasher
+from src.analytics.service import platform_snapshot
+from src.live.service import live_updates
+from src.internal.controller import require_admin
 
 configure_logging()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    platform_snapshot.start()
+    live_updates.start()
+    yield
+    live_updates.stop()
+    platform_snapshot.stop()
+    password_hasher.shutdown()
+
 app = FastAPI(
     title="TradeLog API",
     description="Backend for the TradeLog Internship Assignment",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 origins = ["http://localhost:3000", "http://localhost:5173"] 
 
 app.add_middleware(
@@ -31,6 +42,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.SQL_DIAGNOSTICS:
+    app.add_middleware(DiagnosticsMiddleware)
+
+# Added last so it wraps everything else (CORS included) and sees the final response
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    # Route names, traffic and pool state: admin only, like /internal/*
+    app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False, dependencies=[Depends(require_admin)])
+
 
 register_routes(app)
 
@@ -0,0 +1,262 @@
+"""
+Prometheus-style metrics (text exposition format) served at GET /metrics
+(admin only: scrape it with an admin bearer token).
+
+- MetricsMiddleware (pure ASGI, so streaming responses are not buffered)
+  records per-route latency and response size histograms and an in-flight
+  gauge. Routes are labelled by their template ("/trades/{trade_id}"), never
+  by the raw path, to keep label cardinality bounded.
+- instrument_engine() hooks before/after_cursor_execute on an engine and adds
+  every statement's duration to the current request (via a ContextVar), which
+  gives the per-request SQL statement count and DB time histograms.
+
+Everything is in-process and per worker; the hot path is a few dict updates
+under a lock per request and two perf_counter() calls per statement.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Response
+from sqlalchemy import event
+
+from src.database import pool_metrics
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, labels: Tuple[str, ...] = ()):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in values
+        ]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, labels: Tuple[str, ...] = ()):
+        self.inc(-amount, labels)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...], buckets: Iterable[float]):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        lines = self.header()
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labels, key, f'le="{_format_value(float(bound))}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+ROUTE_LABELS = ("method", "route")
+
+request_latency = Histogram(
+    "http_request_duration_seconds", "Request latency by route.",
+    ("method", "route", "status"), LATENCY_BUCKETS
+)
+requests_in_flight = Gauge("http_requests_in_flight", "Requests currently being handled.")
+response_size = Histogram("http_response_size_bytes", "Response body size by route.", ROUTE_LABELS, SIZE_BUCKETS)
+request_statements = Histogram(
+    "http_request_sql_statements", "SQL statements executed per request.", ROUTE_LABELS, STATEMENT_BUCKETS
+)
+request_db_time = Histogram(
+    "http_request_db_seconds", "Cumulative time spent in SQL statements per request.", ROUTE_LABELS, DB_TIME_BUCKETS
+)
+statements_total = Counter("db_statements_total", "SQL statements executed (in or outside requests).")
+db_time_total = Counter("db_statement_seconds_total", "Time spent executing SQL statements.")
+
+# Unlabelled series are reported from the start (as 0)
+for _metric in (requests_in_flight, statements_total, db_time_total):
+    _metric.inc(0)
+
+REGISTRY: List[Metric] = [
+    request_latency, requests_in_flight, response_size,
+    request_statements, request_db_time, statements_total, db_time_total,
+]
+
+# ---------------------------------------------------------
+# Per-request SQL accounting
+# ---------------------------------------------------------
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+# Set by the middleware; sync routes run in a threadpool with a copy of the
+# context, which still points at the same RequestStats object
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+    statements_total.inc()
+    db_time_total.inc(elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute: drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("metrics_query_start"):
+        conn.info["metrics_query_start"].pop()
+
+def instrument_engine(engine):
+    """Registers the SQL accounting hooks (pass AsyncEngine.sync_engine for async engines)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+# ---------------------------------------------------------
+# ASGI middleware
+# ---------------------------------------------------------
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    # Unmatched paths (404s, scanners) share one label
+    return path or "unmatched"
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            requests_in_flight.dec()
+            current_request.reset(token)
+
+            labels = (scope["method"], _route_label(scope))
+            request_latency.observe(elapsed, labels + (str(status_code),))
+            response_size.observe(size, labels)
+            request_statements.observe(stats.statements, labels)
+            request_db_time.observe(stats.db_seconds, labels)
+
+# ---------------------------------------------------------
+# Exposition
+# ---------------------------------------------------------
+
+_POOL_GAUGES = ("pool_size", "checked_out", "overflow_in_use")
+_POOL_COUNTERS = ("connects", "checkouts", "invalidations", "timeouts")
+
+def _render_pools() -> List[str]:
+    snapshots = [metrics.snapshot() for metrics in pool_metrics.registry.values()]
+    lines = []
+    for field in _POOL_GAUGES:
+        lines += [f"# HELP db_pool_{field} Connection pool {field.replace('_', ' ')}.",
+                  f"# TYPE db_pool_{field} gauge"]
+        lines += [f'db_pool_{field}{{pool="{s["name"]}"}} {s[field]}' for s in snapshots]
+    for field in _POOL_COUNTERS:
+        lines += [f"# HELP db_pool_{field}_total Connection pool {field}.",
+                  f"# TYPE db_pool_{field}_total counter"]
+        lines += [f'db_pool_{field}_total{{pool="{s["name"]}"}} {s[field]}' for s in snapshots]
+    lines += ["# HELP db_pool_wait_seconds_total Time spent waiting for a pooled connection.",
+              "# TYPE db_pool_wait_seconds_total counter"]
+    lines += [f'db_pool_wait_seconds_total{{pool="{s["name"]}"}} {s["wait_total_ms"] / 1000}' for s in snapshots]
+    return lines
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    lines += _render_pools()
+    return "\n".join(lines) + "\n"
+
+def metrics_endpoint():
+    return Response(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,172 @@
+"""
+Market price sources for marking open positions to market.
+
+    source = price_source_from_url("file:///srv/tradelog/prices.json")
+    snapshot = source.snapshot()   # PriceSnapshot(prices, version, as_of)
+    source.update({"BTC/USDT": 64250.5})
+
+A snapshot is an immutable {symbol: price} map with a version string that
+changes whenever any price does, so valuations can be cached per version.
+
+Sources (selected by URL):
+  memory://              in-process map, set with update() (tests, scripts)
+  file:///path.json      {"BTC/USDT": 64250.5, ...}, reloaded when the file's
+                         mtime changes; any process (cron, a feed consumer)
+                         can publish prices by replacing the file atomically.
+                         file://prices.json (no third slash) is relative to the
+                         working directory.
+
+Publishing to the configured source from the command line (file:// only: a
+memory:// source lives inside the server process):
+
+    python -m src.prices set BTC/USDT=64250.5 ETH/USDT=3120
+    python -m src.prices publish feed.json        # replaces every price
+    python -m src.prices show
+"""
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class PriceSnapshot(NamedTuple):
+    prices: Mapping[str, float]
+    version: str
+    as_of: Optional[datetime]
+
+EMPTY_SNAPSHOT = PriceSnapshot({}, "0", None)
+
+def _normalize(prices: Mapping[str, float]) -> Dict[str, float]:
+    # Trade symbols are stored stripped and upper-cased (see TradeBase.uppercase_symbol)
+    return {symbol.strip().upper(): float(price) for symbol, price in prices.items() if price is not None}
+
+class PriceSource(ABC):
+    @abstractmethod
+    def snapshot(self) -> PriceSnapshot:
+        ...
+
+    @abstractmethod
+    def update(self, prices: Mapping[str, float], replace: bool = False):
+        """Merges (or with replace=True, swaps in) new prices and bumps the version."""
+
+class MemoryPriceSource(PriceSource):
+    def __init__(self, prices: Optional[Mapping[str, float]] = None):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot = EMPTY_SNAPSHOT
+        if prices:
+            self.update(prices)
+
+    def update(self, prices: Mapping[str, float], replace: bool = False):
+        with self._lock:
+            merged = {} if replace else dict(self._snapshot.prices)
+            merged.update(_normalize(prices))
+            self._version += 1
+            self._snapshot = PriceSnapshot(merged, f"m{self._version}", datetime.now(timezone.utc))
+
+    def snapshot(self) -> PriceSnapshot:
+        return self._snapshot
+
+class FilePriceSource(PriceSource):
+    """JSON object of symbol -> price. A file that fails to parse keeps the last good prices."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # (inode, mtime): a replaced file is a new inode even when two writes
+        # land within the filesystem's timestamp granularity
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._snapshot = EMPTY_SNAPSHOT
+
+    def snapshot(self) -> PriceSnapshot:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self._snapshot
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp == self._stamp:
+            return self._snapshot
+
+        with self._lock:
+            if stamp != self._stamp:
+                try:
+                    with open(self.path) as f:
+                        prices = _normalize(json.load(f))
+                    as_of = datetime.fromtimestamp(stat.st_mtime_ns / 1e9, tz=timezone.utc)
+                    self._snapshot = PriceSnapshot(prices, f"f{stat.st_ino}.{stat.st_mtime_ns}", as_of)
+                except (OSError, ValueError, TypeError, AttributeError):
+                    logger.exception(f"Could not load prices from {self.path}, keeping the previous ones")
+                self._stamp = stamp
+        return self._snapshot
+
+    def update(self, prices: Mapping[str, float], replace: bool = False):
+        """
+        Writes a new file next to the old one and renames it over it, so
+        readers (in every worker) never see a half-written file.
+        """
+        merged = {} if replace else dict(self.snapshot().prices)
+        merged.update(_normalize(prices))
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".prices-", suffix=".json")
+        try:
+            # The file object owns fd from here on: closed however the block exits
+            with os.fdopen(fd, "w") as f:
+                # mkstemp creates it private; the server may run as another user
+                os.fchmod(f.fileno(), 0o644)
+                json.dump(merged, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+def price_source_from_url(url: str) -> PriceSource:
+    if url.startswith("memory://"):
+        return MemoryPriceSource()
+    if url.startswith("file://"):
+        return FilePriceSource(url[len("file://"):])
+    raise ValueError(f"Unsupported price source URL '{url}'")
+
+def _parse_assignments(arguments) -> Dict[str, float]:
+    prices = {}
+    for argument in arguments:
+        symbol, separator, price = argument.rpartition("=")
+        if not separator or not symbol:
+            raise ValueError(f"Expected SYMBOL=PRICE, got '{argument}'")
+        prices[symbol] = float(price)
+    return prices
+
+if __name__ == "__main__":
+    from src.config import settings
+
+    logging.basicConfig(level=logging.INFO)
+
+    command, arguments = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("show", [])
+    source = price_source_from_url(settings.PRICE_SOURCE_URL)
+    if command != "show" and not isinstance(source, FilePriceSource):
+        logger.error(f"PRICE_SOURCE_URL is {settings.PRICE_SOURCE_URL}: only a file:// source can be published to.")
+        sys.exit(2)
+
+    try:
+        if command == "set" and arguments:
+            source.update(_parse_assignments(arguments))
+        elif command == "publish" and len(arguments) == 1:
+            with open(arguments[0]) as f:
+                source.update(json.load(f), replace=True)
+        elif command != "show":
+            logger.error("Usage: python -m src.prices [show | set SYMBOL=PRICE ... | publish FILE.json]")
+            sys.exit(2)
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        logger.error(f"Prices not published: {e}")
+        sys.exit(1)
+
+    snapshot = source.snapshot()
+    for symbol, price in sorted(snapshot.prices.items()):
+        print(f"{symbol}\t{price}")
+    logger.info(f"{len(snapshot.prices)} prices as of {snapshot.as_of} from {settings.PRICE_SOURCE_URL}")
@@ -1,5 +1,258 @@
+"""
+Token-bucket rate limiting, per identity and per route class.
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+Every route class (auth, read, write, analytics) has its own budget, written
+like "60/minute": a bucket holds up to 60 tokens and refills at 60 per minute,
+so a client can burst up to the capacity and then continues at the refill rate.
+Authenticated routes are keyed on the JWT identity (user id), so one user's
+analytics burst only drains that user's analytics bucket; the auth routes
+(no token yet) are keyed on the client address.
 
-limiter = Limiter(key_func=get_remote_address)
\ No newline at end of file
+Buckets live in a store selected by RATE_LIMIT_STORAGE_URL:
+  memory://              per process (tests, single worker)
+  sqlite:///path/to.db   shared by every worker process on the host (default,
+                         a file in the temp directory)
+
+Rejected requests get 429 with Retry-After; allowed ones carry
+X-RateLimit-Limit / X-RateLimit-Remaining. A failing store lets the request
+through (logged) rather than taking the API down with it.
+"""
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Depends, Request, Response
+
+from src.config import settings
+from .auth.service import CurrentUser
+from .exceptions import RateLimitExceededException
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+class Rate(NamedTuple):
+    capacity: float
+    refill_per_second: float
+
+def parse_rate(text: str) -> Rate:
+    """'20/minute' -> 20 tokens, refilled at 20 per minute. Also accepts '20/30' (seconds)."""
+    count, _, period = text.strip().partition("/")
+    period = period.strip().lower().rstrip("s") or "second"
+    seconds = _PERIODS[period] if period in _PERIODS else float(period)
+    return Rate(float(count), float(count) / seconds)
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: float
+    # Seconds until the request would be allowed (0 when allowed)
+    retry_after: float
+
+def _take(tokens: float, updated: float, now: float, rate: Rate, cost: float):
+    """Refills a bucket up to `now` and tries to take `cost` tokens from it."""
+    tokens = min(rate.capacity, tokens + max(0.0, now - updated) * rate.refill_per_second)
+    if tokens >= cost:
+        return tokens - cost, Decision(True, tokens - cost, 0.0)
+    return tokens, Decision(False, tokens, (cost - tokens) / rate.refill_per_second)
+
+class BucketStore(ABC):
+    @abstractmethod
+    def consume(self, key: str, rate: Rate, cost: float = 1.0) -> Decision:
+        ...
+
+    @abstractmethod
+    def reset(self):
+        ...
+
+class MemoryBucketStore(BucketStore):
+    """Per-process buckets."""
+
+    def __init__(self):
+        self._buckets: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, rate: Rate, cost: float = 1.0) -> Decision:
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (rate.capacity, now))
+            tokens, decision = _take(tokens, updated, now, rate, cost)
+            self._buckets[key] = (tokens, now)
+        return decision
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+class SQLiteBucketStore(BucketStore):
+    """
+    Buckets in a SQLite file shared by the worker processes of one host. Each
+    consume is a single BEGIN IMMEDIATE transaction (read, refill, write), so
+    concurrent workers serialize on the file lock and never lose an update.
+    WAL with synchronous=OFF keeps that to a few microseconds; the data is
+    disposable, a crash only resets budgets.
+    """
+
+    # Buckets idle for longer than this are deleted (every PRUNE_EVERY consumes)
+    PRUNE_AFTER_SECONDS = 86400
+    PRUNE_EVERY = 10_000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # Guards _calls (consume runs in several threadpool threads)
+        self._lock = threading.Lock()
+        self._calls = 0
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread (sync routes run in the threadpool); a
+        # forked worker gets fresh connections as its pid differs
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def consume(self, key: str, rate: Rate, cost: float = 1.0) -> Decision:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row is not None else (rate.capacity, now)
+            tokens, decision = _take(tokens, updated, now, rate, cost)
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now)
+            )
+            with self._lock:
+                self._calls += 1
+                prune = self._calls % self.PRUNE_EVERY == 0
+            if prune:
+                conn.execute("DELETE FROM buckets WHERE updated < ?", (now - self.PRUNE_AFTER_SECONDS,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return decision
+
+    def reset(self):
+        self._connection().execute("DELETE FROM buckets")
+
+def store_from_url(url: Optional[str]) -> BucketStore:
+    if not url:
+        return SQLiteBucketStore(os.path.join(tempfile.gettempdir(), "tradelog-ratelimit.sqlite3"))
+    if url.startswith("memory://"):
+        return MemoryBucketStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteBucketStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported rate limit storage URL '{url}'")
+
+class RateClass(str, Enum):
+    AUTH = "auth"
+    READ = "read"
+    WRITE = "write"
+    ANALYTICS = "analytics"
+
+class RateLimiter:
+    def __init__(self, store: BucketStore, rates: Dict[RateClass, Rate], enabled: bool = True):
+        self.store = store
+        self.rates = rates
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.allowed = {rate_class.value: 0 for rate_class in rates}
+        self.rejected = {rate_class.value: 0 for rate_class in rates}
+
+    def hit(self, rate_class: RateClass, identity: str, response: Optional[Response] = None):
+        """Takes one token from the identity's bucket for the class, raises 429 if it is empty."""
+        if not self.enabled:
+            return
+        rate = self.rates[rate_class]
+        try:
+            decision = self.store.consume(f"{rate_class.value}:{identity}", rate)
+        except Exception:
+            logger.exception("Rate limit store failed, letting the request through")
+            return
+
+        with self._lock:
+            counts = self.allowed if decision.allowed else self.rejected
+            counts[rate_class.value] += 1
+
+        headers = {
+            "X-RateLimit-Limit": str(int(rate.capacity)),
+            "X-RateLimit-Remaining": str(int(decision.remaining)),
+        }
+        if not decision.allowed:
+            raise RateLimitExceededException(retry_after=max(1, int(decision.retry_after + 0.999)), headers=headers)
+        if response is not None:
+            response.headers.update(headers)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "store": type(self.store).__name__,
+                "enabled": self.enabled,
+                "classes": [
+                    {
+                        "name": rate_class.value,
+                        "capacity": rate.capacity,
+                        "refill_per_second": rate.refill_per_second,
+                        "allowed": self.allowed[rate_class.value],
+                        "rejected": self.rejected[rate_class.value],
+                    }
+                    for rate_class, rate in self.rates.items()
+                ],
+            }
+
+limiter = RateLimiter(
+    store_from_url(settings.RATE_LIMIT_STORAGE_URL),
+    {
+        RateClass.AUTH: parse_rate(settings.RATE_LIMIT_AUTH),
+        RateClass.READ: parse_rate(settings.RATE_LIMIT_READ),
+        RateClass.WRITE: parse_rate(settings.RATE_LIMIT_WRITE),
+        RateClass.ANALYTICS: parse_rate(settings.RATE_LIMIT_ANALYTICS),
+    },
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
+
+# ---------------------------------------------------------
+# Dependencies (sync, so the store is hit from the threadpool)
+# ---------------------------------------------------------
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+def client_address(request: Request) -> str:
+    # Behind the load balancer the socket peer is the balancer itself
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def limit_auth(request: Request, response: Response):
+    limiter.hit(RateClass.AUTH, client_address(request), response)
+
+def limit_trades(request: Request, response: Response, current_user: CurrentUser):
+    rate_class = RateClass.READ if request.method in _SAFE_METHODS else RateClass.WRITE
+    limiter.hit(rate_class, current_user.user_id, response)
+
+def limit_analytics(response: Response, current_user: CurrentUser):
+    limiter.hit(RateClass.ANALYTICS, current_user.user_id, response)
+
+AuthRateLimit = Depends(limit_auth)
+TradesRateLimit = Depends(limit_trades)
+AnalyticsRateLimit = Depends(limit_analytics)
@@ -0,0 +1,34 @@
+"""
+orjson-backed JSON response for hot read endpoints.
+
+Routes that return FastJSONResponse skip FastAPI's response_model validation
+(the model is still used for the OpenAPI docs), so the content must already
+have the response shape: plain dicts/lists with UUID, datetime and enum values,
+which orjson encodes natively.
+"""
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+def _default(value: Any):
+    # Types orjson only knows by exact class, e.g. asyncpg's UUID subclass
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        # OPT_UTC_Z: "2025-01-01T00:00:00Z", same as pydantic's output
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+def fast_json(content: Any, response: Response) -> FastJSONResponse:
+    """
+    Wraps content in a FastJSONResponse, keeping headers that dependencies set
+    on the injected `response` (FastAPI only merges them into responses it builds).
+    """
+    fast = FastJSONResponse(content)
+    fast.headers.update(response.headers)
+    return fast
@@ -1,6 +1,8 @@
 import logging
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
+from sqlalchemy import select
+from src.analytics import rollup
 from src.database.core import SessionLocal
 from src.entities.user import User, UserRole
 from src.entities.trade import Trade, TradeStatus, TradeSide
@@ -38,6 +40,7 @@ def seed_database():
                     created_at=datetime.now(timezone.utc)
                 )
                 db.add(new_user)
+                rollup.bump_platform_version(db)
                 db.commit()
                 db.refresh(new_user)
                 created_users[u["name"]] = new_user
@@ -64,7 +67,7 @@ def seed_database():
             entry_price=50000.0,
             exit_price=55000.0,
             status=TradeStatus.CLOSED,
-            pnl=10000.0,  # (55k - 50k) * 2
+            # pnl is generated by the database: (55k - 50k) * 2 = 10000
             entry_date=now - timedelta(days=10),
             exit_date=now - timedelta(days=2)
         ))
@@ -78,7 +81,6 @@ def seed_database():
             entry_price=20.0,
             exit_price=25.0,
             status=TradeStatus.CLOSED,
-            pnl=500.0,
             entry_date=now - timedelta(days=5),
             exit_date=now - timedelta(days=1)
         ))
@@ -94,7 +96,7 @@ def seed_database():
             entry_price=3000.0,
             exit_price=3200.0, # Price went up, Short loses
             status=TradeStatus.CLOSED,
-            pnl=-2000.0, # (3000 - 3200) * 10
+            # pnl (generated): (3000 - 3200) * 10 = -2000
             entry_date=now - timedelta(days=8),
             exit_date=now - timedelta(days=3)
         ))
@@ -110,7 +112,6 @@ def seed_database():
             entry_price=40000.0,
             exit_price=42000.0,
             status=TradeStatus.CLOSED,
-            pnl=1000.0,
             entry_date=now - timedelta(days=20),
             exit_date=now - timedelta(days=15)
         ))
@@ -123,7 +124,6 @@ def seed_database():
             quantity=1.0,
             entry_price=58000.0,
             status=TradeStatus.OPEN,
-            pnl=None, # Open trade
             entry_date=now - timedelta(hours=4),
             exit_date=None
         ))
@@ -136,22 +136,32 @@ def seed_database():
             quantity=1000.0,
             entry_price=0.10,
             status=TradeStatus.OPEN,
-            pnl=None,
             entry_date=now - timedelta(days=1),
             exit_date=None
         ))
 
-        # Bulk Insert (Only insert if user doesn't already have trades to avoid duplicates)
-        count = 0
-        for t in trades_to_add:
-            # Check if this specific trade ID exists (unlikely) or just rely on fresh DB
-            # Ideally, checks per user count, but for a seed script, appending is fine 
-            # if we assume clean slate or just adding more.
-            db.add(t)
-            count += 1
-        
+        # Bulk Insert (Only for users without trades, so re-running the seed adds no duplicates)
+        seeded_user_ids = set(db.scalars(
+            select(Trade.user_id).where(Trade.user_id.in_([u.id for u in created_users.values()])).distinct()
+        ))
+        new_trades = [t for t in trades_to_add if t.user_id not in seeded_user_ids]
+        if not new_trades:
+            logger.info("ℹ️ Seed users already have trades, nothing to add.")
+            return
+
+        db.add_all(new_trades)
+        db.flush()
+
+        # Trades are inserted directly, so bring the analytics rollups along in the
+        # same transaction (pnl is generated by the database, hence the read back)
+        inserted = db.execute(
+            select(Trade.user_id, Trade.symbol, Trade.status, Trade.pnl)
+            .where(Trade.id.in_([t.id for t in new_trades]))
+        )
+        rollup.apply_changes(db, added=[rollup.contribution_of(row) for row in inserted])
+
         db.commit()
-        logger.info(f"🚀 Successfully seeded {count} trades!")
+        logger.info(f"🚀 Successfully seeded {len(new_trades)} trades!")
 
     except Exception as e:
         logger.error(f"❌ Error seeding data: {e}")
@@ -0,0 +1,93 @@
+"""
+Async variant of controller.py (same routes and response models).
+Registered instead of it when USE_ASYNC_DB is on, see api.register_routes.
+"""
+from datetime import datetime
+from fastapi import APIRouter, Body, File, Query, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from typing import Any, List, Optional
+from uuid import UUID
+from ..database.core import AsyncDbSession
+from . import models, service, async_service
+from ..auth.service import CurrentUser
+from src.entities.trade import TradeStatus
+from src.conditional import async_conditional_get
+from src.responses import fast_json
+from src.rate_limiter import TradesRateLimit
+
+router = APIRouter(prefix="/trades", tags=["Trades"], dependencies=[TradesRateLimit])
+
+@router.post("/", response_model=models.TradeResponse, status_code=status.HTTP_201_CREATED)
+async def create_trade(db: AsyncDbSession, trade: models.TradeCreate, current_user: CurrentUser):
+    return await async_service.create_trade(current_user, db, trade)
+
+@router.post("/bulk", response_model=models.BulkImportResponse)
+async def import_trades(
+    db: AsyncDbSession, 
+    current_user: CurrentUser,
+    rows: List[Any] = Body(..., description="Array of TradeImport objects")
+):
+    return await async_service.import_trades(current_user, db, rows)
+
+@router.post("/bulk/csv", response_model=models.BulkImportResponse)
+async def import_trades_csv(db: AsyncDbSession, current_user: CurrentUser, file: UploadFile = File(...)):
+    # Lazy: the upload is read and parsed in the threadpool, together with the validation
+    return await async_service.import_trades(current_user, db, service.read_import_csv(file.file))
+
+@router.post("/bulk/close", response_model=models.BulkWriteResponse)
+async def close_trades(db: AsyncDbSession, req: models.BulkCloseRequest, current_user: CurrentUser):
+    return await async_service.close_trades(current_user, db, req)
+
+@router.post("/bulk/delete", response_model=models.BulkWriteResponse)
+async def delete_trades(db: AsyncDbSession, req: models.BulkDeleteRequest, current_user: CurrentUser):
+    return await async_service.delete_trades(current_user, db, req)
+
+@router.get("/", response_model=models.PaginatedTradeResponse, dependencies=[async_conditional_get()])
+async def get_trades(
+    db: AsyncDbSession, 
+    current_user: CurrentUser, 
+    response: Response,
+    skip: int = Query(0, ge=0), 
+    limit: int = Query(20, ge=1, le=500),
+    status: Optional[TradeStatus] = None,
+    cursor: Optional[str] = Query(None, description="Opaque `next_cursor` from a previous page (keyset mode)"),
+    include_total: Optional[bool] = Query(None, description="Defaults to true in offset mode, false in cursor mode"),
+    start_date: Optional[datetime] = Query(None, description="Only trades entered at or after this date"),
+    end_date: Optional[datetime] = Query(None, description="Only trades entered at or before this date")
+):
+    result = await async_service.get_trades(
+        current_user, db, skip, limit, status, cursor, include_total, start_date, end_date
+    )
+    return fast_json(result, response)
+
+# The export streams from its own server-side cursor (sync driver, iterated in the threadpool)
+@router.get("/export", response_class=StreamingResponse)
+async def export_trades(
+    current_user: CurrentUser,
+    format: models.ExportFormat = models.ExportFormat.CSV,
+    status: Optional[TradeStatus] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    media_type = "text/csv" if format == models.ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        service.export_trades(current_user, format, status, start_date, end_date),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="trades.{format.value}"'}
+    )
+
+@router.get("/{trade_id}", response_model=models.TradeResponse)
+async def get_trade(db: AsyncDbSession, trade_id: UUID, current_user: CurrentUser):
+    return await async_service.get_trade_by_id(current_user, db, trade_id)
+
+@router.put("/{trade_id}", response_model=models.TradeResponse)
+async def update_trade(db: AsyncDbSession, trade_id: UUID, update_data: models.TradeUpdate, current_user: CurrentUser):
+    return await async_service.update_trade(current_user, db, trade_id, update_data)
+
+@router.patch("/{trade_id}/close", response_model=models.TradeResponse)
+async def close_trade(db: AsyncDbSession, trade_id: UUID, close_data: models.TradeClose, current_user: CurrentUser):
+    return await async_service.close_trade(current_user, db, trade_id, close_data)
+
+@router.delete("/{trade_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_trade(db: AsyncDbSession, trade_id: UUID, current_user: CurrentUser):
+    await async_service.delete_trade(current_user, db, trade_id)
@@ -0,0 +1,113 @@
+"""
+Async trade services, used by async_controller.py when USE_ASYNC_DB is on.
+
+The business logic is NOT duplicated: the sync service runs through
+AsyncSession.run_sync(). SQLAlchemy executes that code in a greenlet on the
+event loop and asyncpg does the I/O, so no threadpool slot is held while
+waiting on Postgres. Results are turned into response models inside
+run_sync, because lazy loads (e.g. Trade.owner) cannot happen once we are
+back in async code.
+
+Whatever runs in run_sync blocks the event loop while it is not waiting on
+Postgres, so only the database steps go there:
+  - CPU work (import validation, bulk write results, rollup sums) runs in
+    the threadpool, between the database steps of the same transaction,
+  - trade events are published after the commit from the threadpool
+    (events.deferred), since subscribers may do blocking I/O.
+"""
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional, TypeVar
+from uuid import UUID
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.auth.models import TokenData
+from src.entities.trade import TradeStatus
+from src.analytics import rollup
+from . import events, models, service
+
+T = TypeVar("T")
+
+async def _write(db: AsyncSession, run: Callable[[Session], T]) -> T:
+    """run_sync() for a write: the events it publishes are delivered from the threadpool."""
+    with events.deferred() as pending:
+        result = await db.run_sync(run)
+    if pending:
+        await run_in_threadpool(events.deliver, *pending)
+    return result
+
+async def create_trade(current_user: TokenData, db: AsyncSession, trade: models.TradeCreate) -> models.TradeResponse:
+    def run(session):
+        return models.TradeResponse.model_validate(service.create_trade(current_user, session, trade))
+    return await _write(db, run)
+
+async def import_trades(current_user: TokenData, db: AsyncSession, rows: Iterable[Any]) -> models.BulkImportResponse:
+    """`rows` may be lazy (e.g. read_import_csv): it is consumed in the threadpool."""
+    prepared = await run_in_threadpool(service.prepare_import, current_user, rows)
+    inserted = await db.run_sync(lambda session: service.insert_import_rows(session, prepared.rows))
+    if inserted:
+        changes = await run_in_threadpool(
+            lambda: rollup.net_changes(added=[rollup.contribution_of(row) for row in inserted])
+        )
+
+        def commit(session):
+            totals = rollup.write_changes(session, changes)
+            session.commit()
+            return totals
+        totals = await db.run_sync(commit)
+        await run_in_threadpool(
+            lambda: events.deliver(service.imported_event(UUID(current_user.user_id), inserted, totals))
+        )
+    return service.import_response(prepared)
+
+async def close_trades(
+    current_user: TokenData, db: AsyncSession, req: models.BulkCloseRequest
+) -> models.BulkWriteResponse:
+    selected, exit_date = await db.run_sync(lambda session: service.bulk_close_rows(current_user, session, req))
+    outcome = await run_in_threadpool(service.bulk_close_outcome, current_user, selected, exit_date)
+    return await _write(db, lambda session: service.finish_bulk_write(session, outcome))
+
+async def delete_trades(
+    current_user: TokenData, db: AsyncSession, req: models.BulkDeleteRequest
+) -> models.BulkWriteResponse:
+    selected = await db.run_sync(lambda session: service.bulk_delete_rows(current_user, session, req))
+    outcome = await run_in_threadpool(service.bulk_delete_outcome, current_user, selected)
+    return await _write(db, lambda session: service.finish_bulk_write(session, outcome))
+
+async def get_trades(
+    current_user: TokenData, 
+    db: AsyncSession, 
+    skip: int = 0, 
+    limit: int = 20, 
+    status: TradeStatus = None,
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> dict:
+    # Already plain data (column tuples turned into dicts), nothing lazy to resolve
+    return await db.run_sync(lambda session: service.get_trades(
+        current_user, session, skip, limit, status, cursor, include_total, start_date, end_date
+    ))
+
+async def get_trade_by_id(current_user: TokenData, db: AsyncSession, trade_id: UUID) -> models.TradeResponse:
+    def run(session):
+        return models.TradeResponse.model_validate(service.get_trade_by_id(current_user, session, trade_id))
+    return await db.run_sync(run)
+
+async def update_trade(
+    current_user: TokenData, db: AsyncSession, trade_id: UUID, update_data: models.TradeUpdate
+) -> models.TradeResponse:
+    def run(session):
+        return models.TradeResponse.model_validate(service.update_trade(current_user, session, trade_id, update_data))
+    return await _write(db, run)
+
+async def close_trade(
+    current_user: TokenData, db: AsyncSession, trade_id: UUID, close_data: models.TradeClose
+) -> models.TradeResponse:
+    def run(session):
+        return models.TradeResponse.model_validate(service.close_trade(current_user, session, trade_id, close_data))
+    return await _write(db, run)
+
+async def delete_trade(current_user: TokenData, db: AsyncSession, trade_id: UUID):
+    await _write(db, lambda session: service.delete_trade(current_user, session, trade_id))
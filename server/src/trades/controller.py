@@ -1,27 +1,75 @@
 
-from fastapi import APIRouter, status
-from typing import Optional
+from datetime import datetime
+from fastapi import APIRouter, Body, File, Query, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from typing import Any, List, Optional
 from uuid import UUID
 from ..database.core import DbSession
 from . import models, service
 from ..auth.service import CurrentUser
 from src.entities.trade import TradeStatus
+from src.conditional import conditional_get
+from src.responses import fast_json
+from src.rate_limiter import TradesRateLimit
 
-router = APIRouter(prefix="/trades", tags=["Trades"])
+router = APIRouter(prefix="/trades", tags=["Trades"], dependencies=[TradesRateLimit])
 
 @router.post("/", response_model=models.TradeResponse, status_code=status.HTTP_201_CREATED)
 def create_trade(db: DbSession, trade: models.TradeCreate, current_user: CurrentUser):
     return service.create_trade(current_user, db, trade)
 
-@router.get("/", response_model=models.PaginatedTradeResponse)
+@router.post("/bulk", response_model=models.BulkImportResponse)
+def import_trades(
+    db: DbSession, 
+    current_user: CurrentUser,
+    # Raw dicts so one bad row is reported instead of rejecting the whole request (422)
+    rows: List[Any] = Body(..., description="Array of TradeImport objects")
+):
+    return service.import_trades(current_user, db, rows)
+
+@router.post("/bulk/csv", response_model=models.BulkImportResponse)
+def import_trades_csv(db: DbSession, current_user: CurrentUser, file: UploadFile = File(...)):
+    return service.import_trades(current_user, db, service.read_import_csv(file.file))
+
+@router.post("/bulk/close", response_model=models.BulkWriteResponse)
+def close_trades(db: DbSession, req: models.BulkCloseRequest, current_user: CurrentUser):
+    return service.close_trades(current_user, db, req)
+
+@router.post("/bulk/delete", response_model=models.BulkWriteResponse)
+def delete_trades(db: DbSession, req: models.BulkDeleteRequest, current_user: CurrentUser):
+    return service.delete_trades(current_user, db, req)
+
+@router.get("/", response_model=models.PaginatedTradeResponse, dependencies=[conditional_get()])
 def get_trades(
     db: DbSession, 
     current_user: CurrentUser, 
-    skip: int = 0, 
-    limit: int = 20,
-    status: Optional[TradeStatus] = None
+    response: Response,
+    skip: int = Query(0, ge=0), 
+    limit: int = Query(20, ge=1, le=500),
+    status: Optional[TradeStatus] = None,
+    cursor: Optional[str] = Query(None, description="Opaque `next_cursor` from a previous page (keyset mode)"),
+    include_total: Optional[bool] = Query(None, description="Defaults to true in offset mode, false in cursor mode"),
+    start_date: Optional[datetime] = Query(None, description="Only trades entered at or after this date"),
+    end_date: Optional[datetime] = Query(None, description="Only trades entered at or before this date")
+):
+    result = service.get_trades(current_user, db, skip, limit, status, cursor, include_total, start_date, end_date)
+    return fast_json(result, response)
+
+# Must be declared before /{trade_id} so "export" is not parsed as an ID
+@router.get("/export", response_class=StreamingResponse)
+def export_trades(
+    current_user: CurrentUser,
+    format: models.ExportFormat = models.ExportFormat.CSV,
+    status: Optional[TradeStatus] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
 ):
-    return service.get_trades(current_user, db, skip, limit, status)
+    media_type = "text/csv" if format == models.ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        service.export_trades(current_user, format, status, start_date, end_date),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="trades.{format.value}"'}
+    )
 
 @router.get("/{trade_id}", response_model=models.TradeResponse)
 def get_trade(db: DbSession, trade_id: UUID, current_user: CurrentUser):
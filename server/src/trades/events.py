@@ -0,0 +1,95 @@
+"""
+In-process notifications for trade writes.
+
+trades/service.py calls publish() right AFTER a write has been committed, so
+subscribers only ever see data that is visible to other sessions. Subscribers
+run synchronously in the request's thread, so they must be cheap and
+thread-safe: bump a counter, drop a cache entry, wake a background task.
+
+The async stack runs the services on the event loop (AsyncSession.run_sync),
+where a subscriber doing I/O (e.g. a redis cache invalidation) would stall
+every request. It publishes inside deferred() and hands the collected events
+to deliver() in the threadpool.
+
+Each worker process has its own subscribers; nothing here crosses processes.
+"""
+import enum
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+class TradeAction(str, enum.Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    CLOSED = "closed"
+    DELETED = "deleted"
+    IMPORTED = "imported"
+
+class TradeEvent(NamedTuple):
+    action: TradeAction
+    user_id: UUID
+    trade_ids: Tuple[UUID, ...]
+    # The written trades as committed (TradeResponse fields, without owner),
+    # so subscribers need no query to see them. Empty for deletes.
+    trades: Tuple[Mapping[str, Any], ...] = ()
+    # The user's realized PnL right after the write (rollup.write_changes), or
+    # None when not known. Subscribers run later, after any newer writes.
+    total_pnl: Optional[float] = None
+
+Subscriber = Callable[[TradeEvent], None]
+
+_subscribers: List[Subscriber] = []
+
+# Set inside deferred(): publish() collects into it instead of delivering
+_deferred: ContextVar[Optional[List[TradeEvent]]] = ContextVar("deferred_trade_events", default=None)
+
+def subscribe(subscriber: Subscriber) -> Subscriber:
+    """Registers a subscriber (usable as a decorator)."""
+    if subscriber not in _subscribers:
+        _subscribers.append(subscriber)
+    return subscriber
+
+def unsubscribe(subscriber: Subscriber):
+    if subscriber in _subscribers:
+        _subscribers.remove(subscriber)
+
+def publish(
+    action: TradeAction, 
+    user_id: UUID, 
+    trade_ids: Tuple[UUID, ...] = (), 
+    trades: Tuple[Mapping[str, Any], ...] = (),
+    total_pnl: Optional[float] = None
+):
+    """Notifies every subscriber (or, inside deferred(), queues the event for deliver())."""
+    event = TradeEvent(action, user_id, tuple(trade_ids), tuple(trades), total_pnl)
+    pending = _deferred.get()
+    if pending is not None:
+        pending.append(event)
+        return
+    deliver(event)
+
+@contextmanager
+def deferred() -> Iterator[List[TradeEvent]]:
+    """Collects the events published in the block (this context only) instead of delivering them."""
+    pending: List[TradeEvent] = []
+    token = _deferred.set(pending)
+    try:
+        yield pending
+    finally:
+        _deferred.reset(token)
+
+def deliver(*events: TradeEvent):
+    """
+    Runs the subscribers. A failing subscriber is logged and skipped:
+    the write is already committed and the request must not fail because of it.
+    """
+    for event in events:
+        for subscriber in list(_subscribers):
+            try:
+                subscriber(event)
+            except Exception:
+                logger.exception(f"Trade event subscriber {subscriber!r} failed for {event.action.value}")
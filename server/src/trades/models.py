@@ -1,8 +1,9 @@
 
 from datetime import datetime
+from enum import Enum
 from typing import Optional, List
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from src.entities.trade import TradeSide, TradeStatus
 
 class TradeBase(BaseModel):
@@ -19,6 +20,14 @@ class TradeBase(BaseModel):
 class TradeCreate(TradeBase):
     pass
 
+class TradeImport(TradeCreate):
+    """
+    One row of a bulk import. Rows with an exit_price are imported as CLOSED;
+    exit_date defaults to NOW like in TradeClose.
+    """
+    exit_price: Optional[float] = Field(None, gt=0)
+    exit_date: Optional[datetime] = None
+
 class TradeUpdate(BaseModel):
     """
     Allows updating ANY field (Entry or Exit) to fix mistakes.
@@ -37,6 +46,14 @@ class TradeUpdate(BaseModel):
         if v: return v.strip().upper()
         return v
 
+    # Only runs for fields sent in the request: omit a field to keep it, but these
+    # columns cannot be cleared (entry_date also keys the trade list's cursor)
+    @field_validator('symbol', 'side', 'quantity', 'entry_price', 'entry_date', mode='before')
+    def reject_null(cls, v, info):
+        if v is None:
+            raise ValueError(f"{info.field_name} cannot be null")
+        return v
+
 class TradeClose(BaseModel):
     """
     Close a position. 
@@ -45,6 +62,65 @@ class TradeClose(BaseModel):
     exit_price: float = Field(..., gt=0)
     exit_date: Optional[datetime] = None
 
+class TradeSelection(BaseModel):
+    """
+    Trades targeted by a bulk write: either explicit trade_ids, or a filter
+    (symbol, optionally side) over the caller's trades.
+    """
+    trade_ids: Optional[List[UUID]] = Field(None, min_length=1)
+    symbol: Optional[str] = None
+    side: Optional[TradeSide] = None
+
+    @field_validator('symbol')
+    def uppercase_symbol(cls, v):
+        if v: return v.strip().upper()
+        return v
+
+    @model_validator(mode='after')
+    def ids_or_filter(self):
+        if (self.trade_ids is None) == (self.symbol is None):
+            raise ValueError("Give either trade_ids or a symbol filter")
+        if self.trade_ids is not None and self.side is not None:
+            raise ValueError("side only applies to the symbol filter")
+        return self
+
+class BulkCloseRequest(TradeSelection):
+    """Closes every selected OPEN trade at the same exit price (and date, default NOW)."""
+    exit_price: float = Field(..., gt=0)
+    exit_date: Optional[datetime] = None
+
+class BulkDeleteRequest(TradeSelection):
+    # Only used with the symbol filter (open positions by default)
+    status: Optional[TradeStatus] = TradeStatus.OPEN
+
+    @model_validator(mode='after')
+    def status_only_with_filter(self):
+        if self.trade_ids is not None and 'status' in self.model_fields_set:
+            raise ValueError("status only applies to the symbol filter")
+        return self
+
+class BulkResult(str, Enum):
+    CLOSED = "closed"
+    DELETED = "deleted"
+    NOT_FOUND = "not_found"
+    ALREADY_CLOSED = "already_closed"
+    INVALID_TIMELINE = "invalid_timeline"
+
+class BulkTradeResult(BaseModel):
+    id: UUID
+    result: BulkResult
+    # Realized PnL of a closed trade
+    pnl: Optional[float] = None
+    detail: Optional[str] = None
+
+class BulkWriteResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkTradeResult]
+    # Symbol filter only: more trades matched than one request writes
+    # (BULK_WRITE_MAX_IDS, oldest first); repeat the request for the next ones
+    more: bool = False
+
 class TradeOwner(BaseModel):
     username: str
     email: str
@@ -62,7 +138,23 @@ class TradeResponse(TradeBase):
     model_config = ConfigDict(from_attributes=True)
 
 class PaginatedTradeResponse(BaseModel):
-    total: int
-    page: int
+    # total is None when not requested (cursor mode skips the COUNT by default)
+    total: Optional[int] = None
+    # page is None in cursor mode
+    page: Optional[int] = None
     limit: int
-    data: List[TradeResponse]
\ No newline at end of file
+    next_cursor: Optional[str] = None
+    data: List[TradeResponse]
+
+class ImportRowError(BaseModel):
+    row: int = Field(..., description="0-based index of the row in the submitted array / CSV body")
+    detail: str
+
+class BulkImportResponse(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ImportRowError]
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
@@ -1,12 +1,26 @@
 
+import base64
+import csv
+import enum
+import io
+import json
 from datetime import datetime, timezone
-from uuid import UUID
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, Optional
+from uuid import UUID, uuid4
+from pydantic import ValidationError
+from sqlalchemy import and_, bindparam, delete, func, insert, literal, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
 from . import models
 from src.auth.models import TokenData
-from src.entities.trade import Trade, TradeStatus, TradeSide
-from src.entities.user import UserRole
+from src.config import settings
+from src.database.core import SessionLocal
+from src.entities.trade import Trade, TradeStatus
+from src.entities.user import User, UserRole
+from src.entities.trade_stats import UserTradeStats
+from src.analytics import rollup
+from . import events
 from ..exceptions import EntityNotFoundException, BusinessLogicException
 
 def validate_trade_timeline(entry_date: datetime, exit_date: datetime):
@@ -40,27 +54,206 @@ def create_trade(current_user: TokenData, db: Session, trade: models.TradeCreate
         new_trade.entry_date = datetime.now(timezone.utc)
         
     db.add(new_trade)
+    totals = rollup.apply_changes(db, added=[rollup.contribution_of(new_trade)])
     db.commit()
     db.refresh(new_trade)
+    events.publish(
+        events.TradeAction.CREATED, new_trade.user_id, (new_trade.id,),
+        ({field: getattr(new_trade, field) for field in _LIST_FIELDS},), totals.get(new_trade.user_id)
+    )
     return new_trade
 
-def get_trades(current_user: TokenData, db: Session, skip: int = 0, limit: int = 20, status: TradeStatus = None):
-    query = db.query(Trade).options(joinedload(Trade.owner))
+def encode_cursor(entry_date: datetime, trade_id: UUID) -> str:
+    """Opaque keyset cursor: base64 of the (entry_date, id) of the last row on a page."""
+    raw = json.dumps({"d": entry_date.isoformat(), "i": str(trade_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(raw["d"]), UUID(raw["i"])
+    except (ValueError, KeyError, TypeError):
+        raise BusinessLogicException(detail="Invalid pagination cursor")
+
+def apply_trade_filters(
+    query, 
+    current_user: TokenData, 
+    status: TradeStatus = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """
+    Visibility + list filters shared by the list, count and export paths.
+    Works for ORM Query and Core select() alike. Dates filter on entry_date (inclusive).
+    """
     if current_user.role != UserRole.ADMIN:
         query = query.filter(Trade.user_id == UUID(current_user.user_id))
     if status:
         query = query.filter(Trade.status == status)
-    
-    total_count = query.count()
-    trades = query.order_by(Trade.entry_date.desc()).offset(skip).limit(limit).all()
+    if start_date:
+        query = query.filter(Trade.entry_date >= start_date)
+    if end_date:
+        query = query.filter(Trade.entry_date <= end_date)
+    return query
+
+def count_trades(
+    current_user: TokenData, 
+    db: Session, 
+    status: TradeStatus = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> int:
+    """
+    Traders without a date filter are counted from the analytics rollup (one PK lookup).
+    Everything else needs a COUNT over the trades table.
+    """
+    if current_user.role != UserRole.ADMIN and not start_date and not end_date:
+        stats = db.get(UserTradeStats, UUID(current_user.user_id))
+        if not stats:
+            return 0
+        if status == TradeStatus.OPEN:
+            return stats.open_count
+        if status == TradeStatus.CLOSED:
+            return stats.closed_count
+        return stats.open_count + stats.closed_count
+
+    query = db.query(func.count(Trade.id))
+    return apply_trade_filters(query, current_user, status, start_date, end_date).scalar()
+
+# Columns of TradeResponse, in its field order (the list is serialized from these directly)
+LIST_COLUMNS = [
+    Trade.symbol, Trade.side, Trade.quantity, Trade.entry_price, Trade.entry_date,
+    Trade.id, Trade.user_id, Trade.status, Trade.exit_price, Trade.exit_date, Trade.pnl
+]
+OWNER_COLUMNS = [User.username.label("owner_username"), User.email.label("owner_email")]
+_LIST_FIELDS = [column.key for column in LIST_COLUMNS]
+
+def _trade_row_to_dict(row, with_owner: bool) -> dict:
+    """Builds a TradeResponse-shaped dict from a LIST_COLUMNS row (no pydantic round trip)."""
+    data = dict(zip(_LIST_FIELDS, row))
+    data["owner"] = (
+        {"username": row.owner_username, "email": row.owner_email}
+        if with_owner and row.owner_username is not None else None
+    )
+    return data
+
+def get_trades(
+    current_user: TokenData, 
+    db: Session, 
+    skip: int = 0, 
+    limit: int = 20, 
+    status: TradeStatus = None,
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """
+    Two pagination modes:
+    - Offset (skip/limit): kept for old clients, returns the total by default.
+    - Keyset (cursor): seeks with WHERE (entry_date, id) < (cursor), so deep pages cost
+      the same as the first one. The total is only computed if explicitly requested.
+    Both modes return `next_cursor` for the following page (None on the last page).
+    `data` holds plain TradeResponse-shaped dicts, ready for FastJSONResponse.
+    """
+    # Column tuples instead of entities: no identity map, no per-row ORM state.
+    # Only admins see other users' trades, so only they need the owner join.
+    is_admin = current_user.role == UserRole.ADMIN
+    columns = LIST_COLUMNS + (OWNER_COLUMNS if is_admin else [])
+    query = db.query(*columns)
+    if is_admin:
+        query = query.outerjoin(User, User.id == Trade.user_id)
+    query = apply_trade_filters(query, current_user, status, start_date, end_date)
+
+    if include_total is None:
+        include_total = cursor is None
+    total_count = count_trades(current_user, db, status, start_date, end_date) if include_total else None
+
+    # id breaks ties between identical entry dates so the order (and the cursor) is stable
+    query = query.order_by(Trade.entry_date.desc(), Trade.id.desc())
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Trade.entry_date, Trade.id) < tuple_(cursor_date, cursor_id))
+    else:
+        query = query.offset(skip)
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].entry_date, rows[-1].id)
     
     return {
         "total": total_count,
-        "page": (skip // limit) + 1,
+        "page": None if cursor else (skip // limit) + 1,
         "limit": limit,
-        "data": trades
+        "next_cursor": next_cursor,
+        "data": [_trade_row_to_dict(row, is_admin) for row in rows]
     }
 
+# Columns written by the export, in order
+EXPORT_COLUMNS = [
+    Trade.id, Trade.user_id, Trade.symbol, Trade.side, Trade.quantity,
+    Trade.entry_price, Trade.entry_date, Trade.exit_price, Trade.exit_date,
+    Trade.status, Trade.pnl
+]
+
+def _export_value(value):
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+def export_trades(
+    current_user: TokenData,
+    export_format: models.ExportFormat,
+    status: TradeStatus = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Iterator[str]:
+    """
+    Generator feeding a StreamingResponse. Rows are read through a server-side
+    cursor (yield_per) and serialized batch by batch, so memory stays flat no
+    matter how many trades are exported.
+
+    It owns its session: the stream outlives the request's DbSession dependency.
+    """
+    query = select(*EXPORT_COLUMNS).order_by(Trade.entry_date.desc(), Trade.id.desc())
+    query = apply_trade_filters(query, current_user, status, start_date, end_date)
+    names = [column.key for column in EXPORT_COLUMNS]
+
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+
+        if export_format == models.ExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            for batch in result.partitions():
+                writer.writerows([_export_value(v) for v in row] for row in batch)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            # Header only when there are no rows
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for batch in result.partitions():
+                yield "".join(
+                    json.dumps({name: _export_value(v) for name, v in zip(names, row)}) + "\n"
+                    for row in batch
+                )
+    finally:
+        db.close()
+
 def get_trade_by_id(current_user: TokenData, db: Session, trade_id: UUID) -> Trade:
     query = db.query(Trade).options(joinedload(Trade.owner)).filter(Trade.id == trade_id)
     if current_user.role != UserRole.ADMIN:
@@ -70,59 +263,442 @@ def get_trade_by_id(current_user: TokenData, db: Session, trade_id: UUID) -> Tra
         raise EntityNotFoundException(entity_name="Trade", entity_id=str(trade_id))
     return trade
 
-def verify_ownership(current_user: TokenData, trade: Trade):
+# ---------------------------------------------------------
+# Write paths: one conditional UPDATE/DELETE ... RETURNING per write.
+# Ownership, status and the timeline are checked in the WHERE clause and pnl
+# is generated by Postgres (see Trade.PNL_EXPRESSION). Only when no row
+# matched is the trade read again, to tell the caller why.
+# ---------------------------------------------------------
+
+def _owned_by(current_user: TokenData, trade_id: UUID) -> list:
+    # Admins own no trades, so they never match (and get a 403 below)
+    return [Trade.id == trade_id, Trade.user_id == UUID(current_user.user_id)]
+
+def _previous_row(current_user: TokenData, trade_id: UUID):
+    """
+    The trade as it was before the UPDATE (RETURNING only sees the new values),
+    for the rollup. Locked, so a concurrent write to the same trade waits and
+    we read its result rather than a stale snapshot.
+    """
+    return select(Trade.id, Trade.symbol, Trade.status, Trade.pnl)\
+        .where(*_owned_by(current_user, trade_id))\
+        .with_for_update()\
+        .subquery("previous")
+
+def _update_returning(
+    current_user: TokenData, db: Session, trade_id: UUID, values: dict, conditions: list
+):
+    """
+    UPDATE trades SET ... FROM (previous row), users WHERE ... RETURNING the
+    response columns, the owner and the previous rollup contribution.
+    Returns None when no row matched the conditions.
+    """
+    previous = _previous_row(current_user, trade_id)
+    stmt = update(Trade)\
+        .where(Trade.id == previous.c.id, User.id == Trade.user_id, *conditions)\
+        .values(**values)\
+        .returning(
+            *LIST_COLUMNS, *OWNER_COLUMNS,
+            previous.c.symbol.label("previous_symbol"),
+            previous.c.status.label("previous_status"),
+            previous.c.pnl.label("previous_pnl")
+        )\
+        .execution_options(synchronize_session=False)
+    return db.execute(stmt).first()
+
+def _apply_update_to_rollup(db: Session, row) -> Optional[float]:
+    """Returns the owner's total_pnl after the write (see rollup.write_changes)."""
+    return rollup.apply_changes(
+        db,
+        removed=[rollup.TradeContribution(row.user_id, row.previous_symbol, row.previous_status, row.previous_pnl)],
+        added=[rollup.TradeContribution(row.user_id, row.symbol, row.status, row.pnl)]
+    ).get(row.user_id)
+
+def _rejected_write(current_user: TokenData, db: Session, trade_id: UUID):
+    """
+    Failure path of a write that matched no row: raises 404 / 403 when the trade
+    is missing or not the caller's, otherwise returns it for the caller's own
+    checks (status, timeline).
+    """
+    trade = db.execute(
+        select(Trade.user_id, Trade.status, Trade.entry_date, Trade.exit_date).where(Trade.id == trade_id)
+    ).first()
+    if trade is None or (current_user.role != UserRole.ADMIN and trade.user_id != UUID(current_user.user_id)):
+        raise EntityNotFoundException(entity_name="Trade", entity_id=str(trade_id))
     if trade.user_id != UUID(current_user.user_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only modify your own trades")
+    return trade
 
-def update_trade(current_user: TokenData, db: Session, trade_id: UUID, update_data: models.TradeUpdate) -> Trade:
-    trade = get_trade_by_id(current_user, db, trade_id)
-    verify_ownership(current_user, trade)
-    
-    for key, value in update_data.model_dump(exclude_unset=True).items():
-        setattr(trade, key, value)
+def _timeline_holds(entry_date, exit_date):
+    """SQL twin of validate_trade_timeline (either side may be a column or a value)."""
+    return or_(entry_date.is_(None), exit_date.is_(None), exit_date >= entry_date)
 
-    if trade.exit_date:
-        validate_trade_timeline(trade.entry_date, trade.exit_date)
+def _value_or_column(values: dict, column):
+    return literal(values[column.key], column.type) if column.key in values else column
 
-    if trade.status == TradeStatus.CLOSED:
-        if not trade.exit_price:
-             pass 
-        elif trade.side == TradeSide.LONG:
-            trade.pnl = (trade.exit_price - trade.entry_price) * trade.quantity
-        else:
-            trade.pnl = (trade.entry_price - trade.exit_price) * trade.quantity
+def update_trade(current_user: TokenData, db: Session, trade_id: UUID, update_data: models.TradeUpdate) -> dict:
+    values = update_data.model_dump(exclude_unset=True)
+    entry_date = _value_or_column(values, Trade.entry_date)
+    exit_date = _value_or_column(values, Trade.exit_date)
 
+    # An empty body still checks access and returns the trade
+    row = _update_returning(
+        current_user, db, trade_id,
+        values or {"symbol": Trade.symbol},
+        [_timeline_holds(entry_date, exit_date)]
+    )
+    if row is None:
+        trade = _rejected_write(current_user, db, trade_id)
+        validate_trade_timeline(values.get("entry_date", trade.entry_date), values.get("exit_date", trade.exit_date))
+        raise EntityNotFoundException(entity_name="Trade", entity_id=str(trade_id))
+
+    total_pnl = _apply_update_to_rollup(db, row)
     db.commit()
-    db.refresh(trade)
+    trade = _trade_row_to_dict(row, with_owner=True)
+    events.publish(events.TradeAction.UPDATED, row.user_id, (row.id,), (trade,), total_pnl)
     return trade
 
-def close_trade(current_user: TokenData, db: Session, trade_id: UUID, close_data: models.TradeClose) -> Trade:
-    trade = get_trade_by_id(current_user, db, trade_id)
-    verify_ownership(current_user, trade)
-    
-    if trade.status == TradeStatus.CLOSED:
-        raise BusinessLogicException(detail="Trade is already closed")
-
+def close_trade(current_user: TokenData, db: Session, trade_id: UUID, close_data: models.TradeClose) -> dict:
     final_exit_date = close_data.exit_date or datetime.now(timezone.utc)
 
-    validate_trade_timeline(trade.entry_date, final_exit_date)
-
-    if trade.side == TradeSide.LONG:
-        pnl = (close_data.exit_price - trade.entry_price) * trade.quantity
-    else:
-        pnl = (trade.entry_price - close_data.exit_price) * trade.quantity
-    
-    trade.exit_price = close_data.exit_price
-    trade.pnl = pnl
-    trade.status = TradeStatus.CLOSED
-    trade.exit_date = final_exit_date
+    row = _update_returning(
+        current_user, db, trade_id,
+        {"exit_price": close_data.exit_price, "exit_date": final_exit_date, "status": TradeStatus.CLOSED},
+        [Trade.status == TradeStatus.OPEN, _timeline_holds(Trade.entry_date, literal(final_exit_date, Trade.exit_date.type))]
+    )
+    if row is None:
+        trade = _rejected_write(current_user, db, trade_id)
+        if trade.status == TradeStatus.CLOSED:
+            raise BusinessLogicException(detail="Trade is already closed")
+        validate_trade_timeline(trade.entry_date, final_exit_date)
+        raise EntityNotFoundException(entity_name="Trade", entity_id=str(trade_id))
 
+    total_pnl = _apply_update_to_rollup(db, row)
     db.commit()
-    db.refresh(trade)
+    trade = _trade_row_to_dict(row, with_owner=True)
+    events.publish(events.TradeAction.CLOSED, row.user_id, (row.id,), (trade,), total_pnl)
     return trade
 
 def delete_trade(current_user: TokenData, db: Session, trade_id: UUID):
-    trade = get_trade_by_id(current_user, db, trade_id)
-    verify_ownership(current_user, trade)
-    db.delete(trade)
-    db.commit()
\ No newline at end of file
+    # DELETE ... RETURNING hands back the row as deleted: exactly the rollup contribution to remove
+    row = db.execute(
+        delete(Trade)
+        .where(*_owned_by(current_user, trade_id))
+        .returning(Trade.id, Trade.user_id, Trade.symbol, Trade.status, Trade.pnl)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        _rejected_write(current_user, db, trade_id)
+        raise EntityNotFoundException(entity_name="Trade", entity_id=str(trade_id))
+
+    rollup.apply_changes(db, removed=[rollup.contribution_of(row)])
+    db.commit()
+    events.publish(events.TradeAction.DELETED, row.user_id, (row.id,))
+
+# ---------------------------------------------------------
+# Bulk writes: one set-based UPDATE/DELETE for the whole selection, run as a
+# data-modifying CTE. The outer SELECT of the same statement still sees the
+# trades as they were before the write, so it reports a result for every
+# requested trade (written, or why not) in the same round trip.
+# Both modes write at most BULK_WRITE_MAX_IDS trades: explicit ids beyond it
+# are rejected, a symbol filter is paged (oldest entry first, `more` set).
+# ---------------------------------------------------------
+
+def _check_bulk_selection(current_user: TokenData, selection: models.TradeSelection):
+    if current_user.role == UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only modify your own trades")
+    if selection.trade_ids is not None and len(selection.trade_ids) > settings.BULK_WRITE_MAX_IDS:
+        raise BusinessLogicException(
+            detail=f"Too many trade ids: at most {settings.BULK_WRITE_MAX_IDS} per request"
+        )
+
+def _selection_filters(current_user: TokenData, selection: models.TradeSelection) -> list:
+    filters = [Trade.user_id == UUID(current_user.user_id)]
+    if selection.trade_ids is not None:
+        filters.append(Trade.id.in_(selection.trade_ids))
+    else:
+        filters.append(Trade.symbol == selection.symbol)
+        if selection.side:
+            filters.append(Trade.side == selection.side)
+    return filters
+
+class BulkRows(NamedTuple):
+    """_bulk_write() result: one row per candidate, and whether the filter matched more."""
+    rows: list
+    more: bool
+
+def _bulk_write(
+    current_user: TokenData, db: Session, selection: models.TradeSelection, write, candidates: list
+) -> BulkRows:
+    """
+    Runs `write` (an UPDATE/DELETE on trades) and returns one row per candidate:
+    id, status_before / entry_date (NULL for unknown ids) and the written_*
+    LIST_COLUMNS (NULL when the write skipped the trade). Explicit ids come back in
+    request order, filter matches by entry date (the first BULK_WRITE_MAX_IDS).
+    """
+    page_size = settings.BULK_WRITE_MAX_IDS
+    if selection.trade_ids is None:
+        # One extra match tells whether there are more
+        page = select(Trade.id, func.row_number().over(order_by=(Trade.entry_date, Trade.id)).label("position"))\
+            .where(*candidates)\
+            .order_by(Trade.entry_date, Trade.id)\
+            .limit(page_size + 1)\
+            .cte("page")
+        write = write.where(Trade.id.in_(select(page.c.id).where(page.c.position <= page_size)))
+
+    written = write.returning(*LIST_COLUMNS).cte("written")
+    columns = (
+        Trade.status.label("status_before"), Trade.entry_date,
+        *[written.c[field].label(f"written_{field}") for field in _LIST_FIELDS],
+    )
+    if selection.trade_ids is not None:
+        ids = list(dict.fromkeys(selection.trade_ids))
+        requested = func.unnest(bindparam("trade_ids", ids, type_=ARRAY(PG_UUID(as_uuid=True))))\
+            .table_valued("id", with_ordinality="position")\
+            .render_derived(name="requested")
+        query = select(requested.c.id, *columns).select_from(
+            requested
+            .outerjoin(Trade, and_(Trade.id == requested.c.id, Trade.user_id == UUID(current_user.user_id)))
+            .outerjoin(written, written.c.id == requested.c.id)
+        ).order_by(requested.c.position)
+    else:
+        query = select(Trade.id, *columns)\
+            .select_from(page.join(Trade, Trade.id == page.c.id))\
+            .outerjoin(written, written.c.id == Trade.id)\
+            .order_by(page.c.position)
+    rows = db.execute(query).all()
+    return BulkRows(rows[:page_size], len(rows) > page_size)
+
+def _timeline_error(entry_date: datetime, exit_date: datetime) -> Optional[str]:
+    try:
+        validate_trade_timeline(entry_date, exit_date)
+    except HTTPException as e:
+        return str(e.detail)
+    return None
+
+def _bulk_response(results: List[models.BulkTradeResult], succeeded: int, more: bool) -> models.BulkWriteResponse:
+    return models.BulkWriteResponse(succeeded=succeeded, failed=len(results) - succeeded, results=results, more=more)
+
+class BulkOutcome(NamedTuple):
+    """A bulk write's response, its rollup changes and its event (None when nothing was written)."""
+    response: models.BulkWriteResponse
+    changes: rollup.RollupChanges
+    event: Optional[events.TradeEvent]
+
+def finish_bulk_write(db: Session, outcome: BulkOutcome) -> models.BulkWriteResponse:
+    """Applies the rollup changes, commits and publishes the event."""
+    if outcome.event is not None:
+        totals = rollup.write_changes(db, outcome.changes)
+        db.commit()
+        events.publish(*outcome.event._replace(total_pnl=totals.get(outcome.event.user_id)))
+    return outcome.response
+
+def bulk_close_rows(current_user: TokenData, db: Session, req: models.BulkCloseRequest):
+    """
+    Closes the selected OPEN trades at req.exit_price in one UPDATE (pnl is
+    generated per side by Postgres). Returns the _bulk_write rows and the exit
+    date used. Does NOT commit.
+
+    A symbol filter only matches the trades it can close: one entered after the
+    exit date stays OPEN, so paging over it would return it on every page.
+    """
+    _check_bulk_selection(current_user, req)
+    exit_date = req.exit_date or datetime.now(timezone.utc)
+    filters = _selection_filters(current_user, req)
+    closable = [Trade.status == TradeStatus.OPEN, _timeline_holds(Trade.entry_date, literal(exit_date, Trade.exit_date.type))]
+
+    write = update(Trade.__table__)\
+        .where(*filters, *closable)\
+        .values(exit_price=req.exit_price, exit_date=exit_date, status=TradeStatus.CLOSED)
+    return _bulk_write(current_user, db, req, write, filters + closable), exit_date
+
+def bulk_close_outcome(current_user: TokenData, selected: BulkRows, exit_date: datetime) -> BulkOutcome:
+    """Per-trade results of bulk_close_rows, same rules as close_trade. No database access."""
+    user_id = UUID(current_user.user_id)
+    results, removed, added, closed = [], [], [], []
+    for row in selected.rows:
+        if row.written_id is not None:
+            removed.append(rollup.TradeContribution(user_id, row.written_symbol, TradeStatus.OPEN, None))
+            added.append(rollup.TradeContribution(user_id, row.written_symbol, row.written_status, row.written_pnl))
+            closed.append({field: row._mapping[f"written_{field}"] for field in _LIST_FIELDS})
+            results.append(models.BulkTradeResult(id=row.id, result=models.BulkResult.CLOSED, pnl=row.written_pnl))
+        elif row.status_before is None:
+            results.append(models.BulkTradeResult(id=row.id, result=models.BulkResult.NOT_FOUND))
+        elif row.status_before == TradeStatus.OPEN and (error := _timeline_error(row.entry_date, exit_date)):
+            results.append(models.BulkTradeResult(id=row.id, result=models.BulkResult.INVALID_TIMELINE, detail=error))
+        else:
+            # Closed before this request (or by a concurrent one while it ran)
+            results.append(models.BulkTradeResult(
+                id=row.id, result=models.BulkResult.ALREADY_CLOSED, detail="Trade is already closed"
+            ))
+
+    event = events.TradeEvent(
+        events.TradeAction.CLOSED, user_id, tuple(trade["id"] for trade in closed), tuple(closed)
+    ) if closed else None
+    return BulkOutcome(_bulk_response(results, len(added), selected.more), rollup.net_changes(removed, added), event)
+
+def close_trades(current_user: TokenData, db: Session, req: models.BulkCloseRequest) -> models.BulkWriteResponse:
+    selected, exit_date = bulk_close_rows(current_user, db, req)
+    return finish_bulk_write(db, bulk_close_outcome(current_user, selected, exit_date))
+
+def bulk_delete_rows(current_user: TokenData, db: Session, req: models.BulkDeleteRequest) -> BulkRows:
+    """
+    Deletes the selected trades (filter mode: those with req.status, any if None)
+    in one DELETE. Returns the _bulk_write rows. Does NOT commit.
+    """
+    _check_bulk_selection(current_user, req)
+    filters = _selection_filters(current_user, req)
+    if req.trade_ids is None and req.status is not None:
+        filters.append(Trade.status == req.status)
+    return _bulk_write(current_user, db, req, delete(Trade.__table__).where(*filters), filters)
+
+def bulk_delete_outcome(current_user: TokenData, selected: BulkRows) -> BulkOutcome:
+    user_id = UUID(current_user.user_id)
+    results, removed = [], []
+    for row in selected.rows:
+        if row.written_id is not None:
+            removed.append(rollup.TradeContribution(user_id, row.written_symbol, row.written_status, row.written_pnl))
+            results.append(models.BulkTradeResult(id=row.id, result=models.BulkResult.DELETED))
+        else:
+            results.append(models.BulkTradeResult(id=row.id, result=models.BulkResult.NOT_FOUND))
+
+    event = events.TradeEvent(
+        events.TradeAction.DELETED, user_id,
+        tuple(r.id for r in results if r.result == models.BulkResult.DELETED)
+    ) if removed else None
+    return BulkOutcome(_bulk_response(results, len(removed), selected.more), rollup.net_changes(removed=removed), event)
+
+def delete_trades(current_user: TokenData, db: Session, req: models.BulkDeleteRequest) -> models.BulkWriteResponse:
+    return finish_bulk_write(db, bulk_delete_outcome(current_user, bulk_delete_rows(current_user, db, req)))
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+class PreparedImport(NamedTuple):
+    """Validated import: the rows to insert and the per-row errors."""
+    rows: List[dict]
+    errors: List[models.ImportRowError]
+
+def prepare_import(current_user: TokenData, rows: Iterable[dict]) -> PreparedImport:
+    """
+    Validates every row (TradeImport + validate_trade_timeline) in one pass, without
+    touching the database. Invalid rows are reported back and skipped; they do
+    not abort the import. Rows with an exit_price become CLOSED.
+    """
+    if current_user.role == UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admins cannot create trades")
+
+    user_id = UUID(current_user.user_id)
+    now = datetime.now(timezone.utc)
+    valid_rows = []
+    errors = []
+
+    for index, raw in enumerate(rows):
+        if index >= settings.BULK_IMPORT_MAX_ROWS:
+            raise BusinessLogicException(
+                detail=f"Too many rows: at most {settings.BULK_IMPORT_MAX_ROWS} trades per import"
+            )
+        try:
+            item = models.TradeImport.model_validate(raw)
+            entry_date = item.entry_date or now
+            row = {
+                "id": uuid4(),
+                "user_id": user_id,
+                "symbol": item.symbol,
+                "side": item.side,
+                "quantity": item.quantity,
+                "entry_price": item.entry_price,
+                "entry_date": entry_date,
+                "exit_price": None,
+                "exit_date": None,
+                "status": TradeStatus.OPEN,
+            }
+            if item.exit_price is not None:
+                exit_date = item.exit_date or now
+                validate_trade_timeline(entry_date, exit_date)
+                row.update(
+                    exit_price=item.exit_price,
+                    exit_date=exit_date,
+                    status=TradeStatus.CLOSED
+                )
+            elif item.exit_date is not None:
+                raise BusinessLogicException(detail="exit_date was given without an exit_price")
+        except ValidationError as e:
+            errors.append(models.ImportRowError(row=index, detail=_validation_message(e)))
+        except HTTPException as e:
+            errors.append(models.ImportRowError(row=index, detail=str(e.detail)))
+        else:
+            valid_rows.append(row)
+
+    return PreparedImport(valid_rows, errors)
+
+def insert_import_rows(db: Session, rows: List[dict]) -> list:
+    """
+    Inserts the prepared rows, returning LIST_COLUMNS (with the generated pnl).
+    Does NOT commit.
+    """
+    # executemany: SQLAlchemy's "insertmanyvalues" sends each chunk as ONE multi-row
+    # INSERT ... VALUES (...), (...) RETURNING with a cached compiled statement
+    inserted = []
+    for start in range(0, len(rows), settings.BULK_INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + settings.BULK_INSERT_CHUNK_SIZE]
+        result = db.execute(
+            insert(Trade.__table__)
+            .returning(*LIST_COLUMNS)
+            .execution_options(insertmanyvalues_page_size=len(chunk)), 
+            chunk
+        )
+        inserted += result.all()
+    return inserted
+
+def imported_event(user_id: UUID, inserted: list, totals: dict) -> events.TradeEvent:
+    """`totals`: what the rollup write returned."""
+    return events.TradeEvent(
+        events.TradeAction.IMPORTED, user_id,
+        tuple(row.id for row in inserted), tuple(dict(zip(_LIST_FIELDS, row)) for row in inserted),
+        totals.get(user_id)
+    )
+
+def import_response(prepared: PreparedImport) -> models.BulkImportResponse:
+    return models.BulkImportResponse(inserted=len(prepared.rows), failed=len(prepared.errors), errors=prepared.errors)
+
+def import_trades(current_user: TokenData, db: Session, rows: Iterable[dict]) -> models.BulkImportResponse:
+    """
+    Bulk import (broker history migration).
+    1. Every row is validated up front (prepare_import).
+    2. Valid rows are written with one multi-row INSERT ... RETURNING per chunk
+       (Postgres generates their PnL), and the analytics rollup is updated once
+       from the returned rows, all in a single transaction.
+    The async stack runs the same steps, with the validation and the rollup sums
+    in the threadpool (trades/async_service.py).
+    """
+    prepared = prepare_import(current_user, rows)
+    inserted = insert_import_rows(db, prepared.rows)
+    if inserted:
+        totals = rollup.apply_changes(db, added=[rollup.contribution_of(row) for row in inserted])
+        db.commit()
+        events.publish(*imported_event(UUID(current_user.user_id), inserted, totals))
+    return import_response(prepared)
+
+def _decoded_lines(file: BinaryIO) -> Iterator[str]:
+    # Decoded line by line (not through a TextIOWrapper) so a bad byte can be pinned to its line
+    for number, line in enumerate(file, start=1):
+        try:
+            yield line.decode("utf-8-sig" if number == 1 else "utf-8")
+        except UnicodeDecodeError as e:
+            raise BusinessLogicException(detail=f"CSV line {number} is not valid UTF-8 ({e.reason})")
+
+def read_import_csv(file: BinaryIO) -> Iterator[dict]:
+    """
+    Rows of an uploaded CSV (header = TradeImport field names). Empty cells become None.
+    An undecodable or malformed file raises BusinessLogicException (400) naming the line.
+    """
+    reader = csv.DictReader(_decoded_lines(file))
+    try:
+        for record in reader:
+            yield {key.strip(): (value if value != "" else None) for key, value in record.items() if key}
+    except csv.Error as e:
+        # line_num counts the lines parsed completely; the error is in the next one
+        raise BusinessLogicException(detail=f"Malformed CSV at line {reader.line_num + 1}: {e}")
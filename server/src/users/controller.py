@@ -15,4 +15,11 @@ def get_current_user_profile(current_user: CurrentUser, db: DbSession):
     Fetches the current logged-in user's profile.
     The 'current_user' dependency validates the JWT token before this runs.
     """
-    return service.get_user_by_id(db, UUID(current_user.user_id))
\ No newline at end of file
+    return service.get_user_by_id(db, UUID(current_user.user_id))
+
+@router.delete("/{user_id}", response_model=models.UserPurgeResponse)
+def purge_user(user_id: UUID, current_user: CurrentUser, db: DbSession):
+    """
+    Admin only: deletes a trader's account and all of their trades, in chunks.
+    """
+    return service.purge_user(current_user, db, user_id)
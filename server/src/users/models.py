@@ -9,4 +9,10 @@ class UserResponse(BaseModel):
     role: UserRole
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class UserPurgeResponse(BaseModel):
+    user_id: UUID
+    trades_deleted: int
+    # Transactions the trades were deleted in (USER_PURGE_CHUNK_SIZE each)
+    chunks: int
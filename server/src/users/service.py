@@ -1,7 +1,15 @@
 from uuid import UUID
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
-from src.entities.user import User
-from ..exceptions import EntityNotFoundException
+from fastapi import HTTPException, status
+from src.auth.models import TokenData
+from src.config import settings
+from src.entities.trade import Trade
+from src.entities.user import User, UserRole
+from src.analytics import rollup
+from src.trades import events
+from . import models
+from ..exceptions import EntityNotFoundException, BusinessLogicException
 import logging
 
 def get_user_by_id(db: Session, user_id: UUID) -> User:
@@ -10,4 +18,42 @@ def get_user_by_id(db: Session, user_id: UUID) -> User:
         logging.warning(f"User not found: {user_id}")
         raise EntityNotFoundException(entity_name="User", entity_id=str(user_id))
     
-    return user
\ No newline at end of file
+    return user
+
+def purge_user(current_user: TokenData, db: Session, user_id: UUID) -> models.UserPurgeResponse:
+    """
+    Deletes a trader and all of their trades, USER_PURGE_CHUNK_SIZE trades per
+    transaction so a heavy account never turns into one huge transaction (and
+    lock set). Each chunk keeps the rollups in step with what it removed.
+    The user row goes last; trades written concurrently by the user while
+    the purge ran are removed with it by ON DELETE CASCADE.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    user = get_user_by_id(db, user_id)
+    if user.role == UserRole.ADMIN:
+        raise BusinessLogicException(detail="Admin accounts cannot be purged")
+    db.rollback()
+
+    chunk = select(Trade.id).where(Trade.user_id == user_id).limit(settings.USER_PURGE_CHUNK_SIZE)
+    stmt = delete(Trade.__table__)\
+        .where(Trade.id.in_(chunk))\
+        .returning(Trade.id, Trade.user_id, Trade.symbol, Trade.status, Trade.pnl)
+
+    deleted = chunks = 0
+    while True:
+        rows = db.execute(stmt).all()
+        if not rows:
+            break
+        rollup.apply_changes(db, removed=[rollup.contribution_of(row) for row in rows])
+        db.commit()
+        events.publish(events.TradeAction.DELETED, user_id, tuple(row.id for row in rows))
+        deleted += len(rows)
+        chunks += 1
+
+    db.execute(delete(User).where(User.id == user_id))
+    rollup.bump_platform_version(db)
+    db.commit()
+    events.publish(events.TradeAction.DELETED, user_id)
+    logging.info(f"Purged user {user_id}: {deleted} trades in {chunks} chunks")
+    return models.UserPurgeResponse(user_id=user_id, trades_deleted=deleted, chunks=chunks)
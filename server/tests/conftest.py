@@ -0,0 +1,91 @@
+"""
+Fixtures for the tests that run against Postgres (the configured DATABASE_URL).
+
+The benchmark dataset (benchmarks/dataset.py) is generated once per session
+and dropped afterwards; it lives under its own email domain, so real and
+seed_data users are not touched. Without a reachable database these tests
+are skipped.
+
+`client` does not run the app's lifespan: no platform snapshot or live update
+threads, so every statement a query budget sees comes from the request.
+"""
+from datetime import timedelta
+from typing import Dict, NamedTuple
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.dataset import BENCH_ADMIN_EMAIL, DatasetSpec, drop_dataset, generate_dataset, trader_email
+from src.auth.service import create_access_token
+from src.database.core import SessionLocal, engine
+from src.entities.user import User
+from src.main import app
+from src.rate_limiter import limiter
+
+# Big enough for the planner to prefer the indexes over Seq Scans
+TEST_DATASET = DatasetSpec(users=40, trades_per_user=500)
+
+@pytest.fixture(scope="session")
+def database():
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"Database not reachable: {e}")
+    return engine
+
+@pytest.fixture(scope="session")
+def dataset(database):
+    db = SessionLocal()
+    try:
+        generate_dataset(db, TEST_DATASET)
+        yield TEST_DATASET
+        drop_dataset(db)
+    finally:
+        db.close()
+
+@pytest.fixture
+def db(database):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def trader_id(dataset, db):
+    """The first benchmark trader (read-only tests)."""
+    return db.scalar(select(User.id).where(User.email == trader_email(0)))
+
+class AuthHeaders(NamedTuple):
+    # Benchmark trader 0 (read-only tests)
+    reader: Dict[str, str]
+    reader_id: str
+    # Benchmark trader 1: tests writing trades must remove them again
+    writer: Dict[str, str]
+    admin: Dict[str, str]
+
+@pytest.fixture(scope="session")
+def auth(dataset) -> AuthHeaders:
+    db = SessionLocal()
+    try:
+        def headers(user: User) -> Dict[str, str]:
+            return {"Authorization": f"Bearer {create_access_token(user, timedelta(hours=1))}"}
+
+        def user(email: str) -> User:
+            return db.scalar(select(User).where(User.email == email))
+
+        reader = user(trader_email(0))
+        return AuthHeaders(headers(reader), str(reader.id), headers(user(trader_email(1))), headers(user(BENCH_ADMIN_EMAIL)))
+    finally:
+        db.close()
+
+@pytest.fixture
+def client(database):
+    enabled, limiter.enabled = limiter.enabled, False
+    try:
+        yield TestClient(app)
+    finally:
+        limiter.enabled = enabled
@@ -0,0 +1,77 @@
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from benchmarks.dataset import trader_email
+from src.analytics import rollup
+from src.config import settings
+from src.entities.user import User
+from src.trades.models import BulkDeleteRequest
+
+def test_delete_status_only_with_the_symbol_filter():
+    with pytest.raises(ValidationError, match="status only applies to the symbol filter"):
+        BulkDeleteRequest(trade_ids=[uuid4()], status="CLOSED")
+    # The default status does not count as given
+    assert BulkDeleteRequest(trade_ids=[uuid4()]).trade_ids
+    assert BulkDeleteRequest(symbol="btc", status=None).status is None
+
+def test_symbol_filter_is_paged(client, auth, db, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_WRITE_MAX_IDS", 2)
+    ids = [
+        client.post("/trades/", headers=auth.writer,
+                    json={"symbol": "PAGED", "side": "LONG", "quantity": 1, "entry_price": 10,
+                          "entry_date": f"2024-01-0{day}T00:00:00Z"}).json()["id"]
+        for day in range(1, 6)
+    ]
+
+    pages = []
+    more = True
+    while more:
+        body = client.post("/trades/bulk/close", headers=auth.writer, json={"symbol": "PAGED", "exit_price": 12}).json()
+        pages.append([result["id"] for result in body["results"]])
+        more = body["more"]
+    # Oldest first, each trade once
+    assert pages == [ids[0:2], ids[2:4], ids[4:5]]
+
+    body = client.post("/trades/bulk/delete", headers=auth.writer, json={"symbol": "PAGED", "status": "CLOSED"}).json()
+    assert (body["succeeded"], body["more"]) == (2, True)
+    body = client.post("/trades/bulk/delete", headers=auth.writer, json={"symbol": "PAGED", "status": None}).json()
+    assert (body["succeeded"], body["more"]) == (2, True)
+    body = client.post("/trades/bulk/delete", headers=auth.writer, json={"symbol": "PAGED", "status": None}).json()
+    assert (body["succeeded"], body["more"]) == (1, False)
+
+    writer_id = db.scalar(select(User.id).where(User.email == trader_email(1)))
+    assert rollup.check_consistency(db, writer_id) == []
+
+def test_close_filter_skips_trades_it_cannot_close(client, auth, monkeypatch):
+    """Trades entered after the exit date stay OPEN: they must not fill every page."""
+    monkeypatch.setattr(settings, "BULK_WRITE_MAX_IDS", 2)
+
+    def create(day: int) -> str:
+        return client.post("/trades/", headers=auth.writer,
+                           json={"symbol": "TIMELINE", "side": "LONG", "quantity": 1, "entry_price": 10,
+                                 "entry_date": f"2024-01-{day:02d}T00:00:00Z"}).json()["id"]
+
+    closable = [create(day) for day in (1, 2, 3)]
+    too_late = [create(day) for day in (20, 21, 22)]
+
+    pages = []
+    for _ in range(len(closable) + len(too_late)):
+        body = client.post("/trades/bulk/close", headers=auth.writer,
+                           json={"symbol": "TIMELINE", "exit_price": 12, "exit_date": "2024-01-10T00:00:00Z"}).json()
+        pages.append([(result["id"], result["result"]) for result in body["results"]])
+        if not body["more"]:
+            break
+    try:
+        assert pages == [[(closable[0], "closed"), (closable[1], "closed")], [(closable[2], "closed")]]
+
+        # Listed by id they are still reported
+        body = client.post("/trades/bulk/close", headers=auth.writer,
+                           json={"trade_ids": too_late[:2], "exit_price": 12, "exit_date": "2024-01-10T00:00:00Z"}).json()
+        assert {result["result"] for result in body["results"]} == {"invalid_timeline"}
+    finally:
+        while client.post("/trades/bulk/delete", headers=auth.writer,
+                          json={"symbol": "TIMELINE", "status": None}).json()["more"]:
+            pass
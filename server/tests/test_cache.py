@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from benchmarks.dataset import trader_email
+from src.analytics import rollup, service as analytics_service
+from src.auth.models import TokenData
+from src.cache import RedisBackend, ResponseCache
+from src.entities.trade import Trade, TradeSide, TradeStatus
+from src.entities.user import User, UserRole
+
+fakeredis = pytest.importorskip("fakeredis")
+
+class Value(BaseModel):
+    n: int
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+def worker_cache(server, ttl: float = 60) -> ResponseCache:
+    """One worker's cache; caches built on the same server share the store."""
+    return ResponseCache(RedisBackend(client=fakeredis.FakeRedis(server=server)), ttl=ttl)
+
+def test_redis_backend_round_trip(redis_server):
+    cache = worker_cache(redis_server)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return Value(n=len(calls))
+
+    assert cache.get_or_compute("u1", "summary", {"a": 1}, Value, compute) == Value(n=1)
+    assert cache.get_or_compute("u1", "summary", {"a": 1}, Value, compute) == Value(n=1)
+    assert cache.get_or_compute("u1", "summary", {"a": 2}, Value, compute) == Value(n=2)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_redis_backend_sets_a_ttl(redis_server):
+    cache = worker_cache(redis_server, ttl=30)
+    cache.put("u1", "summary", {}, Value(n=1))
+
+    client = cache.backend.client
+    key = cache.backend.prefix + cache.make_key("u1", "summary", {})
+    assert 0 < client.pttl(key) <= 30_000
+    assert 0 < client.pttl(cache.backend._namespace_key("u1")) <= 30_000
+
+def test_redis_invalidation_reaches_every_worker(redis_server):
+    worker_a, worker_b = worker_cache(redis_server), worker_cache(redis_server)
+    worker_a.put("u1", "summary", {}, Value(n=1))
+    worker_a.put("u1", "chart", {}, Value(n=2))
+    worker_a.put("u2", "summary", {}, Value(n=3))
+    assert worker_b.get("u1", "summary", {}, Value) == Value(n=1)
+
+    worker_b.invalidate("u1")
+
+    assert worker_a.get("u1", "summary", {}, Value) is None
+    assert worker_a.get("u1", "chart", {}, Value) is None
+    assert worker_a.get("u2", "summary", {}, Value) == Value(n=3)
+
+def test_redis_errors_fall_back_to_computing(redis_server):
+    cache = worker_cache(redis_server)
+    redis_server.connected = False
+
+    assert cache.get_or_compute("u1", "summary", {}, Value, lambda: Value(n=1)) == Value(n=1)
+    assert cache.errors == 2
+
+def test_summary_is_not_served_from_before_an_uninvalidated_write(dataset, db):
+    """A write on another worker (no event here) must not leave this worker's entry current."""
+    user_id = db.scalar(select(User.id).where(User.email == trader_email(1)))
+    trader = TokenData(user_id=str(user_id), role=UserRole.TRADER.value)
+    before = analytics_service.get_user_analytics(trader, db)
+
+    now = datetime.now(timezone.utc)
+    trade = Trade(user_id=user_id, symbol="CACHETEST", side=TradeSide.LONG, quantity=1,
+                  entry_price=10, entry_date=now, exit_price=15, exit_date=now, status=TradeStatus.CLOSED)
+    db.add(trade)
+    db.flush()
+    rollup.apply_changes(db, added=[rollup.contribution_of(trade)])
+    db.commit()
+    try:
+        after = analytics_service.get_user_analytics(trader, db)
+        assert after.total_closed_trades == before.total_closed_trades + 1
+    finally:
+        db.refresh(trade)
+        rollup.apply_changes(db, removed=[rollup.contribution_of(trade)])
+        db.delete(trade)
+        db.commit()
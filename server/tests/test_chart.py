@@ -0,0 +1,31 @@
+import numpy as np
+
+from src.analytics import service as analytics_service
+from src.analytics.downsample import lttb_indices
+from src.auth.models import TokenData
+from src.entities.user import UserRole
+
+def test_lttb_keeps_the_ends_and_the_peaks():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[500], y[700] = 100.0, -100.0
+
+    keep = lttb_indices(x, y, 20)
+    assert len(keep) == 20
+    assert (keep[0], keep[-1]) == (0, 999)
+    assert {500, 700} <= set(keep.tolist())
+    assert np.all(np.diff(keep) > 0)
+    assert lttb_indices(x[:10], y[:10], 20).tolist() == list(range(10))
+
+def test_downsampled_chart_keeps_the_balance(db, trader_id):
+    trader = TokenData(user_id=str(trader_id), role=UserRole.TRADER.value)
+    full = analytics_service.compute_pnl_chart(trader, db, None, 5000)
+    reduced = analytics_service.compute_pnl_chart(trader, db, None, 50)
+    assert not full.downsampled and reduced.downsampled
+    assert len(reduced.data) == 50
+
+    # Same ends; each kept point's pnl is the balance change since the previous one
+    assert (reduced.data[0], reduced.data[-1].date) == (full.data[0], full.data[-1].date)
+    assert reduced.data[-1].cumulative_pnl == full.data[-1].cumulative_pnl
+    # (up to the rounding of each point)
+    assert abs(sum(point.pnl for point in reduced.data) - full.data[-1].cumulative_pnl) <= 0.005 * len(reduced.data)
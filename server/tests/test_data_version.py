@@ -0,0 +1,35 @@
+from uuid import uuid4
+
+from src.analytics import rollup
+from src.auth.service import verify_token
+from src.users.models import UserPurgeResponse
+
+def register(client, name: str) -> dict:
+    name = f"{name}_{uuid4().hex[:8]}"
+    response = client.post("/auth/register", json={"email": f"{name}@example.com", "username": name, "password": "pw"})
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def user_id(headers: dict) -> str:
+    return verify_token(headers["Authorization"].removeprefix("Bearer ")).user_id
+
+def test_platform_version_never_goes_back(client, auth, db):
+    """Purging the user with the newest trade write, then registering another, must not repeat a version."""
+    versions = [int(rollup.get_data_version(db))]
+
+    first = register(client, "version_first")
+    versions.append(int(rollup.get_data_version(db)))
+    response = client.post("/trades/", headers=first,
+                           json={"symbol": "VERSION", "side": "LONG", "quantity": 1, "entry_price": 10})
+    assert response.status_code == 201
+    versions.append(int(rollup.get_data_version(db)))
+
+    response = client.delete(f"/users/{user_id(first)}", headers=auth.admin)
+    assert UserPurgeResponse.model_validate(response.json()).trades_deleted == 1
+    versions.append(int(rollup.get_data_version(db)))
+
+    second = register(client, "version_second")
+    versions.append(int(rollup.get_data_version(db)))
+    client.delete(f"/users/{user_id(second)}", headers=auth.admin)
+
+    assert versions == sorted(set(versions))
@@ -0,0 +1,11 @@
+from sqlalchemy import text
+
+from src.database.diagnostics import _explain_text
+
+def test_failed_explain_leaves_the_transaction_usable(database):
+    with database.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert _explain_text(conn, "SELECT * FROM no_such_table", ()) == "(EXPLAIN failed)"
+        assert "Result" in _explain_text(conn, "SELECT %(n)s", {"n": 1})
+        assert conn.execute(text("SELECT 2")).scalar() == 2
+        assert not conn.info["diagnostics_explaining"]
@@ -0,0 +1,26 @@
+import io
+
+import pytest
+
+from src.exceptions import BusinessLogicException
+from src.trades.service import read_import_csv
+
+def test_reads_rows_with_bom_crlf_and_quoted_newlines():
+    data = b'\xef\xbb\xbfsymbol,side,exit_price\r\nbtc,LONG,\r\n"multi\nline",SHORT,2\r\n'
+    assert list(read_import_csv(io.BytesIO(data))) == [
+        {"symbol": "btc", "side": "LONG", "exit_price": None},
+        {"symbol": "multi\nline", "side": "SHORT", "exit_price": "2"},
+    ]
+
+def test_invalid_utf8_is_a_400_naming_the_line():
+    with pytest.raises(BusinessLogicException) as e:
+        list(read_import_csv(io.BytesIO(b"symbol,side\nbtc,LONG\n\xff\xfe,LONG\n")))
+    assert e.value.status_code == 400
+    assert "line 3" in e.value.detail
+
+def test_malformed_csv_is_a_400_naming_the_line():
+    data = b'symbol,side\nbtc,LONG\n"' + b"x" * 200_000 + b'",LONG\n'
+    with pytest.raises(BusinessLogicException) as e:
+        list(read_import_csv(io.BytesIO(data)))
+    assert e.value.status_code == 400
+    assert "line 3" in e.value.detail
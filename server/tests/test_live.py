@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from src.entities.trade import TradeStatus
+from src.live.service import _chart_delta
+from src.trades import events
+
+def closed_trade(pnl: float) -> dict:
+    return {"id": uuid4(), "status": TradeStatus.CLOSED, "pnl": pnl,
+            "exit_date": datetime(2100, 1, 1, tzinfo=timezone.utc)}
+
+def test_chart_points_use_the_balance_as_of_the_event(db, trader_id):
+    """Handled after newer writes, an event still appends the balance it was written at."""
+    trades = [closed_trade(5.0)]
+    event = events.TradeEvent(events.TradeAction.CLOSED, trader_id, (trades[0]["id"],), tuple(trades), 1234.5)
+
+    points, reset = _chart_delta(db, event, trades, truncated=False)
+    assert not reset
+    assert [point.cumulative_pnl for point in points] == [1234.5]
+
+    # Unknown balance: the client refetches the curve
+    assert _chart_delta(db, event._replace(total_pnl=None), trades, truncated=False) == ([], True)
@@ -0,0 +1,29 @@
+import re
+
+def sample(exposition: str, series: str) -> float:
+    match = re.search(rf"^{re.escape(series)} (\S+)$", exposition, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+def test_metrics_are_admin_only(client, auth):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers=auth.reader).status_code == 403
+    assert client.get("/metrics", headers=auth.admin).status_code == 200
+
+def test_metrics_count_sql_statements_per_request(client, auth):
+    labels = '{method="GET",route="/trades/"}'
+    before = client.get("/metrics", headers=auth.admin).text
+
+    assert client.get("/trades/", headers=auth.reader).status_code == 200
+    response = client.get("/metrics", headers=auth.admin)
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = response.text
+
+    assert "# TYPE http_request_sql_statements histogram" in after
+    assert sample(after, f"http_request_sql_statements_count{labels}") == \
+        sample(before, f"http_request_sql_statements_count{labels}") + 1
+    # The list's budget (see test_query_budgets.py), counted by the engine hooks
+    statements = sample(after, f"http_request_sql_statements_sum{labels}") - \
+        sample(before, f"http_request_sql_statements_sum{labels}")
+    assert 1 <= statements <= 3
+    assert sample(after, f'http_request_duration_seconds_count{{method="GET",route="/trades/",status="200"}}') >= 1
+    assert 'db_pool_checkouts_total{pool=' in after
@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+from src.prices import FilePriceSource
+
+def test_file_source_publishes_and_reloads(tmp_path):
+    path = tmp_path / "prices.json"
+    writer, reader = FilePriceSource(str(path)), FilePriceSource(str(path))
+    assert reader.snapshot().prices == {}
+
+    writer.update({" btc/usdt ": 64250.5, "ETH/USDT": 3120})
+    first = reader.snapshot()
+    assert first.prices == {"BTC/USDT": 64250.5, "ETH/USDT": 3120.0}
+
+    # Back to back: the version must move even within one mtime tick
+    writer.update({"ETH/USDT": 3200})
+    second = reader.snapshot()
+    assert second.prices == {"BTC/USDT": 64250.5, "ETH/USDT": 3200.0}
+    assert second.version != first.version
+
+    writer.update({"SOL/USDT": 150}, replace=True)
+    assert reader.snapshot().prices == {"SOL/USDT": 150.0}
+    assert json.loads(path.read_text()) == {"SOL/USDT": 150.0}
+    assert [p.name for p in tmp_path.iterdir()] == ["prices.json"]
+
+def test_file_source_keeps_last_good_prices(tmp_path):
+    path = tmp_path / "prices.json"
+    source = FilePriceSource(str(path))
+    source.update({"BTC/USDT": 1})
+    good = source.snapshot()
+
+    path.write_text("{not json")
+    assert source.snapshot() == good
+
+def test_file_source_failed_write_cleans_up(tmp_path, monkeypatch):
+    path = tmp_path / "prices.json"
+    source = FilePriceSource(str(path))
+    source.update({"BTC/USDT": 1})
+    open_fds = len(os.listdir("/proc/self/fd"))
+
+    def fail(*args):
+        raise PermissionError("fchmod")
+    monkeypatch.setattr(os, "fchmod", fail)
+    with pytest.raises(PermissionError):
+        source.update({"BTC/USDT": 2})
+
+    assert len(os.listdir("/proc/self/fd")) == open_fds
+    assert [p.name for p in tmp_path.iterdir()] == ["prices.json"]
+    assert source.snapshot().prices == {"BTC/USDT": 1.0}
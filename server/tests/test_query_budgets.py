@@ -0,0 +1,77 @@
+"""
+Statements per request on the hot endpoints (sync stack). A budget that is
+exceeded fails with the statements run, see src/database/pytest_plugin.py.
+"""
+import pytest
+
+from src.analytics import service as analytics_service
+from src.analytics.service import PLATFORM_NAMESPACE
+
+@pytest.fixture
+def open_trade(client, auth):
+    """An OPEN trade of the writer, deleted afterwards if the test did not."""
+    response = client.post("/trades/", headers=auth.writer,
+                           json={"symbol": "BUDGET", "side": "LONG", "quantity": 2, "entry_price": 100})
+    assert response.status_code == 201
+    trade = response.json()
+    yield trade
+    client.delete(f"/trades/{trade['id']}", headers=auth.writer)
+
+def test_trade_list(client, auth, assert_max_queries):
+    # ETag version, total from the rollup, the page
+    with assert_max_queries(3):
+        response = client.get("/trades/", headers=auth.reader)
+    assert response.status_code == 200
+
+def test_trade_list_admin(client, auth, assert_max_queries):
+    with assert_max_queries(2):
+        response = client.get("/trades/?include_total=false", headers=auth.admin)
+    assert response.status_code == 200
+
+def test_summary_uncached(client, auth, assert_max_queries):
+    # ETag version; cache versions of the summary and the valuation; rollup row; open positions
+    analytics_service.analytics_cache.invalidate(auth.reader_id)
+    with assert_max_queries(5):
+        response = client.get("/analytics/summary", headers=auth.reader)
+    assert response.status_code == 200
+
+def test_summary_cached(client, auth, assert_max_queries):
+    client.get("/analytics/summary", headers=auth.reader)
+    # ETag version, cache version
+    with assert_max_queries(2):
+        response = client.get("/analytics/summary", headers=auth.reader)
+    assert response.status_code == 200
+
+def test_summary_admin(client, auth, assert_max_queries):
+    analytics_service.analytics_cache.invalidate(PLATFORM_NAMESPACE)
+    # Computed on the spot (no snapshot thread): platform aggregate, cache version, open positions
+    with assert_max_queries(4):
+        response = client.get("/analytics/summary", headers=auth.admin)
+    assert response.status_code == 200
+
+def test_create(client, auth, assert_max_queries):
+    with assert_max_queries(4):
+        response = client.post("/trades/", headers=auth.writer,
+                               json={"symbol": "BUDGET", "side": "SHORT", "quantity": 1, "entry_price": 50})
+    assert response.status_code == 201
+    client.delete(f"/trades/{response.json()['id']}", headers=auth.writer)
+
+def test_update(client, auth, open_trade, assert_max_queries):
+    # UPDATE ... RETURNING, rollup
+    with assert_max_queries(2):
+        response = client.put(f"/trades/{open_trade['id']}", headers=auth.writer, json={"quantity": 3})
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 3
+
+def test_close(client, auth, open_trade, assert_max_queries):
+    # UPDATE ... RETURNING, rollup, per-symbol rollup
+    with assert_max_queries(3):
+        response = client.patch(f"/trades/{open_trade['id']}/close", headers=auth.writer, json={"exit_price": 110})
+    assert response.status_code == 200
+    assert response.json()["pnl"] == 20
+
+def test_delete(client, auth, open_trade, assert_max_queries):
+    # DELETE ... RETURNING, rollup (an open trade has no per-symbol PnL)
+    with assert_max_queries(2):
+        response = client.delete(f"/trades/{open_trade['id']}", headers=auth.writer)
+    assert response.status_code == 204
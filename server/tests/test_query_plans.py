@@ -0,0 +1,8 @@
+import pytest
+
+from src.database.explain import HOT_PATH_CHECKS, check_plan, plan_context
+
+@pytest.mark.parametrize("check", HOT_PATH_CHECKS, ids=lambda check: check.name)
+def test_hot_path_uses_index(db, trader_id, check):
+    problem = check_plan(plan_context(db, trader_id), check)
+    assert problem is None, problem